@@ -0,0 +1,136 @@
+"""
+Benchmark the batch comment normalization against the previous per-comment path
+of potd_bot.save_comments_to_file on a synthetic POTD thread.
+
+Usage: python benchmarks/bench_comment_normalization.py [number_of_comments]
+"""
+
+import datetime
+import os
+import random
+import sys
+import time
+
+import emoji
+import pytz
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from helpers.tools.comment_normalizer import normalize_comments
+
+EMOJIS = ["✅", "❌", "🔥", "💰", "👍🏻", "🏀", "⚽️", "🇺🇸", "🤞", "🙏🏽", "💯", "🚀"]
+LINES = [
+    "Record: {wins}-{losses} ({pushes} pushes)",
+    "Net Units: +{units}",
+    "ROI: +{roi}%",
+    "Sport: NBA",
+    "Pick: Lakers vs Celtics / Over 220.5",
+    "Unit size: 2 units",
+    "Write Up: Both teams have been scoring at a high pace and the line is too low.",
+    "",
+    "   ",
+    "GL",
+]
+
+
+class FakeAuthor:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeComment:
+    def __init__(self, author, body, created_utc):
+        self.author = FakeAuthor(author) if author else None
+        self.body = body
+        self.created_utc = created_utc
+
+
+def make_thread(count, seed=42):
+    """
+    Build a synthetic POTD thread.
+
+    :param count: The number of comments
+    :param seed: The random seed
+    :return: A list of fake comments
+    """
+    rng = random.Random(seed)
+    start = datetime.datetime(2025, 3, 1, tzinfo=datetime.timezone.utc).timestamp()
+    comments = []
+    for index in range(count):
+        lines = []
+        for line in rng.sample(LINES, rng.randint(3, len(LINES))):
+            line = line.format(wins=rng.randint(0, 40), losses=rng.randint(0, 40),
+                               pushes=rng.randint(0, 5), units=rng.randint(0, 30), roi=rng.randint(0, 50))
+            # About a third of the comments use emojis
+            if index % 3 == 0:
+                line += " " + "".join(rng.choice(EMOJIS) for _ in range(rng.randint(1, 3)))
+            lines.append(line)
+        author = None if index % 50 == 0 else f"capper_{index % 700}"
+        comments.append(FakeComment(author, "\n".join(lines), start + index * 37.5))
+    comments.append(FakeComment("sbpotdbot", "Bot post", start))
+    return comments
+
+
+def legacy_normalize(comments, bot_username="sbpotdbot"):
+    """
+    The previous per-comment path of save_comments_to_file.
+
+    :param comments: A list of comments
+    :param bot_username: The author whose comments are skipped
+    :return: A list of dictionaries with author, created and body
+    """
+    pst = pytz.timezone('America/Los_Angeles')
+    normalized = []
+    for comment in comments:
+        if comment.author and comment.author.name.lower() == bot_username.lower():
+            continue
+        author = comment.author.name if comment.author else 'Unknown'
+        comment_body = emoji.demojize(comment.body)
+        comment_body = "\n".join([line for line in comment_body.splitlines() if line.strip() != ""])
+        pst_time = datetime.datetime.fromtimestamp(comment.created_utc, pst).strftime("%Y-%m-%d %H:%M:%S")
+        normalized.append({"author": author, "created": pst_time, "body": comment_body})
+    return normalized
+
+
+def best_of(function, comments, repeat):
+    """
+    Time a function and keep the best of several runs.
+
+    :param function: The function to time
+    :param comments: The comments to pass to it
+    :param repeat: The number of runs
+    :return: A tuple (best time in seconds, result of the last run)
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(comments)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    comments = make_thread(count)
+
+    # Build the emoji tables outside of the timed runs, like a long-running process would
+    normalize_comments(comments[:1])
+
+    legacy_time, legacy_result = best_of(legacy_normalize, comments, 3)
+    batch_time, batch_result = best_of(
+        lambda batch: normalize_comments(batch, exclude_authors=["sbpotdbot"]), comments, 3
+    )
+
+    print(f"Comments:            {count}")
+    print(f"Per-comment path:    {legacy_time * 1000:.1f} ms")
+    print(f"Batch normalization: {batch_time * 1000:.1f} ms")
+    print(f"Speedup:             {legacy_time / batch_time:.1f}x")
+    print(f"Identical output:    {legacy_result == batch_result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Run the NFL, POTD and AppIdeas bots end to end offline against the replay services and
+report the wall-clock time, peak memory and external calls of each run.
+
+Reddit, the Odds API, OCR.space, OpenAI and Telegram are answered from recorded fixtures
+(helpers/mocks/fixtures/replay_fixtures.json) with a simulated latency per call.
+
+Usage: python benchmarks/bench_offline_replay.py [--bots nfl,potd,appideas] [--comments 300] [--posts 12]
+                                                  [--latency-scale 1.0] [--latency ocr=0.8 ...]
+                                                  [--shadow-rate 0.1] [--fixtures recording.json] [--verbose]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+# Everything the bots write goes to a throwaway folder; the API keys only have to exist
+work_dir = tempfile.mkdtemp(prefix='replay_')
+os.environ.update({
+    'RUN_REPORT_DIR': os.path.join(work_dir, 'runs'),
+    'RUN_ARTIFACT_DIR': os.path.join(work_dir, 'artifacts'),
+    'CAPPER_DB_PATH': os.path.join(work_dir, 'cappers.db'),
+    'LLM_USAGE_DB': os.path.join(work_dir, 'llm_usage.db'),
+    'ODDS_API_KEY': 'replay',
+    'OCR_SPACE_API_KEY': 'replay',
+    'OPENAI_API_KEY': 'replay',
+    'BAO_TELEGRAM_ID': '4242',
+    'BAO_TELEGRAM_TOKEN': '123456:replay',
+})
+
+from helpers.mocks.replay_services import DEFAULT_LATENCY, ReplayServices, load_fixtures
+from helpers.tools.llm_usage import UsageLedger, format_savings
+from helpers.tools.ocr_api import OCRAPI
+from helpers.tools.odds_api import OddsAPI
+from helpers.tools.openai_client import OpenAIClient
+from helpers.tools.reddit_parser import RedditParser, set_reddit
+from helpers.tools.telegram_bot_client import TelegramBotClient
+from bots import nfl_bot, potd_bot
+from bots.appideas_bot import AppIdeasBot
+
+nfl_bot.ANALYZING_RESULT_FOLDER = os.path.join(work_dir, 'analyzing_results')
+
+
+def run_nfl(services, ledger, telegram_client):
+    nfl_bot.main(RedditParser(), OddsAPI(services.http_session), OCRAPI(services.http_session))
+
+
+def run_potd(services, ledger, telegram_client):
+    potd_bot.main(RedditParser(), OpenAIClient(services.openai, ledger), telegram_client, OddsAPI(services.http_session))
+
+
+def run_appideas(services, ledger, telegram_client):
+    AppIdeasBot(RedditParser(), OpenAIClient(services.openai, ledger), telegram_client).run_daily_analysis()
+
+
+BOTS = {'nfl': run_nfl, 'potd': run_potd, 'appideas': run_appideas}
+
+
+def measure(name, services, ledger, verbose=False):
+    """
+    Run one bot against the replay services.
+
+    :return: (wall-clock seconds, peak traced memory in bytes, LLM cost in USD, calls per service)
+    """
+    services.reset()
+    telegram_client = TelegramBotClient(services.telegram_bot)
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    with output:
+        BOTS[name](services, ledger, telegram_client)
+        # Messages still queued are part of the run
+        telegram_client.close()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    cost = sum(row['cost'] for row in ledger.totals('bot') if row['name'] == name)
+    return elapsed, peak, cost, dict(services.calls)
+
+
+def parse_latency(values):
+    latency = {}
+    for value in values or []:
+        service, _, seconds = value.partition('=')
+        if service not in DEFAULT_LATENCY:
+            raise SystemExit(f"Unknown service '{service}', expected one of: {', '.join(DEFAULT_LATENCY)}")
+        latency[service] = float(seconds)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bots offline against recorded fixtures")
+    parser.add_argument('--bots', default='nfl,potd,appideas', help="Comma separated bots to run")
+    parser.add_argument('--comments', type=int, default=300, help="Top-level comments per POTD/NFL thread")
+    parser.add_argument('--posts', type=int, default=12, help="r/AppIdeas posts of the past 24 hours")
+    parser.add_argument('--latency-scale', type=float, default=1.0, help="Multiplier for every latency, 0 for none")
+    parser.add_argument('--latency', nargs='*', metavar='SERVICE=SECONDS', help="Override the latency of a service")
+    parser.add_argument('--shadow-rate', type=float,
+                        help="Share of routed prompts also measured on gpt-5 (default: MODEL_ROUTER_SHADOW_RATE)")
+    parser.add_argument('--fixtures', help="A fixture file to replay instead of the bundled one")
+    parser.add_argument('--verbose', action='store_true', help="Show the bots' own output")
+    args = parser.parse_args()
+    if args.shadow_rate is not None:
+        # Read by the ModelRouter of every OpenAIClient the bots create
+        os.environ['MODEL_ROUTER_SHADOW_RATE'] = str(args.shadow_rate)
+
+    services = ReplayServices(
+        load_fixtures(args.fixtures), comments=args.comments, posts=args.posts,
+        latency=parse_latency(args.latency), latency_scale=args.latency_scale,
+    )
+    set_reddit(services.reddit)
+    ledger = UsageLedger()
+
+    rows = []
+    for name in [name.strip() for name in args.bots.split(',') if name.strip()]:
+        if name not in BOTS:
+            raise SystemExit(f"Unknown bot '{name}', expected one of: {', '.join(BOTS)}")
+        rows.append((name,) + measure(name, services, ledger, args.verbose))
+
+    print(f"\n{'Bot':<10}{'Wall s':>9}{'Peak MB':>9}{'LLM $':>9}  Calls")
+    for name, elapsed, peak, cost, calls in rows:
+        call_text = ", ".join(f"{service}={count}" for service, count in sorted(calls.items()))
+        print(f"{name:<10}{elapsed:>9.2f}{peak / 1024 / 1024:>9.1f}{cost:>9.4f}  {call_text}")
+    savings = ledger.routing_savings('tier')
+    if savings:
+        print(f"\nModel routing against always gpt-5 (sampled prompts):\n{format_savings(savings, 'tier')}")
+    print(f"\nMax RSS of the process: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+    print(f"Per-stage run reports: {os.environ['RUN_REPORT_DIR']}")
+    print(f"Run artifacts: {os.environ['RUN_ARTIFACT_DIR']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Measure the command round trip of TelegramClockBot in polling and webhook mode against
+the local Telegram mock server, from delivering /help to receiving the bot's reply.
+
+Usage: python benchmarks/bench_telegram_roundtrip.py [number_of_commands]
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import statistics
+import sys
+import tempfile
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from helpers.mocks.telegram_mock_server import TelegramMockServer
+
+CHAT_ID = 4242
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def measure(mode, count):
+    server = await TelegramMockServer().start()
+    port = free_port()
+    os.environ.update({
+        'AYMEE_TELEGRAM_TOKEN': '123456:benchmark',
+        'AYMEE_TELEGRAM_ID': str(CHAT_ID),
+        'TELEGRAM_API_BASE_URL': server.base_url,
+        'TELEGRAM_MODE': mode,
+        'TELEGRAM_WEBHOOK_URL': f"http://127.0.0.1:{port}",
+        'TELEGRAM_WEBHOOK_LISTEN': '127.0.0.1',
+        'TELEGRAM_WEBHOOK_PORT': str(port),
+    })
+    from helpers.tools.telegram_clock_bot import TelegramClockBot
+
+    bot = TelegramClockBot()
+    task = asyncio.create_task(bot.run_async())
+    # Wait until the bot is receiving: the webhook is registered or the first getUpdates is open
+    while not (server.webhook if mode == 'webhook' else any(call[1] == 'getUpdates' for call in server.calls)):
+        await asyncio.sleep(0.01)
+
+    timings = []
+    for _ in range(count):
+        elapsed = await server.round_trip(CHAT_ID, '/help')
+        if elapsed is None:
+            print(f"{mode}: no reply within the timeout")
+            break
+        timings.append(elapsed * 1000)
+
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    await server.stop()
+    return timings
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    logging.basicConfig(level=logging.WARNING)
+    # Keep the action journal of the throwaway bots out of logs/
+    os.environ['CLOCK_JOURNAL_PATH'] = os.path.join(tempfile.mkdtemp(), 'clock_journal.db')
+
+    print(f"{'Mode':<10}{'Commands':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for mode in ('polling', 'webhook'):
+        timings = asyncio.run(measure(mode, count))
+        if not timings:
+            continue
+        p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        print(f"{mode:<10}{len(timings):>10}{statistics.median(timings):>10.1f}{p95:>10.1f}{max(timings):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,12 +12,32 @@ sys.path.insert(0, project_root)
 from helpers.tools.reddit_parser import RedditParser
 from helpers.tools.openai_client import OpenAIClient
 from helpers.tools.telegram_bot_client import TelegramBotClient
+from helpers.tools.prompt_packer import PromptPacker
+from helpers.tools.instrumentation import start_run
+from helpers.tools.run_artifacts import RunArtifacts, read_artifact
+
+# Token budget of the post content included in each analysis prompt
+APPIDEAS_PROMPT_TOKEN_BUDGET = int(os.getenv('APPIDEAS_PROMPT_TOKEN_BUDGET', '1500'))
+# Reuse the analyses earlier runs of the past two days saved for the same posts instead of asking again
+APPIDEAS_REUSE_ANALYSES = os.getenv('APPIDEAS_REUSE_ANALYSES', 'true').lower() in ('1', 'true', 'yes')
+# Words hinting that an idea is AI-powered, for the local pre-filter that picks the model
+AI_KEYWORD_PATTERN = re.compile(
+    r'\b(?:ai|a\.i\.|gpt|llms?|ml|machine learning|models?|vision|neural|chatbots?|copilot|assistant'
+    r'|recogni\w*|transcri\w*|predict\w*|automat\w*|personali[sz]\w*|recommend\w*)\b',
+    re.IGNORECASE,
+)
 
 class AppIdeasBot:
-    def __init__(self):
-        self.reddit_parser = RedditParser()
-        self.openai_client = OpenAIClient()
-        self.telegram_client = TelegramBotClient()
+    def __init__(self, reddit_parser=None, openai_client=None, telegram_client=None):
+        """
+        :param reddit_parser: An instance of RedditParser (default: a new one)
+        :param openai_client: An instance of OpenAIClient (default: a new one)
+        :param telegram_client: An instance of TelegramBotClient (default: a new one)
+        """
+        self.reddit_parser = reddit_parser or RedditParser()
+        self.openai_client = openai_client or OpenAIClient()
+        self.telegram_client = telegram_client or TelegramBotClient()
+        self.prompt_packer = PromptPacker(APPIDEAS_PROMPT_TOKEN_BUDGET, model_name="gpt-5")
         self.subreddit = "AppIdeas"
         
     def get_posts_from_past_24_hours(self) -> List[Any]:
@@ -34,7 +54,8 @@ class AppIdeasBot:
     def format_post_for_analysis(self, post) -> Dict[str, Any]:
         """
         Format a Reddit post for OpenAI analysis.
-        Extracts both title and content (selftext) from each post.
+        Extracts both title and content (selftext) from each post. Long content is
+        cut down to the prompt token budget.
         
         :param post: A PRAW submission object
         :return: A dictionary containing formatted post data
@@ -42,11 +63,12 @@ class AppIdeasBot:
         # Get the post content - this could be selftext for text posts or URL for link posts
         content = ""
         if hasattr(post, 'selftext') and post.selftext:
-            content = post.selftext
+            content = self.prompt_packer.truncate(self.prompt_packer.clean(post.selftext))
         elif hasattr(post, 'url') and post.url:
             content = f"Link: {post.url}"
         
         return {
+            "id": post.id,
             "title": post.title,
             "content": content,
             "url": post.url if hasattr(post, 'url') else "",
@@ -58,12 +80,40 @@ class AppIdeasBot:
             "post_type": "text" if hasattr(post, 'selftext') and post.selftext else "link"
         }
     
+    def prefilter_confidence(self, post_data: Dict[str, Any]) -> float:
+        """
+        Estimate locally how likely a post is to pass the AI filter, before any model sees it.
+        
+        :param post_data: Formatted post data
+        :return: A confidence between 0 and 1
+        """
+        text = f"{post_data['title']} {post_data['content']}"
+        keywords = {match.lower() for match in AI_KEYWORD_PATTERN.findall(text)}
+        return round(min(0.1 + 0.2 * len(keywords), 0.9), 2)
+
+    def routing_features(self, post_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Describe a post for the model router: its length, whether it is only a link and the pre-filter confidence.
+        
+        :param post_data: Formatted post data
+        :return: The features for OpenAIClient.complete_routed
+        """
+        return {
+            "tokens": self.prompt_packer.count_tokens(f"{post_data['title']} {post_data['content']}"),
+            "link_only": post_data['post_type'] == "link",
+            "confidence": self.prefilter_confidence(post_data),
+        }
+
     def analyze_idea_with_gpt5(self, post_data: Dict[str, Any]) -> str:
         """
-        Analyze an app idea using OpenAI GPT-5 with optimized speed settings.
+        Analyze an app idea on the cheapest GPT-5 model that fits it.
+        
+        One-liners, link-only posts and ideas the pre-filter finds unlikely to be AI-powered go to
+        gpt-5-nano, everything else to gpt-5-mini; an AI Integration score close to the filter
+        threshold is checked again by gpt-5.
         
         :param post_data: Formatted post data
-        :return: GPT-5's analysis of the idea
+        :return: The analysis of the idea
         """
         input_text = f"""
         Analyze this app idea from r/AppIdeas:
@@ -92,21 +142,40 @@ class AppIdeasBot:
         """
         
         try:
-            # Use GPT-5 with Chat Completions API
-            response = self.openai_client.client.chat.completions.create(
-                model="gpt-5",
-                messages=[
-                    {"role": "system", "content": "You are an expert app developer and business analyst who evaluates app ideas for feasibility and market potential."},
-                    {"role": "user", "content": input_text}
-                ],
+            # Use the GPT-5 family with Chat Completions API; tokens, cost and savings are recorded by the client
+            response, decision = self.openai_client.complete_routed(
+                "You are an expert app developer and business analyst who evaluates app ideas for feasibility and market potential.",
+                input_text,
+                self.routing_features(post_data),
+                score=self._extract_ai_score,
                 max_completion_tokens=3000  # Much higher limit for GPT-5 reasoning + response
             )
+            print(f"Model: {decision}")
+            post_data['model'] = decision.model
             
-            return response.choices[0].message.content.strip()
+            return response.strip()
         except Exception as e:
             print(f"Error analyzing idea with GPT-5: {e}")
             return f"Error analyzing idea: {str(e)}"
     
+    def load_previous_analyses(self, posts) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the analyses of these posts saved by earlier runs, skipping failed ones.
+
+        :param posts: A list of PRAW submission objects
+        :return: A dictionary of post ID to the saved "analysis" and "model"
+        """
+        if not APPIDEAS_REUSE_ANALYSES or not posts:
+            return {}
+        since = datetime.date.today() - datetime.timedelta(days=1)
+        rows = read_artifact('llm_results', where={'post_id': {post.id for post in posts}, 'error': False},
+                             columns=('post_id', 'analysis', 'model'), bot='appideas', since=since)
+        previous = {}
+        for row in rows:
+            # Newest run first
+            previous.setdefault(row['post_id'], row)
+        return previous
+
     def filter_feasible_ideas(self, posts_with_analysis: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Filter posts to only include those with feasible ideas based on GPT-5 analysis.
@@ -347,72 +416,91 @@ class AppIdeasBot:
     
     def run_daily_analysis(self):
         """
-        Run the daily analysis of AppIdeas subreddit.
+        Run the daily analysis of AppIdeas subreddit, timing each stage of the run.
         """
-        try:
-            print("Starting AppIdeas daily analysis...")
+        with start_run('appideas'):
+            try:
+                print("Starting AppIdeas daily analysis...")
             
-            # Get posts from past 24 hours
-            posts = self.get_posts_from_past_24_hours()
+                # Get posts from past 24 hours
+                posts = self.get_posts_from_past_24_hours()
             
-            if not posts:
-                message = f"📱 **AppIdeas Daily Report** - {datetime.datetime.now().strftime('%Y-%m-%d')}\n\n" \
-                         f"📊 No new posts found in r/AppIdeas in the past 24 hours.\n\n" \
-                         f"Check back tomorrow! 🍀"
-                self.telegram_client.send_message(message)
-                return
+                if not posts:
+                    message = f"📱 **AppIdeas Daily Report** - {datetime.datetime.now().strftime('%Y-%m-%d')}\n\n" \
+                             f"📊 No new posts found in r/AppIdeas in the past 24 hours.\n\n" \
+                             f"Check back tomorrow! 🍀"
+                    self.telegram_client.send_message(message)
+                    return
             
-            print(f"Analyzing {len(posts)} posts with GPT-5...")
+                print(f"Analyzing {len(posts)} posts with GPT-5...")
+                artifacts = RunArtifacts('appideas')
+                previous = self.load_previous_analyses(posts)
             
-            # Analyze each post
-            posts_with_analysis = []
-            for i, post in enumerate(posts, 1):
-                print(f"Analyzing post {i}/{len(posts)}: {post.title[:50]}...")
+                # Analyze each post
+                posts_with_analysis = []
+                with artifacts.writer('llm_results', stats=('post_id',)) as results:
+                    for i, post in enumerate(posts, 1):
+                        print(f"Analyzing post {i}/{len(posts)}: {post.title[:50]}...")
                 
-                post_data = self.format_post_for_analysis(post)
-                analysis = self.analyze_idea_with_gpt5(post_data)
-                post_data['analysis'] = analysis
-                posts_with_analysis.append(post_data)
+                        post_data = self.format_post_for_analysis(post)
+                        if post.id in previous:
+                            print("Reusing the analysis of an earlier run")
+                            analysis = previous[post.id]['analysis']
+                            post_data['model'] = previous[post.id]['model']
+                        else:
+                            analysis = self.analyze_idea_with_gpt5(post_data)
+                        post_data['analysis'] = analysis
+                        posts_with_analysis.append(post_data)
+                        results.write({
+                            'post_id': post_data['id'],
+                            'title': post_data['title'],
+                            'model': post_data.get('model'),
+                            'reused': post.id in previous,
+                            'error': analysis.startswith("Error analyzing idea"),
+                            'ai_score': self._extract_ai_score(analysis),
+                            'analysis': analysis,
+                        })
                 
-                # Print full analysis to console
+                        # Print full analysis to console
+                        print(f"\n{'='*80}")
+                        print(f"POST {i}: {post.title}")
+                        print(f"{'='*80}")
+                        print(f"Author: u/{post_data['author']} | Score: {post_data['score']} | Comments: {post_data['num_comments']}")
+                        print(f"Content: {post_data['content'][:200]}...")
+                        print(f"\nGPT-5 ANALYSIS:")
+                        print(analysis)
+                        print(f"{'='*80}\n")
+
+                # Filter for feasible ideas
                 print(f"\n{'='*80}")
-                print(f"POST {i}: {post.title}")
+                print("FILTERING RESULTS:")
                 print(f"{'='*80}")
-                print(f"Author: u/{post_data['author']} | Score: {post_data['score']} | Comments: {post_data['num_comments']}")
-                print(f"Content: {post_data['content'][:200]}...")
-                print(f"\nGPT-5 ANALYSIS:")
-                print(analysis)
-                print(f"{'='*80}\n")
-            
-            # Filter for feasible ideas
-            print(f"\n{'='*80}")
-            print("FILTERING RESULTS:")
-            print(f"{'='*80}")
-            feasible_ideas = self.filter_feasible_ideas(posts_with_analysis)
+                feasible_ideas = self.filter_feasible_ideas(posts_with_analysis)
             
-            # Send summary message first
-            summary_message = self.format_telegram_message(feasible_ideas, len(posts), posts_with_analysis)
-            self.telegram_client.send_message(summary_message)
+                # Send summary message first
+                summary_message = self.format_telegram_message(feasible_ideas, len(posts), posts_with_analysis)
+                self.telegram_client.send_message(summary_message)
             
-            # Send individual messages for each feasible idea
-            for i, idea in enumerate(feasible_ideas, 1):
-                individual_message = self.format_individual_idea_message(idea, i)
-                self.telegram_client.send_message(individual_message)
-                print(f"📤 Sent individual message for idea {i}: {idea['title'][:50]}...")
+                # Send individual messages for each feasible idea
+                for i, idea in enumerate(feasible_ideas, 1):
+                    individual_message = self.format_individual_idea_message(idea, i)
+                    self.telegram_client.send_message(individual_message)
+                    print(f"📤 Sent individual message for idea {i}: {idea['title'][:50]}...")
             
-            print(f"\n📊 FINAL SUMMARY:")
-            print(f"Total posts analyzed: {len(posts)}")
-            print(f"AI-powered ideas found: {len(feasible_ideas)}")
-            print(f"Success rate: {len(feasible_ideas)/len(posts)*100:.1f}%")
-            print(f"Messages sent: {1 + len(feasible_ideas)} (1 summary + {len(feasible_ideas)} individual)")
-            print(f"{'='*80}")
+                print(f"\n📊 FINAL SUMMARY:")
+                print(f"Total posts analyzed: {len(posts)}")
+                print(f"AI-powered ideas found: {len(feasible_ideas)}")
+                print(f"Success rate: {len(feasible_ideas)/len(posts)*100:.1f}%")
+                print(f"Messages queued: {1 + len(feasible_ideas)} (1 summary + {len(feasible_ideas)} individual, coalesced when sent)")
+                print(f"{'='*80}")
             
-        except Exception as e:
-            error_message = f"❌ **AppIdeas Bot Error**\n\n" \
-                           f"An error occurred during daily analysis:\n{str(e)}\n\n" \
-                           f"Time: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            self.telegram_client.send_message(error_message)
-            print(f"Error in daily analysis: {e}")
+            except Exception as e:
+                error_message = f"❌ **AppIdeas Bot Error**\n\n" \
+                               f"An error occurred during daily analysis:\n{str(e)}\n\n" \
+                               f"Time: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                self.telegram_client.send_message(error_message)
+                print(f"Error in daily analysis: {e}")
+
 
 def main():
     """
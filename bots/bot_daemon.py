@@ -0,0 +1,218 @@
+"""
+Bot Daemon
+Hosts every bot in one resident process: the cron bots run as scheduled jobs on one
+event loop next to the clock bot, sharing their API clients so start-up costs are paid once
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from helpers.tools.clock_scheduler import ClockScheduler, ScheduledJob
+
+EVERY_DAY = range(7)
+
+
+class SharedClients:
+    def __init__(self):
+        """API clients created once on first use and shared by every job"""
+        self.logger = logging.getLogger(__name__)
+        self._clients = {}
+        # Reentrant: a client factory may use another shared client, e.g. OddsAPI the HTTP session
+        self._lock = threading.RLock()
+
+    def _get(self, name, factory):
+        with self._lock:
+            if name not in self._clients:
+                self._clients[name] = factory()
+                self.logger.info(f"🔌 Created shared {name} client")
+            return self._clients[name]
+
+    @property
+    def http_session(self):
+        """One connection pool for the plain HTTP APIs (odds, OCR, image downloads)"""
+        return self._get('http', requests.Session)
+
+    @property
+    def reddit_parser(self):
+        from helpers.tools.reddit_parser import RedditParser
+        return self._get('reddit', RedditParser)
+
+    @property
+    def openai_client(self):
+        from helpers.tools.openai_client import OpenAIClient
+        return self._get('openai', OpenAIClient)
+
+    @property
+    def telegram_client(self):
+        from helpers.tools.telegram_bot_client import TelegramBotClient
+        return self._get('telegram', TelegramBotClient)
+
+    @property
+    def odds_api(self):
+        from helpers.tools.odds_api import OddsAPI
+        return self._get('odds', lambda: OddsAPI(self.http_session))
+
+    @property
+    def ocr_api(self):
+        from helpers.tools.ocr_api import OCRAPI
+        return self._get('ocr', lambda: OCRAPI(self.http_session))
+
+    def close(self):
+        """Send what the Telegram client still has queued and close the HTTP pool"""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        if 'telegram' in clients:
+            clients['telegram'].close()
+        if 'http' in clients:
+            clients['http'].close()
+
+
+def run_potd(clients):
+    from bots import potd_bot
+    try:
+        odds_api = clients.odds_api
+    except ValueError:
+        # Without ODDS_API_KEY the bot runs without grading the stored picks
+        odds_api = None
+    potd_bot.main(clients.reddit_parser, clients.openai_client, clients.telegram_client, odds_api)
+
+
+def run_nfl(clients):
+    from bots import nfl_bot
+    nfl_bot.main(clients.reddit_parser, clients.odds_api, clients.ocr_api)
+
+
+def run_appideas(clients):
+    from bots.appideas_bot import AppIdeasBot
+    AppIdeasBot(clients.reddit_parser, clients.openai_client, clients.telegram_client).run_daily_analysis()
+
+
+# name: (time env var, default time, weekdays, job, clients it uses)
+BOT_JOBS = {
+    'potd': ('POTD_BOT_TIME', '10:00', EVERY_DAY, run_potd, ('reddit_parser', 'openai_client', 'telegram_client', 'odds_api')),
+    'nfl': ('NFL_BOT_TIME', '09:00', EVERY_DAY, run_nfl, ('reddit_parser', 'odds_api', 'ocr_api')),
+    'appideas': ('APPIDEAS_BOT_TIME', '20:00', EVERY_DAY, run_appideas, ('reddit_parser', 'openai_client', 'telegram_client')),
+}
+
+
+class BotDaemon:
+    def __init__(self, bot_names=None):
+        """
+        :param bot_names: The bots to host, e.g. ["potd", "appideas", "clock"] (default: DAEMON_BOTS)
+        """
+        self.logger = self.setup_logging()
+        if bot_names is None:
+            bot_names = os.getenv('DAEMON_BOTS', 'potd,nfl,appideas').split(',')
+        self.bot_names = [name.strip() for name in bot_names if name.strip()]
+        unknown = set(self.bot_names) - set(BOT_JOBS) - {'clock'}
+        if unknown:
+            raise ValueError(f"Unknown bots in DAEMON_BOTS: {', '.join(sorted(unknown))}")
+
+        self.clients = SharedClients()
+        # Blocking bot runs happen on these threads, so a long job never holds up the event loop or another job
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('DAEMON_WORKERS', '4')), thread_name_prefix='bot-job'
+        )
+        self.running = set()
+        self.scheduler = ClockScheduler(
+            tz_name=os.getenv('DAEMON_TIMEZONE') or None,
+            state_path=os.getenv('DAEMON_SCHEDULE_STATE_FILE', 'cache/daemon_schedule.json'),
+        )
+        self.clock_bot = None
+
+    def setup_logging(self):
+        """Setup logging configuration"""
+        os.makedirs('logs', exist_ok=True)
+
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            handlers=[
+                logging.FileHandler('logs/bot_daemon.log'),
+                logging.StreamHandler()
+            ]
+        )
+        return logging.getLogger(__name__)
+
+    async def run_job(self, name, job):
+        """Run a bot on a worker thread; a run that is still going is not started twice"""
+        if name in self.running:
+            self.logger.warning(f"⏭️ {name} is still running, skipping this run")
+            return
+        self.running.add(name)
+        self.logger.info(f"▶️ Running {name} bot")
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, job, self.clients)
+            self.logger.info(f"✅ {name} bot finished")
+        except Exception as e:
+            self.logger.error(f"❌ {name} bot failed: {e}")
+        finally:
+            self.running.discard(name)
+
+    async def warm_up(self):
+        """Create the shared clients of the hosted bots before their first run"""
+        names = {client for bot in self.bot_names if bot in BOT_JOBS for client in BOT_JOBS[bot][4]}
+        loop = asyncio.get_running_loop()
+        for name in sorted(names):
+            try:
+                await loop.run_in_executor(self.executor, getattr, self.clients, name)
+            except Exception as e:
+                self.logger.error(f"❌ Could not create {name}: {e}")
+
+    def setup_schedule(self):
+        """Add a daily job for every hosted cron bot"""
+        for name in self.bot_names:
+            if name not in BOT_JOBS:
+                continue
+            time_env, default_time, weekdays, job, _ = BOT_JOBS[name]
+            at = os.getenv(time_env, default_time)
+            self.scheduler.add_job(ScheduledJob(
+                name, at, functools.partial(self.run_job, name, job), weekdays=weekdays
+            ))
+            self.logger.info(f"📅 {name} bot daily at {at}")
+
+    async def start(self):
+        """Warm up the clients and run the scheduled bots, plus the clock bot when hosted (it stops itself)"""
+        try:
+            await self.warm_up()
+            self.setup_schedule()
+            tasks = [self.scheduler.run()]
+            if 'clock' in self.bot_names:
+                from bots.clock_bot import ClockBot
+                self.clock_bot = ClockBot()
+                tasks.append(self.clock_bot.start())
+            await asyncio.gather(*tasks)
+        except KeyboardInterrupt:
+            self.logger.info("🛑 Received interrupt signal")
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stop the scheduler, wait for running jobs and close the shared clients"""
+        self.scheduler.stop()
+        self.executor.shutdown(wait=True)
+        self.clients.close()
+        self.logger.info("🛑 Bot daemon stopped")
+
+
+def main():
+    """Main entry point"""
+    daemon = BotDaemon()
+    asyncio.run(daemon.start())
+
+
+if __name__ == "__main__":
+    main()
@@ -7,22 +7,32 @@ import asyncio
 import logging
 import os
 import sys
-from datetime import datetime, time as dt_time
-import schedule
-import time
+import functools
+from datetime import datetime
 from pathlib import Path
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-from helpers.tools.paylocity_client import PaylocityClient
+from helpers.tools.browser_actions import BrowserActionQueue
+from helpers.tools.clock_metrics import monitor_event_loop_lag, start_metrics_server
+from helpers.tools.clock_scheduler import ClockScheduler, ScheduledJob, load_calendar, shift_time
+from helpers.tools.paylocity_session import (
+    PaylocitySessionManager, PaylocitySessionError, PaylocityDuplicateActionError
+)
 from helpers.tools.telegram_clock_bot import TelegramClockBot
+from helpers.tools.telegram_notifier import TelegramNotifier
 
 class ClockBot:
     def __init__(self):
         self.logger = self.setup_logging()
-        self.paylocity_client = None
+        # Pool of warm, logged-in browsers shared by scheduled and Telegram actions
+        self.session_manager = PaylocitySessionManager(headless=True)
+        # Scheduled and Telegram actions share one queue, so they never drive the browser at the same time
+        self.action_queue = BrowserActionQueue()
+        # One connection-pooled Telegram client for scheduled notifications and the command bot
+        self.notifier = TelegramNotifier()
         self.telegram_bot = None
         self.is_running = False
         
@@ -32,6 +42,19 @@ class ClockBot:
         self.lunch_start_time = os.getenv('LUNCH_START_TIME', '12:00')
         self.lunch_end_time = os.getenv('LUNCH_END_TIME', '13:00')
         
+        # Launch and log in a standby browser this many minutes before each action time (0 disables)
+        self.prewarm_minutes = int(os.getenv('PAYLOCITY_PREWARM_MINUTES', '5'))
+        
+        # Automatic clock actions stay off unless explicitly enabled
+        self.schedule_enabled = os.getenv('CLOCK_SCHEDULE_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+        self.jitter_minutes = int(os.getenv('CLOCK_JITTER_MINUTES', '0'))
+        # Check the live status this many minutes after each action time to keep the journal honest (0 disables)
+        self.reconcile_minutes = int(os.getenv('CLOCK_RECONCILE_MINUTES', '10'))
+        self.scheduler = ClockScheduler(
+            tz_name=os.getenv('CLOCK_TIMEZONE') or None,
+            holidays=load_calendar(os.getenv('CLOCK_HOLIDAYS_FILE', 'holidays.txt'), os.getenv('CLOCK_PTO_DATES')),
+        )
+        
         self.logger.info("🕐 Clock Bot initialized")
 
     def setup_logging(self):
@@ -53,25 +76,11 @@ class ClockBot:
         try:
             self.logger.info(f"🕐 Starting {display_name}...")
             
-            # Initialize client if needed
-            if not self.paylocity_client:
-                self.paylocity_client = PaylocityClient(headless=True)
-                if not self.paylocity_client.start():
-                    error_msg = f"❌ Failed to start browser for {display_name}"
-                    self.logger.error(error_msg)
-                    await self.send_telegram_notification(error_msg)
-                    return False
-
-            # Login if needed
-            if not self.paylocity_client.login():
-                error_msg = f"❌ Failed to login to Paylocity for {display_name}"
-                self.logger.error(error_msg)
-                await self.send_telegram_notification(error_msg)
-                return False
-
-            # Perform the action
-            action_method = getattr(self.paylocity_client, action_name)
-            success = action_method()
+            # Perform the action over HTTP or on the warm browser session, off the event loop
+            success = await self.action_queue.run(
+                display_name,
+                lambda progress: self.session_manager.run_action(action_name, progress, source='schedule'),
+            )
 
             if success:
                 success_msg = (
@@ -91,6 +100,15 @@ class ClockBot:
                 await self.send_telegram_notification(error_msg)
                 return False
 
+        except PaylocityDuplicateActionError as e:
+            self.logger.info(f"⏭️ {display_name} skipped: {e}")
+            await self.send_telegram_notification(f"⏭️ **{display_name} Skipped:** {e}")
+            return False
+        except PaylocitySessionError as e:
+            error_msg = f"❌ {e} for {display_name}"
+            self.logger.error(error_msg)
+            await self.send_telegram_notification(error_msg)
+            return False
         except Exception as e:
             error_msg = (
                 f"❌ **{display_name} Error:** {str(e)}\n"
@@ -99,86 +117,49 @@ class ClockBot:
             self.logger.error(f"❌ {display_name} error: {e}")
             await self.send_telegram_notification(error_msg)
             return False
-        finally:
-            # Clean up client
-            if self.paylocity_client:
-                self.paylocity_client.close()
-                self.paylocity_client = None
 
     async def send_telegram_notification(self, message: str):
         """Send notification via Telegram"""
         try:
-            if not self.telegram_bot:
-                self.telegram_bot = TelegramClockBot()
-            await self.telegram_bot.send_notification(message)
+            await self.notifier.notify(message)
         except Exception as e:
             self.logger.error(f"❌ Failed to send Telegram notification: {e}")
 
-    def scheduled_clock_in(self):
-        """Scheduled clock in (runs in background thread)"""
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            asyncio.create_task(self.perform_clock_action("clock_in", "Scheduled Clock In"))
-        else:
-            asyncio.run(self.perform_clock_action("clock_in", "Scheduled Clock In"))
-
-    def scheduled_clock_out(self):
-        """Scheduled clock out (runs in background thread)"""
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            asyncio.create_task(self.perform_clock_action("clock_out", "Scheduled Clock Out"))
-        else:
-            asyncio.run(self.perform_clock_action("clock_out", "Scheduled Clock Out"))
-
-    def scheduled_lunch_start(self):
-        """Scheduled lunch start (runs in background thread)"""
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            asyncio.create_task(self.perform_clock_action("start_lunch", "Scheduled Lunch Start"))
-        else:
-            asyncio.run(self.perform_clock_action("start_lunch", "Scheduled Lunch Start"))
-
-    def scheduled_lunch_end(self):
-        """Scheduled lunch end (runs in background thread)"""
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            asyncio.create_task(self.perform_clock_action("end_lunch", "Scheduled Lunch End"))
-        else:
-            asyncio.run(self.perform_clock_action("end_lunch", "Scheduled Lunch End"))
-
     def setup_schedule(self):
-        """Setup cron-like scheduling (DISABLED for manual control only)"""
-        self.logger.info("📅 Scheduled tasks DISABLED - Manual control only")
-        
-        # Clear existing jobs
-        schedule.clear()
+        """Setup the weekday schedule: standby browser warm-ups, plus clock actions when enabled"""
+        actions = [
+            ("clock_in", "Scheduled Clock In", self.clock_in_time),
+            ("start_lunch", "Scheduled Lunch Start", self.lunch_start_time),
+            ("end_lunch", "Scheduled Lunch End", self.lunch_end_time),
+            ("clock_out", "Scheduled Clock Out", self.clock_out_time),
+        ]
         
-        # SCHEDULING DISABLED - Only manual Telegram commands will work
-        # Uncomment the lines below to enable automatic scheduling:
+        for action_name, display_name, action_time in actions:
+            if self.prewarm_minutes:
+                # Early enough for the earliest jittered run; a missed warm-up is not worth catching up
+                # A lead across midnight moves the warm-up to the day before
+                prewarm_time, weekdays = shift_time(action_time, -(self.prewarm_minutes + self.jitter_minutes))
+                self.scheduler.add_job(ScheduledJob(
+                    f"prewarm_{action_name}", prewarm_time, self.prewarm_browser, weekdays=weekdays, catch_up=False
+                ))
+            if self.reconcile_minutes:
+                reconcile_time, weekdays = shift_time(action_time, self.reconcile_minutes + self.jitter_minutes)
+                self.scheduler.add_job(ScheduledJob(
+                    f"reconcile_{action_name}", reconcile_time, self.reconcile_status, weekdays=weekdays, catch_up=False
+                ))
+            if self.schedule_enabled:
+                self.scheduler.add_job(ScheduledJob(
+                    action_name, action_time,
+                    functools.partial(self.perform_clock_action, action_name, display_name),
+                    jitter_minutes=self.jitter_minutes,
+                ))
         
-        # schedule.every().monday.at(self.clock_in_time).do(self.scheduled_clock_in)
-        # schedule.every().tuesday.at(self.clock_in_time).do(self.scheduled_clock_in)
-        # schedule.every().wednesday.at(self.clock_in_time).do(self.scheduled_clock_in)
-        # schedule.every().thursday.at(self.clock_in_time).do(self.scheduled_clock_in)
-        # schedule.every().friday.at(self.clock_in_time).do(self.scheduled_clock_in)
-        
-        # schedule.every().monday.at(self.clock_out_time).do(self.scheduled_clock_out)
-        # schedule.every().tuesday.at(self.clock_out_time).do(self.scheduled_clock_out)
-        # schedule.every().wednesday.at(self.clock_out_time).do(self.scheduled_clock_out)
-        # schedule.every().thursday.at(self.clock_out_time).do(self.scheduled_clock_out)
-        # schedule.every().friday.at(self.clock_out_time).do(self.scheduled_clock_out)
-        
-        # schedule.every().monday.at(self.lunch_start_time).do(self.scheduled_lunch_start)
-        # schedule.every().tuesday.at(self.lunch_start_time).do(self.scheduled_lunch_start)
-        # schedule.every().wednesday.at(self.lunch_start_time).do(self.scheduled_lunch_start)
-        # schedule.every().thursday.at(self.lunch_start_time).do(self.scheduled_lunch_start)
-        # schedule.every().friday.at(self.lunch_start_time).do(self.scheduled_lunch_start)
-        
-        # schedule.every().monday.at(self.lunch_end_time).do(self.scheduled_lunch_end)
-        # schedule.every().tuesday.at(self.lunch_end_time).do(self.scheduled_lunch_end)
-        # schedule.every().wednesday.at(self.lunch_end_time).do(self.scheduled_lunch_end)
-        # schedule.every().thursday.at(self.lunch_end_time).do(self.scheduled_lunch_end)
-        # schedule.every().friday.at(self.lunch_end_time).do(self.scheduled_lunch_end)
+        if self.schedule_enabled:
+            self.logger.info(
+                f"📅 Schedule ENABLED (Mon-Fri, ±{self.jitter_minutes} min, {len(self.scheduler.holidays)} days off): "
+                f"in {self.clock_in_time}, lunch {self.lunch_start_time}-{self.lunch_end_time}, out {self.clock_out_time}"
+            )
+            return
         
         self.logger.info(f"📅 Schedule DISABLED - Use Telegram commands:")
         self.logger.info(f"   /clockin - Clock in manually")
@@ -186,16 +167,39 @@ class ClockBot:
         self.logger.info(f"   /lunchstart - Start lunch manually")
         self.logger.info(f"   /lunchend - End lunch manually")
 
+    async def prewarm_browser(self):
+        """Have a logged-in standby browser waiting for the next action time"""
+        self.logger.info("🔥 Warming up standby browser")
+        # run_in_executor rather than asyncio.to_thread, which needs Python 3.9
+        ready = await asyncio.get_running_loop().run_in_executor(None, self.session_manager.prewarm)
+        self.logger.info(f"🔥 {ready} browser(s) ready")
+
+    async def reconcile_status(self):
+        """Record the live Paylocity status in the journal, so /status can answer from it"""
+        try:
+            status = await self.action_queue.run("Status Check", self.session_manager.reconcile)
+            self.logger.info(f"🔄 Reconciled status: {status}")
+        except PaylocitySessionError as e:
+            self.logger.warning(f"⚠️ Status reconciliation failed: {e}")
+
     async def start_telegram_bot(self):
         """Start the Telegram bot for manual control"""
         try:
-            self.telegram_bot = TelegramClockBot()
+            self.telegram_bot = TelegramClockBot(
+                session_manager=self.session_manager, action_queue=self.action_queue, notifier=self.notifier
+            )
             self.logger.info("📱 Starting Telegram bot...")
             
+            schedule_line = (
+                f"📅 **Scheduling ENABLED** - Mon-Fri at {self.clock_in_time} / {self.lunch_start_time} / "
+                f"{self.lunch_end_time} / {self.clock_out_time}\n\n"
+                if self.schedule_enabled else
+                f"📅 **Scheduling DISABLED** - Manual control only\n\n"
+            )
             # Send startup notification
             await self.send_telegram_notification(
                 "🚀 **Clock Bot Started!**\n"
-                f"📅 **Scheduling DISABLED** - Manual control only\n\n"
+                f"{schedule_line}"
                 f"**Available Commands:**\n"
                 f"• /clockin - Clock in manually\n"
                 f"• /clockout - Clock out manually\n"
@@ -213,11 +217,9 @@ class ClockBot:
             self.logger.error(f"❌ Telegram bot error: {e}")
 
     async def run_scheduler(self):
-        """Run the scheduler in background"""
+        """Run the scheduler in background, sleeping until the next job is due"""
         self.logger.info("⏰ Starting scheduler...")
-        while self.is_running:
-            schedule.run_pending()
-            await asyncio.sleep(1)  # Check every second
+        await self.scheduler.run()
 
     async def start(self):
         """Start the clock bot with both scheduling and Telegram control"""
@@ -225,22 +227,28 @@ class ClockBot:
             self.is_running = True
             self.setup_schedule()
             
+            # Optional metrics endpoint for a local Prometheus scraper (CLOCK_METRICS_PORT)
+            tasks = [self.run_scheduler(), self.start_telegram_bot()]
+            if start_metrics_server():
+                tasks.append(monitor_event_loop_lag())
+            
             # Start both scheduler and Telegram bot concurrently
-            await asyncio.gather(
-                self.run_scheduler(),
-                self.start_telegram_bot()
-            )
+            await asyncio.gather(*tasks)
             
         except KeyboardInterrupt:
             self.logger.info("🛑 Received interrupt signal")
         except Exception as e:
             self.logger.error(f"❌ Clock bot error: {e}")
         finally:
+            await self.notifier.close()
             self.stop()
 
     def stop(self):
         """Stop the clock bot"""
         self.is_running = False
+        self.scheduler.stop()
+        self.action_queue.shutdown()
+        self.session_manager.close()
         self.logger.info("🛑 Clock bot stopped")
 
 def main():
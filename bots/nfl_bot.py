@@ -10,12 +10,16 @@ sys.path.insert(0, project_root)
 from helpers.tools.reddit_parser import RedditParser
 from helpers.tools.odds_api import OddsAPI 
 from helpers.tools.ocr_api import OCRAPI  # Add this import
+from helpers.tools.instrumentation import start_run
+from helpers.tools.run_artifacts import RunArtifacts, read_artifact
 #from helpers.tools.langchain_client import LangChainClient
 
 # Username of the bot, used to filter out its own comments
 BOT_USERNAME = 'sbpotdbot'
-# Path to the folder where all comments will be saved
+# Path to the folder the comment images are downloaded to for OCR
 ANALYZING_RESULT_FOLDER = os.path.join(project_root, "bots", "analyzing_results")
+# Days of earlier runs whose OCR text is reused; prop threads are only commented on for a day or two
+OCR_REUSE_DAYS = int(os.getenv('NFL_OCR_REUSE_DAYS', '3'))
 
 
 def get_nfl_player_prop_posts(reddit_parser, subreddit="sportsbook"):
@@ -39,14 +43,37 @@ def get_nfl_player_prop_posts(reddit_parser, subreddit="sportsbook"):
     
     return nfl_player_prop_posts
 
-def iterate_comments(reddit_parser, post):
+def load_previous_ocr(post):
     """
-    Fetch and iterate through all comments of a given post, saving them in batches of 100.
-    
+    Load the OCR text of the post's images from the artifacts of the past OCR_REUSE_DAYS days.
+
+    :param post: A PRAW submission object
+    :return: A dictionary of image URL to extracted text
+    """
+    since = datetime.date.today() - datetime.timedelta(days=OCR_REUSE_DAYS)
+    rows = read_artifact('ocr', where={'post_id': post.id}, columns=('image_url', 'text'), bot='nfl', since=since)
+    previous = {}
+    for row in rows:
+        # Newest run first, so an image OCR'd again later keeps its latest text
+        previous.setdefault(row['image_url'], row['text'])
+    return previous
+
+
+def iterate_comments(reddit_parser, post, ocr_api=None, artifacts=None):
+    """
+    Fetch and iterate through all comments of a given post, saving them to the run's
+    "comments" artifact and the text of their images to its "ocr" artifact.
+
+    Images already OCR'd by an earlier run are not downloaded again.
+
     :param reddit_parser: An instance of RedditParser
     :param post: A PRAW submission object
+    :param ocr_api: An instance of OCRAPI (created on the first image if not given)
+    :param artifacts: The RunArtifacts of the run (default: new ones)
     """
     comments = RedditParser.fetch_all_comments(post)
+    artifacts = artifacts or RunArtifacts('nfl')
+    previous_ocr = load_previous_ocr(post)
     
     print(f"\nProcessing comments for post: {post.title}")
 
@@ -58,81 +85,85 @@ def iterate_comments(reddit_parser, post):
         current_date = datetime.datetime.now().strftime("%m-%d")
         print(f"Warning: Could not extract date from post title. Using current date: {current_date}")
 
-    file_counter = 1
     comment_counter = 0
+    reused_counter = 0
     
     # Ensure the ANALYZING_RESULT_FOLDER exists
     os.makedirs(ANALYZING_RESULT_FOLDER, exist_ok=True)
 
-    def write_comment_to_file(file, comment):
-        file.write(f"Author: {comment.author}\n")
-        file.write(f"Created UTC: {datetime.datetime.fromtimestamp(comment.created_utc)}\n")
-        file.write(f"Body:\n{comment.body}\n")
-        file.write("-" * 50 + "\n\n")
-
-    current_file = None
-    for comment in comments:
-        # Skip comments by the bot
-        if comment.author and comment.author.name.lower() == BOT_USERNAME.lower():
-            continue
-
-        # Start a new file if we've reached 100 comments or it's the first comment
-        if comment_counter % 100 == 0:
-            if current_file:
-                current_file.close()
-            filename = f"reddit_comments_{current_date}_{file_counter}.txt"
-            file_path = os.path.join(ANALYZING_RESULT_FOLDER, filename)
-            current_file = open(file_path, "w", encoding="utf-8")
-            file_counter += 1
-
-        # Check if the comment body contains a URL matching the specified format
-        url_pattern = r'https://preview\.redd\.it/[a-zA-Z0-9]+\.(png|jpg|jpeg|gif)\?.*'
-        match = re.search(url_pattern, comment.body)
-        if match:
-            image_url = match.group(0)
-            # Generate a unique filename using the comment's ID
-            image_filename = f"reddit_image_{comment.id}.{match.group(1)}"
-            save_path = os.path.join(ANALYZING_RESULT_FOLDER, image_filename)
-            # Download the image
-            reddit_parser.download_image(image_url, save_path)
-
-            # Initialize the OCRAPI
-            ocr_api = OCRAPI()
-
-            # Perform OCR on the downloaded image using the OCRAPI
-            extracted_text = ocr_api.image_to_text(save_path)
-            print(f"OCR result for {image_filename}:")
-            print(extracted_text)
-            print("-" * 50)
-            # Remove the image URL from the comment body
-            print(f"Image processed: {image_filename}\n")
-            comment.body = re.sub(url_pattern, extracted_text, comment.body).strip()
-
-            # Delete the image file after OCR
-            try:
-                os.remove(save_path)
-                print(f"Deleted image file: {save_path}")
-            except OSError as e:
-                print(f"Error deleting image file {save_path}: {e}")
-
-        write_comment_to_file(current_file, comment)
-        comment_counter += 1
-
-    # Close the last file if it's still open
-    if current_file:
-        current_file.close()
-
-    print(f"Processed {comment_counter} comments.")
-    print(f"Comments have been saved to {file_counter - 1} files in: {ANALYZING_RESULT_FOLDER}")
+    with artifacts.writer('comments', stats=('post_id', 'created_utc')) as comments_out, \
+            artifacts.writer('ocr', stats=('post_id',)) as ocr_out:
+        for comment in comments:
+            # Skip comments by the bot
+            if comment.author and comment.author.name.lower() == BOT_USERNAME.lower():
+                continue
+
+            # Check if the comment body contains a URL matching the specified format
+            url_pattern = r'https://preview\.redd\.it/[a-zA-Z0-9]+\.(png|jpg|jpeg|gif)\?.*'
+            match = re.search(url_pattern, comment.body)
+            image_url = None
+            if match and match.group(0) in previous_ocr:
+                image_url = match.group(0)
+                extracted_text = previous_ocr[image_url]
+                reused_counter += 1
+                comment.body = re.sub(url_pattern, extracted_text, comment.body).strip()
+                ocr_out.write({'post_id': post.id, 'comment_id': comment.id, 'image_url': image_url,
+                               'text': extracted_text, 'reused': True})
+            elif match:
+                image_url = match.group(0)
+                # Generate a unique filename using the comment's ID
+                image_filename = f"reddit_image_{comment.id}.{match.group(1)}"
+                save_path = os.path.join(ANALYZING_RESULT_FOLDER, image_filename)
+                # Initialize the OCRAPI once; its connection is reused for every download and OCR call
+                if ocr_api is None:
+                    ocr_api = OCRAPI()
+
+                # Download the image
+                reddit_parser.download_image(image_url, save_path, ocr_api.session)
+
+                # Perform OCR on the downloaded image using the OCRAPI
+                extracted_text = ocr_api.image_to_text(save_path)
+                print(f"OCR result for {image_filename}:")
+                print(extracted_text)
+                print("-" * 50)
+                # Remove the image URL from the comment body
+                print(f"Image processed: {image_filename}\n")
+                comment.body = re.sub(url_pattern, extracted_text, comment.body).strip()
+                ocr_out.write({'post_id': post.id, 'comment_id': comment.id, 'image_url': image_url,
+                               'text': extracted_text, 'reused': False})
+
+                # Delete the image file after OCR
+                try:
+                    os.remove(save_path)
+                    print(f"Deleted image file: {save_path}")
+                except OSError as e:
+                    print(f"Error deleting image file {save_path}: {e}")
+
+            comments_out.write({
+                'post_id': post.id,
+                'thread_date': current_date,
+                'comment_id': comment.id,
+                'author': comment.author.name if comment.author else None,
+                'created_utc': comment.created_utc,
+                'body': comment.body,
+                'image_url': image_url,
+            })
+            comment_counter += 1
+
+    print(f"Processed {comment_counter} comments ({reused_counter} images reused from earlier runs).")
+    print(f"Comments have been saved to: {artifacts.directory}")
     return comments
 
-def get_all_nfl_bovada_odds(odds_api):
-    odds_map = {}
-    current_date = datetime.datetime.now().strftime("%m-%d")
-    odds_file_path = os.path.join(ANALYZING_RESULT_FOLDER, f"bovada_odds_{current_date}.txt")
+def get_all_nfl_bovada_odds(odds_api, artifacts=None):
+    """
+    Fetch the player props of every NFL game on Bovada and save them to the run's "odds" artifact.
 
-    # Ensure the ANALYZING_RESULT_FOLDER exists
-    os.makedirs(ANALYZING_RESULT_FOLDER, exist_ok=True)
+    :param odds_api: An instance of OddsAPI
+    :param artifacts: The RunArtifacts of the run (default: new ones)
+    :return: A dictionary of "<player> - <line> <prop>" to the match and price
+    """
+    odds_map = {}
+    artifacts = artifacts or RunArtifacts('nfl')
 
     def convert_prop_name(key):
         prop_name_map = {
@@ -152,7 +183,7 @@ def get_all_nfl_bovada_odds(odds_api):
         }
         return prop_name_map.get(key, key.replace('_', ' ').title())
 
-    with open(odds_file_path, 'w', encoding='utf-8') as odds_file:
+    with artifacts.writer('odds', stats=('game_id', 'commence_time')) as odds_out:
         try:
             nfl_odds = odds_api.get_nfl_odds_bovada()
             print(f"Number of games returned: {len(nfl_odds)}")
@@ -192,75 +223,94 @@ def get_all_nfl_bovada_odds(odds_api):
                                     'match': match_name,
                                     'price': price
                                 }
-                                # Write the odds line to the file
-                                odds_line = f"{match_name} | {key} | Price: {price}\n"
-                                odds_file.write(odds_line)
+                                odds_out.write({
+                                    'game_id': game['id'],
+                                    'match': match_name,
+                                    'commence_time': commence_time_utc,
+                                    'player': description,
+                                    'market': prop['key'],
+                                    'prop': prop_name,
+                                    'outcome': name,
+                                    'point': point if point != '' else None,
+                                    'price': price,
+                                    'key': key,
+                                })
                     else:
                         print(f"No player props available for {match_name}.")
                 except Exception as e:
                     error_message = f"Error fetching player props for {match_name}: {str(e)}"
                     print(error_message)
-                    odds_file.write(f"{error_message}\n")
-                
-                odds_file.write("\n")  # Add a blank line between games
+                    artifacts.add_error(error_message)
         except Exception as e:
             error_message = f"Error fetching NFL odds: {str(e)}"
             print(error_message)
-            odds_file.write(f"{error_message}\n")
+            artifacts.add_error(error_message)
 
-    print(f"Odds have been saved to: {odds_file_path}")
+    print(f"Odds have been saved to: {artifacts.directory}")
     return odds_map
 
 
 # Example usage in main function:
-def main():
-    # Initialize RedditParser
-    reddit_parser = RedditParser()
-    # Initialize OddsAPI
-    odds_api = OddsAPI()
-    # Initialize LangChainClient
-    #langchain_client = LangChainClient(model_name="gpt-3.5-turbo")
-
-    # Get NFL Player prop posts
-    nfl_prop_posts = get_nfl_player_prop_posts(reddit_parser)
-    print(f"\nFound {len(nfl_prop_posts)} NFL Player prop posts:")
-    post = None
-    for post in nfl_prop_posts:
-        print(f"Title: {post.title}")
-        print(f"URL: {post.url}")
-        print("---")
-    # Get today's date in the format "MM/DD" or "M/D"
-    today = datetime.datetime.now().strftime("%-m/%-d")
-
-    # Find the most recent date before the main loop
-    most_recent_date = None
-    for p in nfl_prop_posts:
-        date_match = re.search(r'(\d{1,2}/\d{1,2})', p.title)
-        if date_match:
-            post_date = datetime.datetime.strptime(date_match.group(1), "%m/%d").replace(year=datetime.datetime.now().year)
-            if most_recent_date is None or post_date > most_recent_date:
-                most_recent_date = post_date
-
-    most_recent_date_str = most_recent_date.strftime("%-m/%-d") if most_recent_date else None
-    #most_recent_date_str = "10/21"  # Note: This line overwrites the actual most recent date
-    print(f"Most recent date: {most_recent_date_str}")
-
-    # Get all NFL Bovada odds
-    print("\nFetching all NFL Bovada odds...")
-    odds_map = get_all_nfl_bovada_odds(odds_api)
-    print("Finished fetching NFL Bovada odds.")
-
-    # Iterate through NFL prop posts
-    for post in nfl_prop_posts:
-        title_lower = post.title.lower()
-        
-        # Check if the post title contains the most recent date
-        if most_recent_date_str and most_recent_date_str.lower() in title_lower:
-            print(f"\nProcessing post: {post.title}")
+def main(reddit_parser=None, odds_api=None, ocr_api=None):
+    """
+    Fetch the NFL odds and save the comments of the latest NFL player prop posts.
+
+    The clients are created when not given; the bot daemon passes its shared ones.
+
+    :param reddit_parser: An instance of RedditParser
+    :param odds_api: An instance of OddsAPI
+    :param ocr_api: An instance of OCRAPI
+    """
+    with start_run('nfl'):
+        # Initialize RedditParser
+        reddit_parser = reddit_parser or RedditParser()
+        # Initialize OddsAPI
+        odds_api = odds_api or OddsAPI()
+        # Comments, OCR text and odds of the run go to one dated run directory
+        artifacts = RunArtifacts('nfl')
+        # Initialize LangChainClient
+        #langchain_client = LangChainClient(model_name="gpt-3.5-turbo")
+
+        # Get NFL Player prop posts
+        nfl_prop_posts = get_nfl_player_prop_posts(reddit_parser)
+        print(f"\nFound {len(nfl_prop_posts)} NFL Player prop posts:")
+        post = None
+        for post in nfl_prop_posts:
+            print(f"Title: {post.title}")
             print(f"URL: {post.url}")
-            iterate_comments(reddit_parser, post)
-            print("-" * 40)
-            print("\n" + "=" * 50 + "\n")  # Separator after all comments
+            print("---")
+        # Get today's date in the format "MM/DD" or "M/D"
+        today = datetime.datetime.now().strftime("%-m/%-d")
+
+        # Find the most recent date before the main loop
+        most_recent_date = None
+        for p in nfl_prop_posts:
+            date_match = re.search(r'(\d{1,2}/\d{1,2})', p.title)
+            if date_match:
+                post_date = datetime.datetime.strptime(date_match.group(1), "%m/%d").replace(year=datetime.datetime.now().year)
+                if most_recent_date is None or post_date > most_recent_date:
+                    most_recent_date = post_date
+
+        most_recent_date_str = most_recent_date.strftime("%-m/%-d") if most_recent_date else None
+        #most_recent_date_str = "10/21"  # Note: This line overwrites the actual most recent date
+        print(f"Most recent date: {most_recent_date_str}")
+
+        # Get all NFL Bovada odds
+        print("\nFetching all NFL Bovada odds...")
+        odds_map = get_all_nfl_bovada_odds(odds_api, artifacts)
+        print("Finished fetching NFL Bovada odds.")
+
+        # Iterate through NFL prop posts
+        for post in nfl_prop_posts:
+            title_lower = post.title.lower()
+        
+            # Check if the post title contains the most recent date
+            if most_recent_date_str and most_recent_date_str.lower() in title_lower:
+                print(f"\nProcessing post: {post.title}")
+                print(f"URL: {post.url}")
+                iterate_comments(reddit_parser, post, ocr_api, artifacts)
+                print("-" * 40)
+                print("\n" + "=" * 50 + "\n")  # Separator after all comments
 
 
 if __name__ == "__main__":
@@ -3,7 +3,6 @@ import sys
 import os
 import datetime 
 import re 
-import emoji
 import pytz
 
 
@@ -14,12 +13,24 @@ sys.path.insert(0, project_root)
 from helpers.tools.reddit_parser import RedditParser
 from helpers.tools.telegram_bot_client import TelegramBotClient 
 from helpers.tools.openai_client import OpenAIClient 
+from helpers.tools.potd_parser import parse_potd_comments, group_picks_by_event, rank_consensus, format_consensus_table
+from helpers.tools.capper_db import CapperDB, SCORE_DAYS_FROM
+from helpers.tools.odds_api import OddsAPI
+from helpers.tools.prompt_packer import PromptPacker
+from helpers.tools.comment_normalizer import normalize_comments, demojize
+from helpers.tools.instrumentation import span, start_run
+from helpers.tools.run_artifacts import RunArtifacts
 
 
 # Username of the bot, used to filter out its own comments
 BOT_USERNAME = 'sbpotdbot'
-# Path to the folder where all comments will be saved
-POTD_DATA_FOLDER = os.path.join(project_root, "bots", "potd_data")
+# Path to the capper track-record database
+CAPPER_DB_PATH = os.getenv('CAPPER_DB_PATH', os.path.join(project_root, "bots", "potd_history", "cappers.db"))
+# Below this many parsed picks the raw comments are uploaded to the assistant instead
+MIN_PARSED_PICKS = 3
+# Token budget of the content sent to the model per call, and of a single comment
+POTD_PROMPT_TOKEN_BUDGET = int(os.getenv('POTD_PROMPT_TOKEN_BUDGET', '12000'))
+POTD_MAX_COMMENT_TOKENS = int(os.getenv('POTD_MAX_COMMENT_TOKENS', '600'))
 
 def get_potd_posts(reddit_parser, subreddit="sportsbook"):
     """
@@ -67,37 +78,53 @@ def extract_date_from_title(title):
 
 
     
-def save_comments_to_file(comments, file_name):
+def save_comments_to_file(comments, file_name, artifacts, prompt_packer=None):
     """
-    Save the comments of a post to a file.
+    Save the comments of a post as a text file in the run directory, for the assistant's vector store.
 
     :param comments: A list of comments to save
     :param file_name: The name of the file to save the comments in
+    :param artifacts: The RunArtifacts of the run
+    :param prompt_packer: An optional PromptPacker; when given, deleted comments, one-liners
+                          and sign-offs are dropped and the file is packed to its token budget
+    :return: The path of the file
     """
-    # Create a folder for the post's comments
-    post_folder = os.path.join(POTD_DATA_FOLDER)
-    os.makedirs(post_folder, exist_ok=True)
+    # Demojize, strip blank lines and format the PST (America/Los_Angeles) times in one batch,
+    # skipping comments by the bot
+    normalized = normalize_comments(comments, exclude_authors=[BOT_USERNAME], tz_name='America/Los_Angeles')
+    headers = [f"Author: {comment['author']}\nCreated PST: {comment['created']}\n" for comment in normalized]
+    bodies = [comment['body'] for comment in normalized]
 
-    # Set the timezone to PST (America/Los_Angeles)
-    pst = pytz.timezone('America/Los_Angeles')
+    separator = "\n\n" + "=" * 90 + "\n\n"
+    if prompt_packer:
+        content, _ = prompt_packer.pack(bodies, headers=headers, max_item_tokens=POTD_MAX_COMMENT_TOKENS, separator=separator)
+    else:
+        content = separator.join(header + body for header, body in zip(headers, bodies))
 
     # Save all comments to the file
-    file_path = os.path.join(post_folder, file_name)
-    with open(file_path, "w") as file:
-        for comment in comments:
-            # Skip comments by the bot
-            if comment.author and comment.author.name.lower() == BOT_USERNAME.lower():
-                continue
-            
-            author = comment.author.name if comment.author else 'Unknown'
-            created_time = datetime.datetime.fromtimestamp(comment.created_utc).strftime("%Y-%m-%d %H:%M:%S")
-            comment_body = convert_emojis_to_text(comment.body)
-            comment_body = "\n".join([line for line in comment_body.splitlines() if line.strip() != ""])
-            file.write(f"Author: {author}\n")
-            pst_time = datetime.datetime.fromtimestamp(comment.created_utc, pst).strftime("%Y-%m-%d %H:%M:%S")
-            file.write(f"Created PST: {pst_time}\n")
-            file.write(f"{comment_body}\n")
-            file.write("\n" + "=" * 90 + "\n\n")
+    return artifacts.write_text(file_name, content + separator)
+
+
+def save_comment_rows(comments, thread_id, artifacts):
+    """
+    Save the comments of the POTD post to the run's "comments" artifact.
+
+    :param comments: A list of comments from the POTD post
+    :param thread_id: The Reddit ID of the POTD post
+    :param artifacts: The RunArtifacts of the run
+    :return: The number of comments saved
+    """
+    return artifacts.write('comments', (
+        {
+            'post_id': thread_id,
+            'comment_id': comment.id,
+            'author': comment.author.name if comment.author else None,
+            'created_utc': comment.created_utc,
+            'body': comment.body,
+        }
+        for comment in comments
+        if not (comment.author and comment.author.name.lower() == BOT_USERNAME.lower())
+    ), stats=('post_id', 'created_utc'))
 
 def convert_emojis_to_text(comment):
     """
@@ -106,13 +133,10 @@ def convert_emojis_to_text(comment):
     :param comment: The comment string containing emojis
     :return: The comment string with emojis converted to text
     """
-    return emoji.demojize(comment)
+    return demojize(comment)
  
-def create_potd_assistant(openai_client):
-     # Create an assistant                         
-     assistant = openai_client.create_assistant(   
-         assistant_name="potd_assistant",          
-         instructions="""
+# Instructions shared by the POTD assistant and the consensus table prompt
+POTD_ASSISTANT_INSTRUCTIONS = """
     # CONTEXT #
     You are a sports betting advisor with the latest information on all teams and players across all sports.
     I will provide you with a list of suggestions for the Pick of the Day (POTD) from various sports betting advisors.
@@ -153,51 +177,167 @@ def create_potd_assistant(openai_client):
     When you provide the bet(s), ensure they are from the sporting events that have not yet occurred.
     Check the results of the sporting events before offering the bet. If the event has already taken place, do not include it in your response.
     If there are multiple bets, present them as bullet points."""
+
+# Prepended to the query when the picks were pre-aggregated locally
+POTD_TABLE_PREAMBLE = """The suggestions have already been parsed and grouped by sporting event.
+Each row of the table below is one side of an event. "Backers" are the authors who picked it, "Against"
+are the authors who picked another side of the same event (CONFLICT marks such events), and "Score"
+is the support weighted by each author's self-reported track record minus the weighted opposition.
+Rows are ranked by score, best first."""
+
+def create_potd_assistant(openai_client):
+     # Create an assistant                         
+     assistant = openai_client.create_assistant(   
+         assistant_name="potd_assistant",          
+         instructions=POTD_ASSISTANT_INSTRUCTIONS
      )
      return assistant
                                                                                                                               
 
-# Example usage in main function:
-def main():
-    # Initialize RedditParser                                                                                                
-    reddit_parser = RedditParser()                                                                                           
-    # Initialize OpenAIClient                     
-    openai_client = OpenAIClient()    
-    # Initialize TelegramBotClient
-    telegram_bot_client = TelegramBotClient()            
-                
-    potd_posts = get_potd_posts(reddit_parser)                                                                               
-    print(f"\nFound {len(potd_posts)} POTD posts today:")   
-    # get first post
-    latest_post = potd_posts[0]                                                                 
-    print(f"Title: {latest_post.title}")                                                                              
-    comments = reddit_parser.fetch_all_comments(latest_post)
-    # Generate the file name from the post title
-    file_name = latest_post.title.replace(" ", "-").replace("/", "-") + ".txt"
-    save_comments_to_file(comments, file_name)   
-                                
+def build_consensus_table(comments, capper_db, thread_id):
+    """
+    Parse the POTD comments locally, store them in the capper database and build the
+    ranked consensus table, weighting each author by their stored track record.
+
+    :param comments: A list of comments from the POTD post
+    :param capper_db: An instance of CapperDB
+    :param thread_id: The Reddit ID of the POTD post
+    :return: A tuple (number of parsed picks, table as a string)
+    """
+    picks = parse_potd_comments(comments, exclude_authors=[BOT_USERNAME])
+    groups = group_picks_by_event(picks)
+    capper_db.update_from_picks(thread_id, picks)
+    ranked = rank_consensus(groups, weight=capper_db.pick_weight)
+    return len(picks), format_consensus_table(ranked)
+
+
+def grade_stored_picks(capper_db, odds_api):
+    """
+    Fetch the final scores of the sports the ungraded picks are on and grade the picks,
+    so authors are weighted by their graded record once they have enough graded picks.
+
+    :param capper_db: An instance of CapperDB
+    :param odds_api: An instance of OddsAPI
+    :return: The number of picks graded
+    """
+    graded = 0
+    for sport in sorted(capper_db.ungraded_sports()):
+        try:
+            graded += capper_db.record_scores(odds_api.get_scores(sport, days_from=SCORE_DAYS_FROM))
+        except Exception as e:
+            print(f"Error fetching {sport} scores: {e}")
+    print(f"Graded {graded} stored picks")
+    return graded
+
+
+def ask_with_comment_files(openai_client, telegram_bot_client, prompt_packer, comments, file_name, query, artifacts):
+    """
+    Upload the raw comments to the assistant's vector store and stream its answer.
+
+    Used when too few comments follow the usual POTD template to build a consensus table.
+
+    :param openai_client: An instance of OpenAIClient
+    :param telegram_bot_client: An instance of TelegramBotClient
+    :param prompt_packer: An instance of PromptPacker
+    :param comments: A list of comments from the POTD post
+    :param file_name: The name of the file to save the comments in
+    :param query: The question for the assistant
+    :param artifacts: The RunArtifacts of the run
+    :return: The assistant's response
+    """
+    file_paths = [save_comments_to_file(comments, file_name, artifacts, prompt_packer)]
+
     # Create an assistant                         
     assistant = create_potd_assistant(openai_client)   
-    # Get all file paths under POTD_DATA_FOLDER
-    file_paths = [os.path.join(POTD_DATA_FOLDER, file) for file in os.listdir(POTD_DATA_FOLDER) if os.path.isfile(os.path.join(POTD_DATA_FOLDER, file))]
     # Create Vector Store
     openai_client.create_vector_store_for_assistant_with_file_paths(assistant.id, "potd_vector_store", file_paths)
 
-    # Ask the important question to the assistant
-    query = "What are the best bet(s) for today or tomorrow?"
-    
-    response = openai_client.query_assistant(assistant.id, query)
-    print(f"Assistant Response: {response}")
+    # Stream the answer straight into Telegram while the assistant is still writing it
+    response = telegram_bot_client.stream_message(
+        openai_client.stream_assistant(assistant.id, query), prefix="POTD Assistant: "
+    )
     
     openai_client.delete_all_vector_stores()
-    
-    # Remove all files in POTD_DATA_FOLDER
-    for file in file_paths:
-        os.remove(file)
-    print("All files in POTD_DATA_FOLDER have been removed.")
+    return response
 
-     
-    telegram_bot_client.send_message(f"POTD Assistant: {response}")
+
+# Example usage in main function:
+def main(reddit_parser=None, openai_client=None, telegram_bot_client=None, odds_api=None):
+    """
+    Ask the assistant for today's best bets from the latest POTD thread and send the answer to Telegram.
+
+    The clients are created when not given; the bot daemon passes its shared ones.
+
+    :param reddit_parser: An instance of RedditParser
+    :param openai_client: An instance of OpenAIClient
+    :param telegram_bot_client: An instance of TelegramBotClient
+    :param odds_api: An instance of OddsAPI, to grade the stored picks (skipped without ODDS_API_KEY)
+    """
+    with start_run('potd'):
+        # Initialize RedditParser                                                                                                
+        reddit_parser = reddit_parser or RedditParser()                                                                          
+        # Initialize OpenAIClient                     
+        openai_client = openai_client or OpenAIClient()    
+        # Initialize TelegramBotClient
+        telegram_bot_client = telegram_bot_client or TelegramBotClient()            
+        # Initialize OddsAPI
+        if odds_api is None:
+            try:
+                odds_api = OddsAPI()
+            except ValueError as e:
+                print(f"Not grading stored picks: {e}")
+        # Initialize PromptPacker
+        prompt_packer = PromptPacker(POTD_PROMPT_TOKEN_BUDGET)
+        # Comments and the answer of the run go to one dated run directory
+        artifacts = RunArtifacts('potd')
+                
+        potd_posts = get_potd_posts(reddit_parser)                                                                               
+        print(f"\nFound {len(potd_posts)} POTD posts today:")   
+        # get first post
+        latest_post = potd_posts[0]                                                                 
+        print(f"Title: {latest_post.title}")                                                                              
+        comments = reddit_parser.fetch_all_comments(latest_post)
+        save_comment_rows(comments, latest_post.id, artifacts)
+
+        # Ask the important question to the assistant
+        query = "What are the best bet(s) for today or tomorrow?"
+
+        # Pre-aggregate the picks locally so only a compact table goes to the model
+        capper_db = CapperDB(CAPPER_DB_PATH)
+        try:
+            if odds_api:
+                grade_stored_picks(capper_db, odds_api)
+            with span('consensus') as current:
+                pick_count, table = build_consensus_table(comments, capper_db, latest_post.id)
+                current.add(items=pick_count)
+        finally:
+            capper_db.close()
+        print(f"Parsed {pick_count} picks from {len(comments)} comments")
+
+        if pick_count >= MIN_PARSED_PICKS:
+            table = prompt_packer.truncate(table)
+            print(f"Consensus table:\n{table}")
+            mode = 'consensus_table'
+            response = telegram_bot_client.stream_message(
+                openai_client.stream_completion(
+                    POTD_ASSISTANT_INSTRUCTIONS, f"{POTD_TABLE_PREAMBLE}\n\n{table}\n\n{query}"
+                ),
+                prefix="POTD Assistant: "
+            )
+        else:
+            mode = 'assistant_files'
+            # Generate the file name from the post title
+            file_name = latest_post.title.replace(" ", "-").replace("/", "-") + ".txt"
+            response = ask_with_comment_files(openai_client, telegram_bot_client, prompt_packer, comments, file_name, query, artifacts)
+        print(f"Assistant Response: {response}")
+        artifacts.write('llm_results', [{
+            'post_id': latest_post.id,
+            'title': latest_post.title,
+            'mode': mode,
+            'parsed_picks': pick_count,
+            'query': query,
+            'response': response,
+        }], stats=('post_id',))
     
 if __name__ == "__main__":
     main()
\ No newline at end of file
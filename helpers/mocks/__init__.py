@@ -0,0 +1 @@
+# Empty file - import modules directly where needed to avoid eager loading
@@ -0,0 +1,141 @@
+"""
+Paylocity Mock Server
+Serves synthetic Paylocity timekeeping responses on localhost for testing the HTTP client.
+The responses follow the client's assumed endpoints, not captured Paylocity traffic
+
+Usage: python helpers/mocks/paylocity_mock_server.py [--port 8765] [--state clocked_out]
+Then point the client at it with PAYLOCITY_HTTP_BASE_URL=http://127.0.0.1:8765
+"""
+
+import argparse
+import json
+import os
+import threading
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'paylocity_responses.json')
+
+
+class PaylocityMockServer(ThreadingHTTPServer):
+    def __init__(self, port=0, fixture_path=FIXTURE_PATH, state='clocked_out'):
+        """
+        A local server answering like Paylocity's timekeeping endpoints.
+
+        Responses are taken from the fixture file and matched on method, path, punch type and the
+        current clock state; a successful punch moves the state on, like the real account would.
+
+        :param port: The port to listen on (0 picks a free one)
+        :param fixture_path: The JSON file with the synthetic responses
+        :param state: The initial clock state, e.g. "clocked_out"
+        """
+        with open(fixture_path) as file:
+            self.fixtures = json.load(file)
+        self.state = state
+        self.session_valid = True
+        # (method, path, punch type) of every request, for assertions
+        self.requests = []
+        self.lock = threading.Lock()
+        self.thread = None
+        super().__init__(('127.0.0.1', port), PaylocityMockHandler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def expire_session(self):
+        """Answer every following request like Paylocity does after the login expired"""
+        self.session_valid = False
+
+    def find_response(self, method, path, punch_type):
+        """Return the fixture response for a request and apply its state change"""
+        with self.lock:
+            self.requests.append((method, path, punch_type))
+            for response in self.fixtures['responses']:
+                if response['method'] != method or response['path'] != path:
+                    continue
+                if response.get('punch_type', punch_type) != punch_type:
+                    continue
+                if response.get('state', self.state) != self.state:
+                    continue
+                self.state = response.get('next_state', self.state)
+                return response
+        return {'status': 404, 'body': {'message': f"No fixture response for {method} {path}"}}
+
+    def start(self):
+        """Serve in a background thread, returns the server"""
+        self.thread = threading.Thread(target=self.serve_forever, name="paylocity-mock", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class PaylocityMockHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _is_authorized(self, method):
+        fixtures = self.server.fixtures
+        cookies = SimpleCookie(self.headers.get('Cookie', ''))
+        if not self.server.session_valid or fixtures['required_cookie'] not in cookies:
+            return False
+        # Like the real site, writes need the anti-forgery cookie echoed in a header
+        csrf_cookie = cookies.get(fixtures['csrf_cookie'])
+        if method != 'GET' and csrf_cookie and self.headers.get('X-XSRF-TOKEN') != csrf_cookie.value:
+            return False
+        return True
+
+    def _reply(self, response):
+        body = response.get('body')
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.send_response(response['status'])
+        for name, value in response.get('headers', {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, method):
+        if not self._is_authorized(method):
+            self._reply(self.server.fixtures['unauthorized'])
+            return
+        punch_type = None
+        if method == 'POST':
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                punch_type = json.loads(self.rfile.read(length) or b'{}').get('punchType')
+            except ValueError:
+                self._reply({'status': 400, 'body': {'message': 'Invalid JSON'}})
+                return
+        self._reply(self.server.find_response(method, self.path, punch_type))
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic Paylocity responses on localhost")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--state', default='clocked_out', choices=['clocked_out', 'clocked_in', 'on_lunch'])
+    parser.add_argument('--fixtures', default=FIXTURE_PATH)
+    args = parser.parse_args()
+
+    server = PaylocityMockServer(args.port, args.fixtures, args.state)
+    print(f"Paylocity mock server listening on {server.url} (state: {server.state})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
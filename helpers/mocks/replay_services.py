@@ -0,0 +1,530 @@
+"""
+Offline Replay Services
+In-process stand-ins for Reddit, the Odds API, OCR.space, OpenAI and Telegram that answer
+from recorded fixtures with a simulated latency, so the bots can run end to end offline
+
+The stand-ins go behind the real clients of helpers/tools:
+    set_reddit(services.reddit)                      # RedditParser
+    OddsAPI(services.http_session)                   # odds, image downloads
+    OCRAPI(services.http_session)                    # OCR.space
+    OpenAIClient(services.openai)
+    TelegramBotClient(services.telegram_bot)
+"""
+
+import datetime
+import itertools
+import json
+import os
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+import pytz
+import requests
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'replay_fixtures.json')
+
+# Seconds each call takes by default, roughly what the live services answer in
+DEFAULT_LATENCY = {
+    'reddit_listing': 0.4,    # one search or listing request
+    'reddit_more': 0.3,       # one "load more comments" request (up to 100 comments)
+    'odds': 0.2,
+    'image': 0.05,
+    'ocr': 0.4,
+    'llm': 0.5,               # time to the first token
+    'llm_token': 0.004,       # every further generated (or reasoning) token
+    'vector_store': 2.0,
+    'telegram': 0.05,
+}
+# Rough number of characters per token, to fake the usage of a completion
+CHARS_PER_TOKEN = 4
+# Reasoning models spend this many hidden tokens per visible one, by reasoning effort
+REASONING_TOKENS_PER_TOKEN = {'minimal': 0, 'low': 1, 'medium': 3, 'high': 6}
+# Smaller models generate faster: their share of the llm_token latency
+MODEL_TOKEN_LATENCY = {'gpt-5-nano': 0.3, 'gpt-5-mini': 0.5, 'gpt-4o-mini': 0.5}
+REPLIES = ["Tailing 🔥", "GL", "Fading this one", "What are the odds on this?", "Cashed yesterday, riding again"]
+# A small fake PNG; large enough to be measurable, small enough to stay under the OCR size limit
+IMAGE_BYTES = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 256
+
+
+def load_fixtures(path=None):
+    """
+    Load the recorded responses.
+
+    :param path: The JSON fixture file (default: fixtures/replay_fixtures.json); recordings of the
+                 live services in the same format can be dropped in
+    :return: The fixtures as a dictionary
+    """
+    with open(path or FIXTURE_PATH, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def estimate_tokens(text):
+    return max(len(text) // CHARS_PER_TOKEN, 1)
+
+
+class ReplayServices:
+    def __init__(self, fixtures=None, comments=300, posts=12, latency=None, latency_scale=1.0):
+        """
+        :param fixtures: The fixtures from load_fixtures() (default: the bundled ones)
+        :param comments: Top-level comments of each generated POTD and NFL prop thread
+        :param posts: Number of r/AppIdeas posts of the past 24 hours
+        :param latency: Seconds per call by service, overriding DEFAULT_LATENCY
+        :param latency_scale: Multiplier for every latency (0 runs as fast as possible)
+        """
+        self.fixtures = fixtures or load_fixtures()
+        self.comment_count = comments
+        self.post_count = posts
+        self.latency = dict(DEFAULT_LATENCY, **(latency or {}))
+        self.latency_scale = latency_scale
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.reddit = FakeReddit(self)
+        self.http_session = FakeHTTPSession(self)
+        self.openai = FakeOpenAI(self)
+        self.telegram_bot = FakeTelegramBot(self)
+
+    def count(self, name):
+        with self.lock:
+            self.calls[name] += 1
+
+    def wait(self, service, units=1):
+        """Count a call to a service and sleep for its simulated latency"""
+        self.count(service)
+        delay = self.latency.get(service, 0.0) * units * self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+
+    def sleep(self, service, units=1):
+        """Sleep for a latency without counting a call, e.g. per generated token"""
+        delay = self.latency.get(service, 0.0) * units * self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+
+    def reset(self):
+        """Forget the calls counted so far, e.g. between two bot runs"""
+        with self.lock:
+            self.calls.clear()
+        self.telegram_bot.messages.clear()
+
+
+# Reddit (PRAW)
+
+class FakeRedditor:
+    def __init__(self, name):
+        self.name = name
+
+    def __str__(self):
+        return self.name
+
+
+class FakeCommentForest:
+    def __init__(self, services, comments=None, more_pages=0):
+        """
+        :param comments: The comments of the forest, or a callable building them on first use
+        :param more_pages: "Load more comments" requests replace_more() has to make
+        """
+        self.services = services
+        self._comments = comments
+        self.more_pages = more_pages
+
+    @property
+    def comments(self):
+        if callable(self._comments):
+            self._comments = self._comments()
+        return self._comments or []
+
+    def replace_more(self, limit=32):
+        for _ in range(self.more_pages):
+            self.services.wait('reddit_more')
+        self.more_pages = 0
+        return []
+
+    def __iter__(self):
+        return iter(self.comments)
+
+    def __len__(self):
+        return len(self.comments)
+
+
+class FakeComment:
+    def __init__(self, services, comment_id, author, body, created_utc, replies=()):
+        self.id = comment_id
+        self.author = FakeRedditor(author) if author else None
+        self.body = body
+        self.created_utc = created_utc
+        self.replies = FakeCommentForest(services, list(replies))
+
+
+class FakeSubmission:
+    def __init__(self, services, submission_id, title, created_utc, comments=None, comment_count=0,
+                 selftext='', url='', author='op', score=1, num_comments=0, link_flair_text=None):
+        """
+        :param comments: A callable building the top-level comments when the post's comments are loaded
+        :param comment_count: The number of top-level comments, for the "load more" requests
+        """
+        self.id = submission_id
+        self.title = title
+        self.created_utc = created_utc
+        self.selftext = selftext
+        self.url = url or f"https://www.reddit.com/r/sportsbook/comments/{submission_id}/"
+        self.author = FakeRedditor(author) if author else None
+        self.score = score
+        self.num_comments = num_comments or comment_count
+        self.permalink = f"/r/replay/comments/{submission_id}/"
+        self.link_flair_text = link_flair_text
+        # The first request returns about 200 comments, every "load more" request up to 100
+        self.comments = FakeCommentForest(services, comments or [], (max(comment_count - 200, 0) + 99) // 100)
+
+
+class FakeSubreddit:
+    def __init__(self, services, name):
+        self.services = services
+        self.name = name
+
+    def search(self, query, sort='relevance', time_filter='all', **kwargs):
+        self.services.wait('reddit_listing')
+        if 'flair:"POTD"' in query:
+            return iter(self.services.reddit.potd_posts())
+        return iter(self.services.reddit.nfl_posts() + self.services.reddit.potd_posts())
+
+    def new(self, limit=100):
+        self.services.wait('reddit_listing')
+        return iter(self.services.reddit.appideas_posts()[:limit])
+
+
+class FakeReddit:
+    def __init__(self, services):
+        """Serves generated threads: a POTD thread, NFL player prop threads and r/AppIdeas posts"""
+        self.services = services
+        self.ids = itertools.count(1)
+
+    def subreddit(self, name):
+        return FakeSubreddit(self.services, name)
+
+    def _comments(self, samples, count, created_utc, first_author=None):
+        """Build a thread of count top-level comments cycling through the sample bodies"""
+        def build():
+            comments = []
+            authors = max(count // 3, 1)
+            if first_author:
+                comments.append(FakeComment(self.services, f"c{next(self.ids)}", first_author,
+                                            "Welcome to the thread, post your pick below.", created_utc))
+            for i in range(count):
+                replies = [
+                    FakeComment(self.services, f"c{next(self.ids)}", f"reply_user_{(i + j) % 50}",
+                                REPLIES[(i + j) % len(REPLIES)], created_utc + i * 30 + j)
+                    for j in range(i % 3)
+                ]
+                comments.append(FakeComment(
+                    self.services, f"c{next(self.ids)}", f"capper_{i % authors}",
+                    samples[i % len(samples)].replace('{i}', str(i)), created_utc + i * 30, replies
+                ))
+            return comments
+        return build
+
+    def potd_posts(self):
+        pst = pytz.timezone('America/Los_Angeles')
+        now = datetime.datetime.now(pst)
+        posts = []
+        for days_ago in (0, 1):
+            day = now - datetime.timedelta(days=days_ago)
+            created_utc = day.replace(hour=0, minute=1).timestamp()
+            posts.append(FakeSubmission(
+                self.services, f"potd{days_ago}", f"Pick of the Day - {day.strftime('%-m/%-d/%y')} ({day.strftime('%A')})",
+                created_utc, self._comments(self.services.fixtures['potd_comments'], self.services.comment_count,
+                                            created_utc, first_author='sbpotdbot'),
+                comment_count=self.services.comment_count, link_flair_text='POTD', author='sbpotdbot'
+            ))
+        return posts
+
+    def nfl_posts(self):
+        now = datetime.datetime.now()
+        posts = []
+        for days_ago in (0, 7):
+            day = now - datetime.timedelta(days=days_ago)
+            created_utc = day.replace(hour=6, minute=0).timestamp()
+            posts.append(FakeSubmission(
+                self.services, f"nfl{days_ago}", f"NFL Player Props {day.strftime('%-m/%-d')} ({day.strftime('%A')})",
+                created_utc, self._comments(self.services.fixtures['nfl_comments'], self.services.comment_count, created_utc),
+                comment_count=self.services.comment_count, author='sbpotdbot'
+            ))
+        return posts
+
+    def appideas_posts(self):
+        samples = self.services.fixtures['appideas_posts']
+        now = time.time()
+        posts = []
+        for i in range(self.services.post_count):
+            sample = samples[i % len(samples)]
+            posts.append(FakeSubmission(
+                self.services, f"idea{i}", sample['title'], now - (i + 1) * 3600 * 20 / max(self.services.post_count, 1),
+                selftext=sample['selftext'], url=sample['url'], author=f"founder_{i}",
+                score=sample['score'], num_comments=sample['num_comments']
+            ))
+        return posts
+
+
+# Plain HTTP APIs (Odds API, image downloads, OCR.space)
+
+class FakeResponse:
+    def __init__(self, status_code=200, json_data=None, content=None, headers=None):
+        self.status_code = status_code
+        self._json = json_data
+        self.content = content if content is not None else json.dumps(json_data).encode()
+        self.headers = headers or {}
+
+    @property
+    def text(self):
+        return self.content.decode(errors='replace')
+
+    def json(self):
+        return self._json if self._json is not None else json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+
+class FakeHTTPSession:
+    def __init__(self, services):
+        """A requests.Session stand-in answering the Odds API, preview.redd.it and OCR.space"""
+        self.services = services
+        self.requests_remaining = 500
+
+    def _odds_response(self, payload):
+        self.requests_remaining -= 1
+        return FakeResponse(json_data=payload, headers={'x-requests-remaining': str(self.requests_remaining)})
+
+    def games(self):
+        today = datetime.datetime.utcnow().date()
+        return [
+            {
+                'id': f"event{i}",
+                'sport_key': 'americanfootball_nfl',
+                'commence_time': f"{today.isoformat()}T{game['hour']:02d}:00:00Z",
+                'home_team': game['home_team'],
+                'away_team': game['away_team'],
+                'bookmakers': [],
+            }
+            for i, game in enumerate(self.services.fixtures['nfl_games'])
+        ]
+
+    def player_props(self, event_id):
+        fixtures = self.services.fixtures
+        index = int(event_id.replace('event', '') or 0)
+        players = fixtures['nfl_players'][index * 4:index * 4 + 4] or fixtures['nfl_players'][:4]
+        markets = []
+        for key, (point, over_price, under_price) in fixtures['nfl_prop_markets'].items():
+            outcomes = []
+            for player in players:
+                if point is None:
+                    outcomes.append({'name': 'Yes', 'description': player, 'price': over_price})
+                    continue
+                outcomes.append({'name': 'Over', 'description': player, 'price': over_price, 'point': point})
+                outcomes.append({'name': 'Under', 'description': player, 'price': under_price, 'point': point})
+            markets.append({'key': key, 'outcomes': outcomes})
+        return {'id': event_id, 'bookmakers': [{'key': 'bovada', 'title': 'Bovada', 'markets': markets}]}
+
+    def get(self, url, params=None, **kwargs):
+        parsed = urlparse(url)
+        if parsed.hostname == 'api.the-odds-api.com':
+            self.services.wait('odds')
+            parts = parsed.path.strip('/').split('/')
+            if 'events' in parts:
+                return self._odds_response(self.player_props(parts[parts.index('events') + 1]))
+            if parts[-1] == 'scores':
+                return self._odds_response([])
+            return self._odds_response(self.games())
+        if parsed.hostname == 'preview.redd.it':
+            self.services.wait('image')
+            return FakeResponse(content=IMAGE_BYTES, headers={'Content-Type': 'image/png'})
+        return FakeResponse(404, content=b'Not Found')
+
+    def post(self, url, data=None, files=None, **kwargs):
+        if urlparse(url).hostname == 'api.ocr.space':
+            if files and 'image' in files:
+                files['image'].read()
+            self.services.wait('ocr')
+            return FakeResponse(json_data={
+                'ParsedResults': [{'ParsedText': self.services.fixtures['ocr_text'], 'FileParseExitCode': 1}],
+                'OCRExitCode': 1,
+                'IsErroredOnProcessing': False,
+                'ErrorMessage': None,
+            })
+        return FakeResponse(404, content=b'Not Found')
+
+    def close(self):
+        pass
+
+
+# OpenAI
+
+def _usage(prompt, text, model, reasoning_effort=None):
+    completion_tokens = estimate_tokens(text)
+    reasoning = model.startswith(('gpt-5', 'o'))
+    reasoning_tokens = completion_tokens * REASONING_TOKENS_PER_TOKEN[reasoning_effort or 'medium'] if reasoning else 0
+    return SimpleNamespace(
+        prompt_tokens=estimate_tokens(prompt),
+        completion_tokens=completion_tokens + reasoning_tokens,
+        total_tokens=estimate_tokens(prompt) + completion_tokens + reasoning_tokens,
+        completion_tokens_details=SimpleNamespace(reasoning_tokens=reasoning_tokens),
+    )
+
+
+def _chunks(text, size=CHARS_PER_TOKEN * 4):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class FakeChatCompletions:
+    def __init__(self, services):
+        self.services = services
+
+    def _answer(self, prompt):
+        completions = self.services.fixtures['completions']
+        if 'app idea' in prompt.lower():
+            for index, post in enumerate(self.services.fixtures['appideas_posts']):
+                if post['title'] in prompt:
+                    return completions['appideas'][index % len(completions['appideas'])]
+            return completions['appideas'][0]
+        return completions['potd'].replace('{author}', 'capper_0')
+
+    def create(self, model, messages, stream=False, stream_options=None, reasoning_effort=None, **kwargs):
+        prompt = "\n".join(message['content'] for message in messages)
+        text = self._answer(prompt)
+        usage = _usage(prompt, text, model, reasoning_effort)
+        self.services.wait('llm')
+        self.services.count(f"llm:{model}")
+        if not stream:
+            self.services.sleep('llm_token', usage.completion_tokens * MODEL_TOKEN_LATENCY.get(model, 1.0))
+            return SimpleNamespace(
+                model=model,
+                choices=[SimpleNamespace(message=SimpleNamespace(role='assistant', content=text), finish_reason='stop')],
+                usage=usage,
+            )
+        return self._stream(text, usage, bool(stream_options and stream_options.get('include_usage')))
+
+    def _stream(self, text, usage, include_usage):
+        pieces = _chunks(text)
+        # Reasoning happens before the first visible token
+        self.services.sleep('llm_token', usage.completion_tokens_details.reasoning_tokens)
+        for piece in pieces:
+            self.services.sleep('llm_token', estimate_tokens(piece))
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))], usage=None)
+        if include_usage:
+            yield SimpleNamespace(choices=[], usage=usage)
+
+
+class FakeAssistantStream:
+    def __init__(self, services, text, usage):
+        self.services = services
+        self.text = text
+        self.current_run = SimpleNamespace(id='run_replay', usage=usage)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    @property
+    def text_deltas(self):
+        for piece in _chunks(self.text):
+            self.services.sleep('llm_token', estimate_tokens(piece))
+            yield piece
+
+
+class FakeBeta:
+    def __init__(self, services):
+        """The assistants, vector stores and threads the POTD fallback uses"""
+        self.services = services
+        self.stores = {}
+        self.ids = itertools.count(1)
+        self.assistants = SimpleNamespace(list=lambda **kwargs: [], create=self._create_assistant,
+                                          update=self._update_assistant)
+        self.vector_stores = SimpleNamespace(
+            create=self._create_vector_store, list=lambda **kwargs: SimpleNamespace(data=list(self.stores.values())),
+            delete=self._delete_vector_store, file_batches=SimpleNamespace(upload_and_poll=self._upload_and_poll),
+        )
+        self.messages = {}
+        self.threads = SimpleNamespace(
+            create=self._create_thread, create_and_run_stream=self._create_and_run_stream,
+            messages=SimpleNamespace(create=self._create_message, list=self._list_messages),
+            runs=SimpleNamespace(create_and_poll=self._create_and_poll),
+        )
+
+    def _create_assistant(self, name=None, model='gpt-4o-mini', **kwargs):
+        return SimpleNamespace(id=f"asst_{next(self.ids)}", name=name, model=model)
+
+    def _update_assistant(self, assistant_id, **kwargs):
+        return SimpleNamespace(id=assistant_id)
+
+    def _create_vector_store(self, name=None, **kwargs):
+        store = SimpleNamespace(id=f"vs_{next(self.ids)}", name=name)
+        self.stores[store.id] = store
+        return store
+
+    def _delete_vector_store(self, vector_store_id):
+        self.stores.pop(vector_store_id, None)
+
+    def _upload_and_poll(self, vector_store_id, files):
+        for file in files:
+            file.read()
+        self.services.wait('vector_store')
+        return SimpleNamespace(status='completed', file_counts=SimpleNamespace(completed=len(files), failed=0, total=len(files)))
+
+    def _create_thread(self, **kwargs):
+        return SimpleNamespace(id=f"thread_{next(self.ids)}")
+
+    def _create_message(self, thread_id, role, content):
+        self.messages[thread_id] = content
+
+    def _create_and_poll(self, thread_id, assistant_id, **kwargs):
+        prompt = self.messages.get(thread_id, '')
+        text = self.services.openai.chat.completions._answer(prompt)
+        usage = _usage(prompt, text, 'gpt-4o-mini')
+        self.services.wait('llm')
+        self.services.sleep('llm_token', usage.completion_tokens)
+        self.messages[thread_id] = text
+        return SimpleNamespace(id=f"run_{next(self.ids)}", usage=usage)
+
+    def _list_messages(self, thread_id, run_id=None, **kwargs):
+        text = SimpleNamespace(value=self.messages.get(thread_id, ''))
+        return [SimpleNamespace(role='assistant', content=[SimpleNamespace(text=text)])]
+
+    def _create_and_run_stream(self, assistant_id, thread, **kwargs):
+        prompt = "\n".join(message['content'] for message in thread.get('messages', []))
+        text = self.services.openai.chat.completions._answer(prompt)
+        self.services.wait('llm')
+        return FakeAssistantStream(self.services, text, _usage(prompt, text, 'gpt-4o-mini'))
+
+
+class FakeOpenAI:
+    def __init__(self, services):
+        """An OpenAI() stand-in answering with the recorded completions"""
+        self.chat = SimpleNamespace(completions=FakeChatCompletions(services))
+        self.beta = FakeBeta(services)
+
+
+# Telegram (telepot)
+
+class FakeTelegramBot:
+    def __init__(self, services):
+        """A telepot.Bot stand-in that keeps the messages it was asked to send"""
+        self.services = services
+        self.message_ids = itertools.count(1)
+        self.messages = []
+
+    def sendMessage(self, chat_id, text, **kwargs):
+        self.services.wait('telegram')
+        message_id = next(self.message_ids)
+        self.messages.append((chat_id, text))
+        return {'message_id': message_id, 'chat': {'id': chat_id}, 'date': int(time.time()), 'text': text}
+
+    def editMessageText(self, msg_identifier, text, **kwargs):
+        self.services.wait('telegram')
+        chat_id, message_id = msg_identifier
+        self.messages.append((chat_id, text))
+        return {'message_id': message_id, 'chat': {'id': chat_id}, 'date': int(time.time()), 'text': text}
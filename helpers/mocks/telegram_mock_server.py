@@ -0,0 +1,212 @@
+"""
+Telegram Bot API Mock Server
+A local stand-in for api.telegram.org that delivers fake user commands to a bot, by
+getUpdates long polling or by posting to its webhook, and records the bot's replies
+
+Usage: python helpers/mocks/telegram_mock_server.py [--port 8081]
+Then point the bot at it with TELEGRAM_API_BASE_URL=http://127.0.0.1:8081/bot
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+import aiohttp
+from aiohttp import web
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+BOT_USER = {'id': 1000, 'is_bot': True, 'first_name': 'Clock Bot', 'username': 'paylocity_clock_bot'}
+
+
+class TelegramMockServer:
+    def __init__(self, port=0):
+        """
+        :param port: The port to listen on (0 picks a free one)
+        """
+        self.port = port
+        self.runner = None
+        self.webhook = None
+        self.updates = asyncio.Queue()
+        # Every Bot API call as (monotonic time, method, parameters), for assertions
+        self.calls = []
+        # Messages the bot sent or edited as (monotonic time, chat id, text)
+        self.replies = []
+        self.reply_event = asyncio.Event()
+        self.update_ids = itertools.count(1)
+        self.message_ids = itertools.count(1)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def base_url(self):
+        """The value for TELEGRAM_API_BASE_URL"""
+        return f"{self.url}/bot"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_route('*', '/bot{token}/{method}', self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def _parameters(self, request):
+        if request.content_type == 'application/json':
+            return await request.json()
+        data = await request.post()
+        # JSON-encoded fields (reply_markup, allowed_updates, ...) arrive as strings
+        return {key: value for key, value in data.items() if isinstance(value, str)}
+
+    def _message(self, chat_id, text):
+        return {
+            'message_id': next(self.message_ids),
+            'date': int(time.time()),
+            'chat': {'id': int(chat_id), 'type': 'private'},
+            'from': BOT_USER,
+            'text': text,
+        }
+
+    async def handle(self, request):
+        method = request.match_info['method']
+        parameters = await self._parameters(request)
+        self.calls.append((time.monotonic(), method, parameters))
+        handler = getattr(self, f"api_{method}", None)
+        result = await handler(parameters) if handler else True
+        return web.json_response({'ok': True, 'result': result})
+
+    async def api_getMe(self, parameters):
+        return BOT_USER
+
+    async def api_setWebhook(self, parameters):
+        self.webhook = (parameters['url'], parameters.get('secret_token'))
+        return True
+
+    async def api_deleteWebhook(self, parameters):
+        self.webhook = None
+        return True
+
+    async def api_getUpdates(self, parameters):
+        """Long poll: answer as soon as an update is queued, or with nothing after the timeout"""
+        timeout = float(parameters.get('timeout') or 0)
+        updates = []
+        try:
+            updates.append(await asyncio.wait_for(self.updates.get(), timeout=timeout or 0.01))
+        except asyncio.TimeoutError:
+            return []
+        while not self.updates.empty():
+            updates.append(self.updates.get_nowait())
+        return updates
+
+    def _record_reply(self, chat_id, text):
+        self.replies.append((time.monotonic(), int(chat_id), text))
+        self.reply_event.set()
+
+    async def api_sendMessage(self, parameters):
+        self._record_reply(parameters['chat_id'], parameters['text'])
+        return self._message(parameters['chat_id'], parameters['text'])
+
+    async def api_editMessageText(self, parameters):
+        self._record_reply(parameters['chat_id'], parameters['text'])
+        message = self._message(parameters['chat_id'], parameters['text'])
+        message['message_id'] = int(parameters['message_id'])
+        return message
+
+    async def api_sendPhoto(self, parameters):
+        self._record_reply(parameters['chat_id'], parameters.get('caption', ''))
+        return self._message(parameters['chat_id'], parameters.get('caption', ''))
+
+    async def send_command(self, chat_id, text):
+        """
+        Deliver a message from a user to the bot, like Telegram would.
+
+        :param chat_id: The user's chat id
+        :param text: The message, e.g. "/status"
+        :return: The monotonic time it was delivered
+        """
+        command = text.split()[0]
+        update = {
+            'update_id': next(self.update_ids),
+            'message': {
+                'message_id': next(self.message_ids),
+                'date': int(time.time()),
+                'chat': {'id': int(chat_id), 'type': 'private'},
+                'from': {'id': int(chat_id), 'is_bot': False, 'first_name': 'Aymee'},
+                'text': text,
+                'entities': [{'type': 'bot_command', 'offset': 0, 'length': len(command)}]
+                if command.startswith('/') else [],
+            },
+        }
+        sent_at = time.monotonic()
+        if self.webhook:
+            url, secret_token = self.webhook
+            headers = {SECRET_HEADER: secret_token} if secret_token else {}
+            async with aiohttp.ClientSession() as session:
+                async with session.post(url, json=update, headers=headers) as response:
+                    response.raise_for_status()
+        else:
+            await self.updates.put(update)
+        return sent_at
+
+    async def wait_for_reply(self, chat_id, after, timeout=10):
+        """
+        Wait for the first reply the bot sends to a chat after a moment.
+
+        :return: (monotonic time, text) of the reply, or None on timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            for at, reply_chat_id, text in self.replies:
+                if at >= after and reply_chat_id == int(chat_id):
+                    return at, text
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self.reply_event.clear()
+            try:
+                await asyncio.wait_for(self.reply_event.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def round_trip(self, chat_id, text, timeout=10):
+        """Seconds from delivering a command to the bot's first reply, None on timeout"""
+        sent_at = await self.send_command(chat_id, text)
+        reply = await self.wait_for_reply(chat_id, sent_at, timeout)
+        return reply[0] - sent_at if reply else None
+
+
+async def serve(port):
+    server = await TelegramMockServer(port).start()
+    print(f"Telegram mock server listening on {server.url} (TELEGRAM_API_BASE_URL={server.base_url})")
+    try:
+        while True:
+            await asyncio.sleep(1)
+            for at, method, parameters in server.calls:
+                print(f"{method} {json.dumps(parameters)[:200]}")
+            server.calls.clear()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local fake of the Telegram Bot API")
+    parser.add_argument('--port', type=int, default=8081)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Clock Action Journal
+Durable SQLite record of every attempted and confirmed clock action and every
+observed status, used for idempotency checks and instant /status answers
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS actions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    action TEXT NOT NULL,
+    source TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    outcome TEXT NOT NULL,
+    detail TEXT
+);
+CREATE TABLE IF NOT EXISTS status_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    status TEXT NOT NULL,
+    state TEXT,
+    observed_at TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_actions_started ON actions (started_at);
+CREATE INDEX IF NOT EXISTS idx_snapshots_observed ON status_snapshots (observed_at);
+"""
+
+# The clock state each action leads to
+ACTION_STATES = {
+    'clock_in': 'clocked_in',
+    'start_lunch': 'on_lunch',
+    'end_lunch': 'clocked_in',
+    'clock_out': 'clocked_out',
+}
+STATE_LABELS = {
+    'clocked_in': 'Clocked In',
+    'on_lunch': 'On Lunch',
+    'clocked_out': 'Clocked Out',
+}
+
+# Outcomes: pending (running), confirmed, failed (button not available), unknown (error after
+# the action may have been sent), cancelled (stopped before the click), skipped (duplicate)
+
+
+def status_to_state(status):
+    """Map a status text from Paylocity to a clock state, None if it is not recognisable"""
+    text = (status or '').lower()
+    if 'lunch' in text or 'meal' in text:
+        return 'on_lunch'
+    if 'clocked in' in text:
+        return 'clocked_in'
+    if 'clocked out' in text:
+        return 'clocked_out'
+    return None
+
+
+class ActionJournal:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.getenv('CLOCK_JOURNAL_PATH', 'logs/clock_journal.db')
+        self.logger = logging.getLogger(__name__)
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Written from the browser worker thread and read from the event loop
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    @staticmethod
+    def _now():
+        return datetime.now().astimezone()
+
+    def _execute(self, query, parameters=()):
+        with self.lock:
+            cursor = self.connection.execute(query, parameters)
+            self.connection.commit()
+            return cursor
+
+    def _query(self, query, parameters=()):
+        with self.lock:
+            return self.connection.execute(query, parameters).fetchall()
+
+    def start_action(self, action, source):
+        """Record an attempted action before anything is sent, returns its id"""
+        cursor = self._execute(
+            "INSERT INTO actions (action, source, started_at, outcome) VALUES (?, ?, ?, 'pending')",
+            (action, source, self._now().isoformat()),
+        )
+        return cursor.lastrowid
+
+    def finish_action(self, action_id, outcome, detail=None):
+        """Record the outcome of an action"""
+        self._execute(
+            "UPDATE actions SET outcome = ?, finished_at = ?, detail = ? WHERE id = ?",
+            (outcome, self._now().isoformat(), detail, action_id),
+        )
+        self.logger.info(f"📒 Journal: action #{action_id} {outcome}")
+
+    def record_status(self, status, source):
+        """Record a status observed in Paylocity"""
+        state = status_to_state(status)
+        self._execute(
+            "INSERT INTO status_snapshots (status, state, observed_at, source) VALUES (?, ?, ?, ?)",
+            (status, state, self._now().isoformat(), source),
+        )
+        return state
+
+    def last_snapshot(self):
+        """The most recent observed status, or None"""
+        rows = self._query("SELECT * FROM status_snapshots ORDER BY observed_at DESC LIMIT 1")
+        return dict(rows[0]) if rows else None
+
+    def current_state(self):
+        """
+        The clock state as far as the journal knows, from the newer of the last confirmed
+        action and the last recognisable status snapshot.
+
+        :return: A tuple (state, since, source) or (None, None, None)
+        """
+        actions = self._query(
+            "SELECT action, finished_at FROM actions WHERE outcome = 'confirmed' ORDER BY finished_at DESC LIMIT 1"
+        )
+        snapshots = self._query(
+            "SELECT state, observed_at, source FROM status_snapshots WHERE state IS NOT NULL "
+            "ORDER BY observed_at DESC LIMIT 1"
+        )
+        candidates = []
+        if actions:
+            candidates.append((actions[0]['finished_at'], ACTION_STATES[actions[0]['action']], 'action'))
+        if snapshots:
+            candidates.append((snapshots[0]['observed_at'], snapshots[0]['state'], snapshots[0]['source']))
+        if not candidates:
+            return None, None, None
+        at, state, source = max(candidates)
+        return state, datetime.fromisoformat(at), source
+
+    def unconfirmed_action(self, action, within=timedelta(hours=12)):
+        """The latest pending or unknown attempt of an action, if it is recent and no status was read since"""
+        since = (self._now() - within).isoformat()
+        snapshot = self.last_snapshot()
+        if snapshot:
+            since = max(since, snapshot['observed_at'])
+        rows = self._query(
+            "SELECT * FROM actions WHERE action = ? AND outcome IN ('pending', 'unknown') AND started_at >= ? "
+            "ORDER BY started_at DESC LIMIT 1",
+            (action, since),
+        )
+        return dict(rows[0]) if rows else None
+
+    def duplicate_reason(self, action):
+        """
+        Check whether an action would repeat what was already done today.
+
+        :return: A reason to skip the action, or None if it should run
+        """
+        state, since, _ = self.current_state()
+        if state == ACTION_STATES.get(action) and since and since.date() == self._now().date():
+            return f"Already {STATE_LABELS[state].lower()} since {since.strftime('%H:%M')}"
+        return None
+
+    def recent_actions(self, limit=5):
+        """The latest actions, newest first"""
+        return [dict(row) for row in self._query("SELECT * FROM actions ORDER BY started_at DESC LIMIT ?", (limit,))]
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
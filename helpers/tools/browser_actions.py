@@ -0,0 +1,139 @@
+"""
+Browser Action Queue
+Runs blocking Selenium work on a dedicated thread, one action at a time,
+with progress updates and cancellation for asyncio front ends
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+
+class ActionCancelled(Exception):
+    """Raised inside an action when it was cancelled at a progress checkpoint"""
+
+
+class BrowserAction:
+    _ids = itertools.count(1)
+
+    def __init__(self, name, work, on_progress=None, owner=None):
+        """
+        A unit of browser work.
+
+        :param name: A display name, e.g. "Clock In"
+        :param work: A blocking function called with a progress(text) function
+        :param on_progress: Called from the worker thread with each progress text
+        :param owner: Who queued the action, e.g. a chat id (used for cancellation)
+        """
+        self.id = next(self._ids)
+        self.name = name
+        self.work = work
+        self.owner = owner
+        self.on_progress = on_progress
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    def progress(self, text):
+        """Report progress; doubles as a cancellation checkpoint between browser steps"""
+        if self.cancel_event.is_set():
+            raise ActionCancelled(f"{self.name} cancelled")
+        if self.on_progress:
+            self.on_progress(text)
+
+    def cancel(self):
+        """Cancel the action: queued actions never start, running ones stop at the next checkpoint"""
+        self.cancel_event.set()
+        if self.future:
+            self.future.cancel()
+
+
+class BrowserActionQueue:
+    def __init__(self):
+        # A single worker thread is the queue: browser actions run strictly one after another
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser")
+        self.logger = logging.getLogger(__name__)
+        self.actions = []
+        self.lock = threading.Lock()
+
+    def _run(self, action):
+        action.progress("▶️ Started")
+        return action.work(action.progress)
+
+    def submit(self, name, work, on_progress=None, owner=None):
+        """Queue an action and return it; its future resolves with the result of work"""
+        action = BrowserAction(name, work, on_progress, owner)
+        with self.lock:
+            self.actions.append(action)
+            action.future = self.executor.submit(self._run, action)
+        action.future.add_done_callback(lambda _: self._forget(action))
+        self.logger.info(f"📥 Queued {name} (#{action.id}, position {self.position(action)})")
+        return action
+
+    def _forget(self, action):
+        with self.lock:
+            if action in self.actions:
+                self.actions.remove(action)
+
+    def position(self, action):
+        """The number of actions ahead of this one (0 when it runs next or is running)"""
+        with self.lock:
+            return self.actions.index(action) if action in self.actions else 0
+
+    async def run(self, name, work, on_progress=None, owner=None):
+        """
+        Run an action from asyncio without blocking the event loop.
+
+        :param on_progress: An async function awaited with each progress text, in order
+        :return: The result of work
+        :raises ActionCancelled: If the action was cancelled
+        """
+        loop = asyncio.get_running_loop()
+        updates = asyncio.Queue()
+
+        async def forward_progress():
+            while True:
+                text = await updates.get()
+                if text is None:
+                    return
+                try:
+                    await on_progress(text)
+                except Exception as e:
+                    self.logger.warning(f"⚠️ Progress update failed: {e}")
+
+        forwarder = loop.create_task(forward_progress()) if on_progress else None
+        action = self.submit(
+            name, work, owner=owner,
+            on_progress=(lambda text: loop.call_soon_threadsafe(updates.put_nowait, text)) if on_progress else None,
+        )
+        if on_progress:
+            position = self.position(action)
+            if position:
+                await on_progress(f"⏳ Queued behind {position} other action(s)")
+        try:
+            return await asyncio.wrap_future(action.future)
+        except (CancelledError, asyncio.CancelledError):
+            if action.future.cancelled() or action.cancel_event.is_set():
+                raise ActionCancelled(f"{name} cancelled")
+            # The caller itself was cancelled, so the browser work is no longer wanted either
+            action.cancel()
+            raise
+        finally:
+            if forwarder:
+                # Let already reported progress reach the user before stopping the forwarder
+                updates.put_nowait(None)
+                await asyncio.gather(forwarder, return_exceptions=True)
+
+    def cancel(self, owner=None):
+        """Cancel all queued and running actions (of one owner), returns how many were cancelled"""
+        with self.lock:
+            actions = [action for action in self.actions if owner is None or action.owner == owner]
+        for action in actions:
+            action.cancel()
+        return len(actions)
+
+    def shutdown(self):
+        """Cancel everything and stop the worker thread"""
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
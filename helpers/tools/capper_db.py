@@ -0,0 +1,398 @@
+import os
+import re
+import sqlite3
+import datetime
+import time
+
+from helpers.tools.potd_parser import normalize_name, track_record_weight
+
+# Below this many graded picks an author's self-reported record is used for weighting
+MIN_GRADED_PICKS = 5
+# Odds API sport keys of the sports named on a pick's "Sport:" line, first match wins
+SCORE_SPORT_KEYS = (
+    (re.compile(r'\bwnba\b', re.IGNORECASE), 'basketball_wnba'),
+    (re.compile(r'\bnba\b', re.IGNORECASE), 'basketball_nba'),
+    (re.compile(r'\b(?:ncaab|cbb|college basketball|march madness)\b', re.IGNORECASE), 'basketball_ncaab'),
+    (re.compile(r'\b(?:ncaaf|cfb|college football)\b', re.IGNORECASE), 'americanfootball_ncaaf'),
+    (re.compile(r'\b(?:nfl|football)\b', re.IGNORECASE), 'americanfootball_nfl'),
+    (re.compile(r'\b(?:nhl|hockey)\b', re.IGNORECASE), 'icehockey_nhl'),
+    (re.compile(r'\b(?:mlb|baseball)\b', re.IGNORECASE), 'baseball_mlb'),
+    (re.compile(r'\b(?:epl|premier league)\b', re.IGNORECASE), 'soccer_epl'),
+    (re.compile(r'\b(?:ucl|champions? league)\b', re.IGNORECASE), 'soccer_uefa_champs_league'),
+    (re.compile(r'\bmls\b', re.IGNORECASE), 'soccer_usa_mls'),
+)
+# The Odds API only returns the scores of games completed in the past three days
+SCORE_DAYS_FROM = 3
+# A result is only matched to picks posted within this many days of the game's start
+RESULT_MATCH_DAYS = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS authors (
+    name TEXT PRIMARY KEY,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    wins INTEGER,
+    losses INTEGER,
+    pushes INTEGER,
+    net_units REAL,
+    roi REAL
+);
+CREATE TABLE IF NOT EXISTS record_snapshots (
+    author TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    created_utc REAL,
+    wins INTEGER,
+    losses INTEGER,
+    pushes INTEGER,
+    net_units REAL,
+    roi REAL,
+    PRIMARY KEY (author, thread_id)
+);
+CREATE TABLE IF NOT EXISTS picks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    thread_id TEXT NOT NULL,
+    author TEXT NOT NULL,
+    event TEXT NOT NULL,
+    pick TEXT NOT NULL,
+    side TEXT,
+    line REAL,
+    sport TEXT,
+    units REAL,
+    created_utc REAL,
+    result TEXT,
+    UNIQUE (thread_id, author)
+);
+CREATE TABLE IF NOT EXISTS results (
+    event TEXT PRIMARY KEY,
+    team_a TEXT NOT NULL,
+    score_a REAL NOT NULL,
+    team_b TEXT NOT NULL,
+    score_b REAL NOT NULL,
+    recorded_at TEXT NOT NULL,
+    commence_utc REAL
+);
+CREATE INDEX IF NOT EXISTS idx_picks_author ON picks (author);
+CREATE INDEX IF NOT EXISTS idx_picks_event ON picks (event);
+CREATE INDEX IF NOT EXISTS idx_picks_ungraded ON picks (result) WHERE result IS NULL;
+"""
+
+
+def event_key(team_a, team_b):
+    """
+    Build the event key used by potd_parser.group_picks_by_event for two teams.
+
+    :param team_a: The name of one team
+    :param team_b: The name of the other team
+    :return: The event key, e.g. "celtics vs lakers"
+    """
+    return " vs ".join(sorted([normalize_name(team_a), normalize_name(team_b)]))
+
+
+def score_sport_key(sport):
+    """
+    Map the sport named on a pick to the Odds API sport key its scores are fetched with.
+
+    :param sport: The sport as written by the author, e.g. "NBA" or "Champion League Soccer"
+    :return: The sport key, e.g. "basketball_nba", or None if the sport is not covered
+    """
+    for pattern, key in SCORE_SPORT_KEYS:
+        if sport and pattern.search(sport):
+            return key
+    return None
+
+
+def names_match(name_a, name_b):
+    """
+    Check whether two normalized names are the same team, one containing the other as whole words.
+
+    :param name_a: A normalized name, e.g. "lakers"
+    :param name_b: A normalized name, e.g. "los angeles lakers"
+    :return: True if either name contains the other
+    """
+    if not name_a or not name_b:
+        return False
+    return f" {name_a} " in f" {name_b} " or f" {name_b} " in f" {name_a} "
+
+
+def result_matches_event(event, result):
+    """
+    Check whether a result is on the event of a pick.
+
+    :param event: The event of a pick, e.g. "celtics vs lakers" or "lakers" for a single-team pick
+    :param result: A results row with team_a and team_b
+    :return: True if every team of the event is one of the result's teams
+    """
+    teams = event.split(" vs ")
+    team_a, team_b = result["team_a"], result["team_b"]
+    if len(teams) == 1:
+        return names_match(teams[0], team_a) or names_match(teams[0], team_b)
+    if len(teams) == 2:
+        return ((names_match(teams[0], team_a) and names_match(teams[1], team_b))
+                or (names_match(teams[0], team_b) and names_match(teams[1], team_a)))
+    return False
+
+
+def grade_pick(side, line, result):
+    """
+    Grade a single pick against the final score of its event.
+
+    :param side: "over", "under" or the normalized name of the team picked
+    :param line: The total or spread of the pick (None for a moneyline)
+    :param result: A results row with team_a, score_a, team_b and score_b
+    :return: "win", "loss", "push", or None if the pick cannot be graded
+    """
+    if side in ("over", "under"):
+        if line is None:
+            return None
+        margin = result["score_a"] + result["score_b"] - line
+        if side == "under":
+            margin = -margin
+    else:
+        if names_match(side, result["team_a"]):
+            margin = result["score_a"] - result["score_b"]
+        elif names_match(side, result["team_b"]):
+            margin = result["score_b"] - result["score_a"]
+        else:
+            return None
+        margin += line or 0
+
+    if margin > 0:
+        return "win"
+    if margin < 0:
+        return "loss"
+    return "push"
+
+
+class CapperDB:
+    def __init__(self, db_path):
+        """
+        Open (and create if needed) the capper track-record database.
+
+        :param db_path: Path to the SQLite database file
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+        self.migrate()
+        self._weights = {}
+
+    def migrate(self):
+        """
+        Add the columns that databases created by older versions are missing.
+        """
+        columns = {row["name"] for row in self.connection.execute("PRAGMA table_info(results)")}
+        if "commence_utc" not in columns:
+            with self.connection:
+                self.connection.execute("ALTER TABLE results ADD COLUMN commence_utc REAL")
+                # Older results were recorded shortly after the game, which is close enough for matching
+                self.connection.execute("UPDATE results SET commence_utc = CAST(strftime('%s', recorded_at) AS REAL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_results_commence ON results (commence_utc)")
+
+    def update_from_picks(self, thread_id, picks):
+        """
+        Store the picks and self-reported records of one POTD thread.
+
+        Picks that are already stored for the thread are skipped, so the same thread can be
+        processed more than once.
+
+        :param thread_id: The Reddit ID of the POTD post
+        :param picks: Picks parsed by potd_parser (with their "event" set)
+        :return: The number of new picks stored
+        """
+        now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        new_picks = 0
+        with self.connection:
+            for pick in picks:
+                author = pick["author"]
+                self.connection.execute(
+                    "INSERT INTO authors (name, first_seen, last_seen) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET last_seen = excluded.last_seen",
+                    (author, now, now),
+                )
+                if pick.get("wins") is not None or pick.get("net_units") is not None or pick.get("roi") is not None:
+                    record = (pick.get("wins"), pick.get("losses"), pick.get("pushes"), pick.get("net_units"), pick.get("roi"))
+                    self.connection.execute(
+                        "INSERT OR REPLACE INTO record_snapshots "
+                        "(author, thread_id, created_utc, wins, losses, pushes, net_units, roi) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (author, thread_id, pick.get("created_utc")) + record,
+                    )
+                    self.connection.execute(
+                        "UPDATE authors SET wins = ?, losses = ?, pushes = ?, net_units = ?, roi = ? WHERE name = ?",
+                        record + (author,),
+                    )
+                cursor = self.connection.execute(
+                    "INSERT OR IGNORE INTO picks "
+                    "(thread_id, author, event, pick, side, line, sport, units, created_utc) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, author, pick.get("event") or normalize_name(pick["pick"]), pick["pick"],
+                     pick.get("side"), pick.get("line"), pick.get("sport"), pick.get("units"), pick.get("created_utc")),
+                )
+                new_picks += cursor.rowcount
+        self._weights.clear()
+        print(f"Stored {new_picks} new picks from thread {thread_id}")
+        return new_picks
+
+    def record_result(self, team_a, score_a, team_b, score_b, commence_utc=None):
+        """
+        Store the final score of an event and grade the picks on it.
+
+        :param team_a: The name of one team
+        :param score_a: The final score of team_a
+        :param team_b: The name of the other team
+        :param score_b: The final score of team_b
+        :param commence_utc: The start of the game as a UNIX timestamp (default: now)
+        :return: The number of picks graded
+        """
+        now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        key = event_key(team_a, team_b)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results (event, team_a, score_a, team_b, score_b, recorded_at, commence_utc) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_name(team_a), float(score_a), normalize_name(team_b), float(score_b), now,
+                 commence_utc if commence_utc is not None else time.time()),
+            )
+        return self.grade_picks(key)
+
+    def record_scores(self, games):
+        """
+        Store the final scores returned by OddsAPI.get_scores and grade the picks on them.
+
+        :param games: A list of games as returned by OddsAPI.get_scores
+        :return: The number of picks graded
+        """
+        graded = 0
+        for game in games:
+            if not game.get("completed") or not game.get("scores"):
+                continue
+            scores = {score["name"]: score["score"] for score in game["scores"]}
+            home, away = game["home_team"], game["away_team"]
+            commence_utc = None
+            if game.get("commence_time"):
+                commence_utc = datetime.datetime.fromisoformat(game["commence_time"].replace("Z", "+00:00")).timestamp()
+            if home in scores and away in scores:
+                graded += self.record_result(home, scores[home], away, scores[away], commence_utc)
+        return graded
+
+    def ungraded_sports(self, days=SCORE_DAYS_FROM):
+        """
+        Find the sports of the picks still waiting for a final score.
+
+        :param days: Only picks posted in the past this many days (older games are out of the scores' range)
+        :return: A set of Odds API sport keys
+        """
+        cutoff = time.time() - (days + 1) * 24 * 3600
+        rows = self.connection.execute(
+            "SELECT DISTINCT sport FROM picks WHERE result IS NULL AND (created_utc IS NULL OR created_utc >= ?)",
+            (cutoff,),
+        ).fetchall()
+        return {key for key in (score_sport_key(row["sport"]) for row in rows) if key}
+
+    def grade_picks(self, event=None):
+        """
+        Grade ungraded picks against the stored final results.
+
+        Picks are matched to results by team name containment, so "Lakers ML" matches the result of
+        "Los Angeles Lakers vs Boston Celtics", and only to games starting within RESULT_MATCH_DAYS
+        of the pick being posted. When several games match, the one closest to the pick is used.
+
+        :param event: Only grade picks against the result of this event (default: all results)
+        :return: The number of picks graded
+        """
+        window = RESULT_MATCH_DAYS * 24 * 3600
+        query = "SELECT * FROM results WHERE commence_utc BETWEEN ? AND ?"
+        if event:
+            query += " AND event = ?"
+
+        graded = 0
+        with self.connection:
+            picks = self.connection.execute(
+                "SELECT id, event, side, line, created_utc FROM picks WHERE result IS NULL AND created_utc IS NOT NULL"
+            ).fetchall()
+            for pick in picks:
+                params = (pick["created_utc"] - window, pick["created_utc"] + window) + ((event,) if event else ())
+                matches = [row for row in self.connection.execute(query, params).fetchall()
+                           if result_matches_event(pick["event"], row)]
+                if not matches:
+                    continue
+                row = min(matches, key=lambda match: abs(match["commence_utc"] - pick["created_utc"]))
+                result = grade_pick(pick["side"], pick["line"], row)
+                if result:
+                    self.connection.execute("UPDATE picks SET result = ? WHERE id = ?", (result, pick["id"]))
+                    graded += 1
+        self._weights.clear()
+        return graded
+
+    def get_author_stats(self, author):
+        """
+        Get the self-reported and graded track record of an author.
+
+        :param author: The Reddit name of the author
+        :return: A dictionary with the author's stats, or None if the author is unknown
+        """
+        row = self.connection.execute("SELECT * FROM authors WHERE name = ?", (author,)).fetchone()
+        if not row:
+            return None
+        stats = dict(row)
+        graded = self.connection.execute(
+            "SELECT result, COUNT(*) AS count FROM picks WHERE author = ? AND result IS NOT NULL GROUP BY result",
+            (author,),
+        ).fetchall()
+        counts = {r["result"]: r["count"] for r in graded}
+        stats.update({
+            "graded_wins": counts.get("win", 0),
+            "graded_losses": counts.get("loss", 0),
+            "graded_pushes": counts.get("push", 0),
+            "total_picks": self.connection.execute(
+                "SELECT COUNT(*) FROM picks WHERE author = ?", (author,)
+            ).fetchone()[0],
+        })
+        return stats
+
+    def get_author_weight(self, author):
+        """
+        Get the weight of an author, preferring graded picks over the self-reported record.
+
+        :param author: The Reddit name of the author
+        :return: The author's weight, or None if the author is unknown
+        """
+        if author in self._weights:
+            return self._weights[author]
+
+        stats = self.get_author_stats(author)
+        weight = None
+        if stats:
+            graded = stats["graded_wins"] + stats["graded_losses"]
+            if graded >= MIN_GRADED_PICKS:
+                weight = track_record_weight({"wins": stats["graded_wins"], "losses": stats["graded_losses"]})
+            elif stats["wins"] is not None or stats["roi"] is not None:
+                weight = track_record_weight(stats)
+        self._weights[author] = weight
+        return weight
+
+    def pick_weight(self, pick):
+        """
+        Weight a pick by its author's stored track record, for potd_parser.rank_consensus.
+
+        :param pick: A parsed pick
+        :return: The author's stored weight, or the weight of the pick's own record
+        """
+        weight = self.get_author_weight(pick["author"])
+        return weight if weight is not None else track_record_weight(pick)
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        self.connection.close()
+
+# Usage example:
+# capper_db = CapperDB('bots/potd_history/cappers.db')
+# capper_db.update_from_picks(post.id, picks)
+# capper_db.record_result('Lakers', 110, 'Celtics', 104)
+# for sport in capper_db.ungraded_sports():
+#     capper_db.record_scores(OddsAPI().get_scores(sport))
+# print(capper_db.get_author_stats('test_author'))
@@ -0,0 +1,81 @@
+"""
+Chrome Installation Cache
+Remembers the Chrome binary, its major version and the patched chromedriver on disk,
+so browser startup can skip the binary search and version probes
+"""
+
+import json
+import logging
+import os
+import shutil
+
+
+class ChromeInstallCache:
+    def __init__(self, path=None):
+        self.path = path or os.getenv('CHROME_CACHE_FILE', 'cache/chrome.json')
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except (OSError, TypeError):
+            return None
+
+    def load(self):
+        """Return the cached entry, or None if it is missing or Chrome or the driver changed on disk"""
+        try:
+            with open(self.path) as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        # A Chrome update replaces the binary, so its mtime invalidates the version and the driver
+        if self._mtime(entry.get('binary')) != entry.get('binary_mtime'):
+            self.logger.info("🔄 Chrome binary changed since it was cached, probing again")
+            self.clear()
+            return None
+        if entry.get('driver_path') and self._mtime(entry['driver_path']) != entry.get('driver_mtime'):
+            self.logger.info("🔄 Cached chromedriver is missing or changed, probing again")
+            self.clear()
+            return None
+        return entry
+
+    def save(self, binary, version, driver_path=None):
+        """Cache the binary and version, and keep a stable copy of the patched driver"""
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # undetected-chromedriver may delete or re-download its own copy, so keep ours next to the cache
+            if driver_path and os.path.exists(driver_path):
+                name = f"chromedriver_{version}" + (".exe" if driver_path.endswith(".exe") else "")
+                cached_driver = os.path.abspath(os.path.join(directory or '.', name))
+                if os.path.abspath(driver_path) != cached_driver:
+                    shutil.copy2(driver_path, cached_driver)
+                driver_path = cached_driver
+            else:
+                driver_path = None
+
+            entry = {
+                'binary': binary,
+                'binary_mtime': self._mtime(binary),
+                'version': version,
+                'driver_path': driver_path,
+                'driver_mtime': self._mtime(driver_path),
+            }
+            with open(self.path, 'w') as file:
+                json.dump(entry, file, indent=2)
+            self.logger.info(f"💾 Cached Chrome {version} at {binary} (driver: {driver_path})")
+            return entry
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not cache Chrome installation: {e}")
+            return None
+
+    def clear(self):
+        """Forget the cached installation"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,106 @@
+"""
+Clock Bot Metrics
+Prometheus counters and histograms for the long-running clock bot, served on an
+optional local HTTP endpoint for a scraper to collect
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+# Starting Chrome and logging in take seconds, a slow Paylocity day takes minutes
+BROWSER_BUCKETS = (1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180)
+# Clock actions range from a fast HTTP request to a full browser flow
+ACTION_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+# Event-loop lag should stay in the milliseconds
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+BROWSER_START_SECONDS = Histogram(
+    'clock_browser_start_seconds', 'Time to start a Paylocity browser', buckets=BROWSER_BUCKETS
+)
+LOGIN_SECONDS = Histogram(
+    'clock_login_seconds', 'Time to log in to Paylocity', ['kind'], buckets=BROWSER_BUCKETS
+)
+BROWSER_FAILURES = Counter(
+    'clock_browser_failures', 'Browsers that failed to start or log in', ['stage']
+)
+ACTION_SECONDS = Histogram(
+    'clock_action_seconds', 'Time Paylocity took to run an action', ['action', 'backend'], buckets=ACTION_BUCKETS
+)
+ACTIONS = Counter(
+    'clock_actions', 'Clock actions by outcome (confirmed, failed, unknown, cancelled, skipped)', ['action', 'outcome']
+)
+TELEGRAM_COMMAND_SECONDS = Histogram(
+    'clock_telegram_command_seconds', 'Time to handle a Telegram command', ['command'], buckets=ACTION_BUCKETS
+)
+TELEGRAM_COMMAND_ERRORS = Counter(
+    'clock_telegram_command_errors', 'Telegram commands whose handler raised', ['command']
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    'clock_event_loop_lag_seconds', 'How late the event loop woke up a sleeping task', buckets=LAG_BUCKETS
+)
+EVENT_LOOP_LAG_LAST = Gauge(
+    'clock_event_loop_lag_last_seconds', 'The last measured event-loop lag'
+)
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def observe(histogram, *labels):
+    """Time the block into a histogram, with the given label values"""
+    started_at = time.monotonic()
+    try:
+        yield
+    finally:
+        metric = histogram.labels(*labels) if labels else histogram
+        metric.observe(time.monotonic() - started_at)
+
+
+def timed_command(command, handler):
+    """Wrap a Telegram command handler so its latency and errors are recorded"""
+    async def wrapper(update, context):
+        try:
+            with observe(TELEGRAM_COMMAND_SECONDS, command):
+                return await handler(update, context)
+        except Exception:
+            TELEGRAM_COMMAND_ERRORS.labels(command).inc()
+            raise
+    return wrapper
+
+
+async def monitor_event_loop_lag(interval=1.0):
+    """Sleep for an interval over and over and record how much later than asked the loop woke up"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started_at = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - started_at - interval, 0.0)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        EVENT_LOOP_LAG_LAST.set(lag)
+
+
+def start_metrics_server(port=None, address=None):
+    """
+    Serve the metrics at http://<address>:<port>/metrics from a background thread.
+
+    :param port: The port to listen on (default: CLOCK_METRICS_PORT, empty or 0 disables the endpoint)
+    :param address: The address to listen on (default: CLOCK_METRICS_ADDRESS, 127.0.0.1)
+    :return: True when the endpoint was started
+    """
+    if port is None:
+        port = int(os.getenv('CLOCK_METRICS_PORT') or 0)
+    if not port:
+        return False
+    address = address or os.getenv('CLOCK_METRICS_ADDRESS', '127.0.0.1')
+    try:
+        start_http_server(port, addr=address)
+    except OSError as e:
+        logger.error(f"❌ Could not start the metrics endpoint on {address}:{port}: {e}")
+        return False
+    logger.info(f"📈 Metrics endpoint listening on http://{address}:{port}/metrics")
+    return True
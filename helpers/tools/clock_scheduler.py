@@ -0,0 +1,252 @@
+"""
+Asyncio Clock Scheduler
+Sleeps until the next due job instead of polling, with timezone-aware weekday
+schedules, jitter, holiday/PTO calendars and catch-up of runs missed while down
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+from datetime import date, datetime, timedelta
+
+import pytz
+
+# Long sleeps are cut into pieces so suspend/resume or clock changes are noticed within this time
+MAX_SLEEP_SECONDS = 3600
+
+
+def load_calendar(path=None, extra_dates=None):
+    """
+    Load holiday/PTO dates from a text file with one date or range per line.
+
+    Lines look like "2025-12-25" or "2025-12-24..2025-12-26"; text after "#" is a comment.
+
+    :param path: The calendar file (missing files are ignored)
+    :param extra_dates: Comma separated dates or ranges, e.g. from CLOCK_PTO_DATES
+    :return: A set of dates without scheduled actions
+    """
+    lines = []
+    if path and os.path.exists(path):
+        with open(path) as file:
+            lines.extend(file)
+    if extra_dates:
+        lines.extend(extra_dates.split(','))
+
+    days = set()
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        start, _, end = line.partition('..')
+        start = date.fromisoformat(start.strip())
+        end = date.fromisoformat(end.strip()) if end else start
+        while start <= end:
+            days.add(start)
+            start += timedelta(days=1)
+    return days
+
+
+def shift_time(at, minutes, weekdays=range(5)):
+    """
+    Move a daily time by some minutes, carrying anything past midnight over to the weekdays.
+
+    E.g. 5 minutes before a Monday 00:02 is Sunday 23:57, not Monday 23:57.
+
+    :param at: The local time "HH:MM"
+    :param minutes: The offset, negative for earlier
+    :param weekdays: The weekdays of the original time (0 is Monday)
+    :return: A tuple (shifted "HH:MM", shifted weekdays)
+    """
+    hour, minute = map(int, at.split(':'))
+    days, minute_of_day = divmod(hour * 60 + minute + minutes, 24 * 60)
+    return f"{minute_of_day // 60:02d}:{minute_of_day % 60:02d}", sorted((day + days) % 7 for day in weekdays)
+
+
+class ScheduledJob:
+    def __init__(self, name, at, action, weekdays=range(5), jitter_minutes=0, catch_up=True):
+        """
+        A daily job.
+
+        :param name: A unique name, also the key of its last run in the state file
+        :param at: The local time "HH:MM"
+        :param action: An async function without arguments
+        :param weekdays: The weekdays it runs on (0 is Monday)
+        :param jitter_minutes: Each run is moved by a random offset of up to this many minutes either way
+        :param catch_up: Run it once after a restart if its last occurrence was missed
+        """
+        self.name = name
+        self.hour, self.minute = map(int, at.split(':'))
+        self.action = action
+        self.weekdays = set(weekdays)
+        self.jitter_minutes = jitter_minutes
+        self.catch_up = catch_up
+        # The planned (unjittered) occurrence of next_run, what the run after it is planned from
+        self.planned_run = None
+        self.next_run = None
+
+
+class ClockScheduler:
+    def __init__(self, tz_name=None, holidays=None, state_path=None, catch_up_minutes=None):
+        """
+        :param tz_name: The timezone of the job times, e.g. "America/Los_Angeles" (default: system time)
+        :param holidays: Dates without any runs
+        :param state_path: The JSON file remembering the last run of each job
+        :param catch_up_minutes: How late a missed run may still be caught up
+        """
+        self.logger = logging.getLogger(__name__)
+        self.tz = pytz.timezone(tz_name) if tz_name else None
+        self.holidays = holidays or set()
+        self.state_path = state_path or os.getenv('CLOCK_SCHEDULE_STATE_FILE', 'cache/clock_schedule.json')
+        if catch_up_minutes is None:
+            catch_up_minutes = int(os.getenv('CLOCK_CATCH_UP_MINUTES', '60'))
+        self.catch_up = timedelta(minutes=catch_up_minutes)
+        self.jobs = []
+        self.last_runs = self._load_state()
+        # Created in run(): before Python 3.10 an Event is bound to the loop current at its creation
+        self._wakeup = None
+        self._running = False
+        self._tasks = set()
+
+    def now(self):
+        return datetime.now(self.tz) if self.tz else datetime.now().astimezone()
+
+    def _localize(self, naive):
+        """Attach the scheduler timezone to a naive local time, handling DST"""
+        return self.tz.localize(naive) if self.tz else naive.astimezone()
+
+    def _load_state(self):
+        try:
+            with open(self.state_path) as file:
+                return {name: datetime.fromisoformat(value) for name, value in json.load(file).items()}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        try:
+            directory = os.path.dirname(self.state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.state_path, 'w') as file:
+                json.dump({name: value.isoformat() for name, value in self.last_runs.items()}, file, indent=2)
+        except OSError as e:
+            self.logger.warning(f"⚠️ Could not save schedule state: {e}")
+
+    def add_job(self, job):
+        """Add a job and wake the loop so it is taken into account"""
+        self.jobs.append(job)
+        self.plan_next(job, self.now())
+        self._wake()
+        return job
+
+    def _wake(self):
+        if self._wakeup:
+            self._wakeup.set()
+
+    def is_day_off(self, day):
+        return day in self.holidays
+
+    def occurrence(self, job, day):
+        """The planned (unjittered) run of a job on a day, or None if it does not run that day"""
+        if day.weekday() not in job.weekdays or self.is_day_off(day):
+            return None
+        return self._localize(datetime(day.year, day.month, day.day, job.hour, job.minute))
+
+    def next_planned(self, job, after):
+        """The next planned (unjittered) run of a job strictly after a moment"""
+        day = after.date()
+        # A year covers every weekday set and any realistic run of holidays
+        for _ in range(366):
+            planned = self.occurrence(job, day)
+            if planned and planned > after:
+                return planned
+            day += timedelta(days=1)
+        return None
+
+    def _jittered(self, job, planned, after):
+        jitter = timedelta(seconds=random.uniform(-60, 60) * job.jitter_minutes)
+        # An early jitter that already passed means "right away", not "skip today"
+        return max(planned + jitter, after + timedelta(seconds=1))
+
+    def next_occurrence(self, job, after):
+        """The next run of a job strictly after a moment, with jitter applied"""
+        planned = self.next_planned(job, after)
+        return self._jittered(job, planned, after) if planned else None
+
+    def plan_next(self, job, after):
+        """Set the next planned and jittered run of a job after a moment"""
+        job.planned_run = self.next_planned(job, after)
+        job.next_run = self._jittered(job, job.planned_run, after) if job.planned_run else None
+
+    def plan_after_run(self, job):
+        """
+        Plan the run after the one that is due now, from the occurrence being run rather than from
+        now, so a run jittered early does not fire a second time the same day
+        """
+        now = self.now()
+        self.plan_next(job, max(job.planned_run, now) if job.planned_run else now)
+
+    def missed_occurrence(self, job, now):
+        """The latest planned run before now that never ran and is still within the catch-up window"""
+        day = now.date()
+        for _ in range(2):
+            planned = self.occurrence(job, day)
+            if planned and planned <= now:
+                last_run = self.last_runs.get(job.name)
+                # A run up to jitter_minutes early counts as this occurrence
+                earliest = planned - timedelta(minutes=job.jitter_minutes)
+                if now - planned <= self.catch_up and (last_run is None or last_run < earliest):
+                    return planned
+                return None
+            day -= timedelta(days=1)
+        return None
+
+    async def _run_job(self, job):
+        self.last_runs[job.name] = self.now()
+        self._save_state()
+        self.logger.info(f"⏰ Running {job.name}")
+        try:
+            await job.action()
+        except Exception as e:
+            self.logger.error(f"❌ Scheduled job {job.name} failed: {e}")
+
+    async def catch_up_missed(self):
+        """Run the jobs whose last occurrence was missed while the bot was down, oldest first"""
+        now = self.now()
+        missed = [(self.missed_occurrence(job, now), job) for job in self.jobs if job.catch_up]
+        for planned, job in sorted((item for item in missed if item[0]), key=lambda item: item[0]):
+            self.logger.info(f"⏪ Catching up {job.name} missed at {planned.strftime('%Y-%m-%d %H:%M')}")
+            await self._run_job(job)
+
+    async def run(self):
+        """Run jobs until stop() is called, sleeping until the next one is due"""
+        self._running = True
+        self._wakeup = asyncio.Event()
+        await self.catch_up_missed()
+        while self._running:
+            upcoming = [job for job in self.jobs if job.next_run]
+            delay = MAX_SLEEP_SECONDS
+            if upcoming:
+                job = min(upcoming, key=lambda item: item.next_run)
+                delay = min((job.next_run - self.now()).total_seconds(), MAX_SLEEP_SECONDS)
+
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Plan the next run before this one, so a slow action cannot shift the schedule
+            self.plan_after_run(job)
+            task = asyncio.create_task(self._run_job(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            if job.next_run:
+                self.logger.info(f"📅 Next {job.name}: {job.next_run.strftime('%a %Y-%m-%d %H:%M:%S %Z')}")
+
+    def stop(self):
+        self._running = False
+        self._wake()
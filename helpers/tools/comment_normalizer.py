@@ -0,0 +1,149 @@
+import re
+import time
+import datetime
+import functools
+
+import emoji
+import pytz
+
+# Blank lines at the start of the text, and every other empty or whitespace-only line together
+# with the newline in front of it, in a single pass
+BLANK_LINES_PATTERN = re.compile(r'\A(?:[^\S\n]*\n)+|\n[^\S\n]*(?=\n|\Z)')
+# Every line boundary str.splitlines() knows about other than "\n"
+LINE_BREAK_PATTERN = re.compile('\r\n?|[\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# UTC offsets are cached per 15 minutes, the finest granularity of real timezone transitions
+OFFSET_BUCKET_SECONDS = 900
+
+
+@functools.lru_cache(maxsize=1)
+def _emoji_tables():
+    """
+    Build the emoji lookup tables once per process.
+
+    Emojis that never start a longer sequence go into a str.translate table. The first code
+    points of all other emojis are matched by a character class and resolved by lookups.
+
+    :return: A tuple (translation table for simple emojis, names of all emojis, sequence
+             lengths per first code point longest first, compiled pattern matching the
+             first code point of a longer sequence)
+    """
+    names = {value: data['en'] for value, data in emoji.EMOJI_DATA.items() if 'en' in data}
+    sequences = {}
+    for value in names:
+        sequences.setdefault(value[0], set()).add(value)
+
+    table = {}
+    sequence_starts = {}
+    for char, char_sequences in sequences.items():
+        # "X" alone, or "X" and "X" + VS16 with the same name, can be translated directly
+        if char_sequences <= {char, char + "\ufe0f"} and char in names \
+                and names.get(char + "\ufe0f", names[char]) == names[char]:
+            table[ord(char)] = names[char]
+        else:
+            sequence_starts[char] = sorted({len(value) for value in char_sequences}, reverse=True)
+
+    pattern = re.compile("[" + "".join(re.escape(char) for char in sorted(sequence_starts)) + "]")
+    return table, names, sequence_starts, pattern
+
+
+def demojize(text):
+    """
+    Replace emojis with their :name: text, like emoji.demojize but with precompiled tables.
+
+    Plain ASCII text (most comments) is returned without any scanning. Otherwise a single
+    character class search jumps between emojis that start longer sequences (skin tones,
+    flags, ZWJ sequences), which are resolved longest first, and all other emojis are
+    replaced by one str.translate call.
+
+    :param text: The text containing emojis
+    :return: The text with emojis converted to text
+    """
+    if text.isascii():
+        return text
+    table, names, sequence_starts, pattern = _emoji_tables()
+
+    match = pattern.search(text)
+    if match:
+        parts = []
+        position = 0
+        while match:
+            start = match.start()
+            end = start + 1
+            for length in sequence_starts[text[start]]:
+                name = names.get(text[start:start + length])
+                if name:
+                    end = start + length
+                    if text.startswith("\ufe0f", end):
+                        end += 1
+                    parts.append(text[position:start])
+                    parts.append(name)
+                    position = end
+                    break
+            match = pattern.search(text, end)
+        parts.append(text[position:])
+        text = "".join(parts)
+
+    # A variation selector right after a translated emoji is dropped like emoji.demojize does
+    return text.translate(table).replace(":\ufe0f", ":")
+
+
+def strip_blank_lines(text):
+    """
+    Remove empty and whitespace-only lines, like joining the non-blank lines of splitlines().
+
+    :param text: The text to clean
+    :return: The text without blank lines and without a trailing newline
+    """
+    text = BLANK_LINES_PATTERN.sub("", LINE_BREAK_PATTERN.sub("\n", text))
+    return "" if text.isspace() else text
+
+
+@functools.lru_cache(maxsize=4096)
+def _utc_offset_seconds(tz_name, bucket):
+    """
+    Get the UTC offset of a timezone at the start of a 15 minute bucket.
+
+    :param tz_name: The name of the timezone, e.g. "America/Los_Angeles"
+    :param bucket: The timestamp divided by OFFSET_BUCKET_SECONDS
+    :return: The UTC offset in seconds
+    """
+    moment = datetime.datetime.fromtimestamp(bucket * OFFSET_BUCKET_SECONDS, pytz.timezone(tz_name))
+    return int(moment.utcoffset().total_seconds())
+
+
+def format_timestamp(created_utc, tz_name='America/Los_Angeles'):
+    """
+    Format a UTC timestamp as local time in a timezone, with a cached UTC offset.
+
+    :param created_utc: The UTC timestamp
+    :param tz_name: The name of the timezone
+    :return: The local time formatted as "%Y-%m-%d %H:%M:%S"
+    """
+    offset = _utc_offset_seconds(tz_name, int(created_utc // OFFSET_BUCKET_SECONDS))
+    return time.strftime(TIMESTAMP_FORMAT, time.gmtime(int(created_utc // 1) + offset))
+
+
+def normalize_comments(comments, exclude_authors=(), tz_name='America/Los_Angeles'):
+    """
+    Normalize a batch of comments: demojize and strip blank lines from the bodies and format
+    the creation times in a timezone.
+
+    :param comments: A list of PRAW comment objects
+    :param exclude_authors: Author names (case insensitive) to skip, e.g. the thread bot
+    :param tz_name: The timezone of the formatted creation times
+    :return: A list of dictionaries with author, created and body
+    """
+    excluded = {name.lower() for name in exclude_authors}
+    normalized = []
+    for comment in comments:
+        author = comment.author.name if comment.author else 'Unknown'
+        if comment.author and author.lower() in excluded:
+            continue
+        normalized.append({
+            "author": author,
+            "created": format_timestamp(comment.created_utc, tz_name),
+            "body": strip_blank_lines(demojize(comment.body)),
+        })
+    return normalized
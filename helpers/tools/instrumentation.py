@@ -0,0 +1,242 @@
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Folder the JSON run reports are written to
+RUN_REPORT_DIR = os.getenv('RUN_REPORT_DIR', os.path.join('logs', 'runs'))
+# Counters every stage row of the summary table shows
+SUMMARY_COUNTERS = ('items', 'bytes', 'prompt_tokens', 'completion_tokens', 'cost_usd')
+
+_local = threading.local()
+
+
+def format_counter(value):
+    """Counters are whole numbers except costs, which are shown to a hundredth of a cent"""
+    return f"{value:.4f}" if isinstance(value, float) else value
+
+
+class Span:
+    def __init__(self, stage, attributes=None):
+        """
+        One timed execution of a pipeline stage.
+
+        :param stage: The stage name, e.g. "reddit_fetch" or "llm"
+        :param attributes: Extra details for the report, e.g. the model name
+        """
+        self.stage = stage
+        self.attributes = dict(attributes or {})
+        self.counters = {}
+        self.started_at = time.time()
+        self.duration = None
+        self.error = None
+
+    def add(self, **counters):
+        """
+        Add to the span's counters, e.g. span.add(items=120, bytes=5321).
+
+        None values are ignored, so optional measurements can be passed as they are.
+        """
+        for name, value in counters.items():
+            if value is not None:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self):
+        return {
+            'stage': self.stage,
+            'started_at': datetime.datetime.fromtimestamp(self.started_at).isoformat(),
+            'duration': round(self.duration or 0.0, 4),
+            'counters': self.counters,
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class RunMetrics:
+    def __init__(self, run_name):
+        """
+        The spans of one bot run, with a summary table and a JSON report.
+
+        :param run_name: The bot the run belongs to, e.g. "potd"
+        """
+        self.run_name = run_name
+        self.started_at = time.time()
+        self.finished_at = None
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def record(self, span):
+        with self.lock:
+            self.spans.append(span)
+
+    def stages(self):
+        """
+        Aggregate the spans per stage, in order of first appearance.
+
+        :return: A dictionary of stage name to calls, total/max duration and summed counters
+        """
+        stages = {}
+        with self.lock:
+            spans = list(self.spans)
+        for span in spans:
+            stage = stages.setdefault(span.stage, {'calls': 0, 'errors': 0, 'duration': 0.0, 'max_duration': 0.0, 'counters': {}})
+            stage['calls'] += 1
+            stage['errors'] += 1 if span.error else 0
+            stage['duration'] += span.duration or 0.0
+            stage['max_duration'] = max(stage['max_duration'], span.duration or 0.0)
+            for name, value in span.counters.items():
+                stage['counters'][name] = stage['counters'].get(name, 0) + value
+        return stages
+
+    @property
+    def run_id(self):
+        """The bot and start time of the run, e.g. potd_20250301_100000"""
+        return f"{self.run_name}_{datetime.datetime.fromtimestamp(self.started_at).strftime('%Y%m%d_%H%M%S')}"
+
+    def total_duration(self):
+        return (self.finished_at or time.time()) - self.started_at
+
+    def summary_table(self):
+        """
+        Format the per-stage totals as a plain text table.
+
+        :return: The table as a string
+        """
+        total = self.total_duration()
+        header = f"{'Stage':<24}{'Calls':>7}{'Total s':>10}{'Max s':>9}{'% run':>7}" + "".join(
+            f"{name:>19}" for name in SUMMARY_COUNTERS
+        )
+        lines = [f"Run '{self.run_name}' took {total:.2f}s", header, "-" * len(header)]
+        for name, stage in self.stages().items():
+            share = stage['duration'] / total * 100 if total else 0.0
+            counters = "".join(f"{format_counter(stage['counters'].get(counter, '')):>19}" for counter in SUMMARY_COUNTERS)
+            errors = f"  ({stage['errors']} failed)" if stage['errors'] else ""
+            lines.append(
+                f"{name:<24}{stage['calls']:>7}{stage['duration']:>10.2f}{stage['max_duration']:>9.2f}{share:>6.1f}%{counters}{errors}"
+            )
+        return "\n".join(lines)
+
+    def report(self):
+        """
+        Build the machine-readable run report.
+
+        :return: A dictionary with the run, its per-stage totals and every span
+        """
+        with self.lock:
+            spans = [span.to_dict() for span in self.spans]
+        return {
+            'run': self.run_name,
+            'run_id': self.run_id,
+            'started_at': datetime.datetime.fromtimestamp(self.started_at).isoformat(),
+            'duration': round(self.total_duration(), 4),
+            'stages': self.stages(),
+            'spans': spans,
+        }
+
+    def write_report(self, folder=None):
+        """
+        Write the run report as JSON.
+
+        :param folder: The folder to write to (default: RUN_REPORT_DIR)
+        :return: The path of the report
+        """
+        folder = folder or RUN_REPORT_DIR
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{self.run_id}.json")
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.report(), file, indent=2)
+        return path
+
+
+def current_run():
+    """The RunMetrics of the run active in this thread, or None"""
+    return getattr(_local, 'run', None)
+
+
+@contextmanager
+def start_run(run_name, write_report=True):
+    """
+    Collect the spans of a bot run and print its summary table when it ends.
+
+    Spans are recorded for the thread that started the run; outside a run they cost next to nothing.
+
+    :param run_name: The bot the run belongs to, e.g. "potd"
+    :param write_report: Also write the JSON run report
+    :return: The RunMetrics of the run
+    """
+    previous = current_run()
+    run = RunMetrics(run_name)
+    _local.run = run
+    try:
+        yield run
+    finally:
+        _local.run = previous
+        run.finished_at = time.time()
+        print(run.summary_table())
+        if write_report:
+            try:
+                print(f"Run report written to {run.write_report()}")
+            except OSError as e:
+                print(f"Failed to write run report: {e}")
+
+
+@contextmanager
+def span(stage, run=None, **attributes):
+    """
+    Time a pipeline stage and record it in the active run.
+
+    :param stage: The stage name, e.g. "reddit_fetch"
+    :param run: The RunMetrics to record in (default: the run active in this thread)
+    :param attributes: Extra details for the report, e.g. model="gpt-4o-mini"
+    :return: The Span, to add counters with span.add(...)
+    """
+    run = run or current_run()
+    current = Span(stage, attributes)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        if run is not None:
+            run.record(current)
+
+
+def timed(stage, **attributes):
+    """
+    Decorator version of span(); counts the returned items when the result has a length.
+
+    :param stage: The stage name
+    :param attributes: Extra details for the report
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(stage, **attributes) as current:
+                result = function(*args, **kwargs)
+                if hasattr(result, '__len__'):
+                    current.add(items=len(result))
+                return result
+        return wrapper
+    return decorator
+
+
+def add_usage(current, usage):
+    """
+    Add the token usage of an OpenAI response to a span.
+
+    :param current: The Span
+    :param usage: The usage object of a completion or run, may be None
+    """
+    if usage is not None:
+        details = getattr(usage, 'completion_tokens_details', None)
+        current.add(
+            prompt_tokens=getattr(usage, 'prompt_tokens', None),
+            completion_tokens=getattr(usage, 'completion_tokens', None),
+            reasoning_tokens=getattr(details, 'reasoning_tokens', None),
+        )
@@ -0,0 +1,403 @@
+import argparse
+import datetime
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from helpers.tools.instrumentation import add_usage, current_run, span
+
+# USD per million (input, output) tokens; reasoning tokens are billed as output
+MODEL_PRICES = {
+    'gpt-5': (1.25, 10.00),
+    'gpt-5-mini': (0.25, 2.00),
+    'gpt-5-nano': (0.05, 0.40),
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4o-mini': (0.15, 0.60),
+}
+# The cheaper model a call falls back to once the run budget is spent
+DOWNGRADES = {
+    'gpt-5': 'gpt-5-mini',
+    'gpt-5-mini': 'gpt-5-nano',
+    'gpt-4o': 'gpt-4o-mini',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT,
+    bot TEXT,
+    api TEXT NOT NULL,
+    model TEXT,
+    requested_model TEXT,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    reasoning_tokens INTEGER NOT NULL,
+    latency REAL NOT NULL,
+    cost REAL,
+    error TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS routed_prompts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT,
+    bot TEXT,
+    tier TEXT NOT NULL,
+    model TEXT NOT NULL,
+    reasoning_effort TEXT,
+    escalated INTEGER NOT NULL,
+    reason TEXT,
+    cost REAL NOT NULL,
+    latency REAL NOT NULL,
+    baseline_cost REAL,
+    baseline_latency REAL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_calls_run ON llm_calls (run_id);
+CREATE INDEX IF NOT EXISTS idx_llm_calls_created ON llm_calls (created_at);
+"""
+
+
+class LLMBudgetExceededError(Exception):
+    """Raised when the run budget is spent and LLM_BUDGET_ACTION is "stop" """
+
+
+def load_prices(overrides=None):
+    """
+    The model prices, with overrides such as "gpt-5=1.25/10,gpt-5-mini=0.25/2".
+
+    :param overrides: The override string (default: LLM_MODEL_PRICES)
+    :return: A dictionary of model to (input, output) USD per million tokens
+    """
+    prices = dict(MODEL_PRICES)
+    overrides = os.getenv('LLM_MODEL_PRICES', '') if overrides is None else overrides
+    for entry in overrides.split(','):
+        if '=' not in entry:
+            continue
+        model, _, price = entry.partition('=')
+        input_price, _, output_price = price.partition('/')
+        prices[model.strip()] = (float(input_price), float(output_price or input_price))
+    return prices
+
+
+def usage_tokens(usage):
+    """
+    Read the token counts of an OpenAI usage object (chat completion or assistant run).
+
+    :return: A tuple (prompt tokens, completion tokens including reasoning, reasoning tokens)
+    """
+    if usage is None:
+        return 0, 0, 0
+    details = getattr(usage, 'completion_tokens_details', None)
+    return (
+        getattr(usage, 'prompt_tokens', 0) or 0,
+        getattr(usage, 'completion_tokens', 0) or 0,
+        getattr(details, 'reasoning_tokens', 0) or 0,
+    )
+
+
+class LLMCall:
+    def __init__(self, model):
+        """
+        What a tracked call reports back: the response's usage and, if it differs, the model that answered.
+
+        Once the call is recorded it also holds its prompt tokens, cost and latency.
+        """
+        self.model = model
+        self.usage = None
+        self.prompt_tokens = 0
+        self.cost = None
+        self.latency = 0.0
+
+
+class UsageLedger:
+    def __init__(self, db_path=None, budget=None, budget_action=None, prices=None):
+        """
+        Token and cost accounting of every LLM call, persisted in SQLite and summed per run.
+
+        :param db_path: Path to the SQLite database (default: LLM_USAGE_DB, logs/llm_usage.db)
+        :param budget: USD a single bot run may spend, 0 for no limit (default: LLM_RUN_BUDGET_USD)
+        :param budget_action: "downgrade" to a cheaper model or "stop" once the budget is spent
+                              (default: LLM_BUDGET_ACTION)
+        :param prices: Model prices as returned by load_prices()
+        """
+        self.db_path = db_path or os.getenv('LLM_USAGE_DB', os.path.join('logs', 'llm_usage.db'))
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.budget = float(os.getenv('LLM_RUN_BUDGET_USD') or 0) if budget is None else budget
+        self.budget_action = budget_action or os.getenv('LLM_BUDGET_ACTION', 'downgrade')
+        self.prices = prices or load_prices()
+        # Shared by the worker threads of the bot daemon
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.migrate()
+        self.connection.executescript(SCHEMA)
+        # USD spent per active run
+        self.spent = weakref.WeakKeyDictionary()
+
+    def migrate(self):
+        """
+        Make the baseline of routed prompts optional in ledgers created before it was measured.
+
+        Their baselines were estimates, so they are dropped rather than reported as savings.
+        """
+        columns = self.connection.execute("PRAGMA table_info(routed_prompts)").fetchall()
+        if not any(column['name'] == 'baseline_cost' and column['notnull'] for column in columns):
+            return
+        kept = "run_id, bot, tier, model, reasoning_effort, escalated, reason, cost, latency, created_at"
+        with self.connection:
+            self.connection.execute("ALTER TABLE routed_prompts RENAME TO routed_prompts_estimated")
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(
+                f"INSERT INTO routed_prompts ({kept}) SELECT {kept} FROM routed_prompts_estimated"
+            )
+            self.connection.execute("DROP TABLE routed_prompts_estimated")
+
+    def price(self, model):
+        """The (input, output) price of a model, matching dated versions such as gpt-5-2025-08-07"""
+        if not model:
+            return None
+        for name in sorted(self.prices, key=len, reverse=True):
+            if model == name or model.startswith(f"{name}-"):
+                return self.prices[name]
+        return None
+
+    def cost(self, model, prompt_tokens, completion_tokens):
+        """
+        The USD cost of a call.
+
+        :return: The cost, or None if the model has no known price
+        """
+        price = self.price(model)
+        if price is None:
+            return None
+        return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+    def run_spend(self, run=None):
+        """USD spent so far by a run (default: the run active in this thread)"""
+        run = run or current_run()
+        return self.spent.get(run, 0.0) if run is not None else 0.0
+
+    def choose_model(self, model):
+        """
+        Check the run budget before a call.
+
+        :param model: The model the caller asked for, None when it is fixed (assistants)
+        :return: The model to use, the next cheaper one once the budget is spent in "downgrade" mode
+        :raises LLMBudgetExceededError: When the budget is spent in "stop" mode or there is no cheaper model
+        """
+        spent = self.run_spend()
+        if not self.budget or spent < self.budget:
+            return model
+        if self.budget_action == 'downgrade' and self.price(DOWNGRADES.get(model)) is not None:
+            print(f"LLM budget of ${self.budget:g} spent (${spent:.4f}), using {DOWNGRADES[model]} instead of {model}")
+            return DOWNGRADES[model]
+        raise LLMBudgetExceededError(f"LLM budget of ${self.budget:g} for this run is spent (${spent:.4f})")
+
+    def record(self, api, model, usage, latency, requested_model=None, error=None, run=None):
+        """
+        Store one call and add its cost to the run.
+
+        :param api: The API used, e.g. "chat" or "assistant_stream"
+        :param model: The model that answered
+        :param usage: The usage object of the response, may be None
+        :param latency: Seconds the call took
+        :param requested_model: The model asked for, when the budget downgraded the call
+        :param error: The error the call failed with
+        :param run: The RunMetrics of the run (default: the run active in this thread)
+        :return: The USD cost of the call, None if the model has no known price
+        """
+        run = run or current_run()
+        prompt_tokens, completion_tokens, reasoning_tokens = usage_tokens(usage)
+        cost = self.cost(model, prompt_tokens, completion_tokens)
+        with self.lock:
+            if run is not None and cost:
+                self.spent[run] = self.spent.get(run, 0.0) + cost
+            self.connection.execute(
+                "INSERT INTO llm_calls (run_id, bot, api, model, requested_model, prompt_tokens, completion_tokens, "
+                "reasoning_tokens, latency, cost, error, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run.run_id if run else None, run.run_name if run else None, api, model,
+                 requested_model if requested_model != model else None, prompt_tokens, completion_tokens,
+                 reasoning_tokens, round(latency, 4), cost, error, datetime.datetime.now().isoformat()),
+            )
+            self.connection.commit()
+        return cost
+
+    @contextmanager
+    def track(self, api, model, requested_model=None):
+        """
+        Time an LLM call as an "llm" span and record its usage and cost when it ends.
+
+        Set call.usage (and call.model if the response names another model) inside the block.
+
+        :param api: The API used, e.g. "chat"
+        :param model: The model the call is sent to
+        :param requested_model: The model the caller asked for, if the budget downgraded it
+        :return: The LLMCall to report the usage on
+        """
+        call = LLMCall(model)
+        error = None
+        with span('llm', api=api, model=model) as current:
+            started = time.perf_counter()
+            try:
+                yield call
+            except BaseException as e:
+                error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                add_usage(current, call.usage)
+                call.latency = time.perf_counter() - started
+                call.prompt_tokens = usage_tokens(call.usage)[0]
+                call.cost = self.record(api, call.model, call.usage, call.latency, requested_model, error)
+                current.add(cost_usd=call.cost)
+
+    def record_route(self, decision, cost, latency, baseline_cost, baseline_latency, run=None):
+        """
+        Store how a routed prompt was answered, next to its baseline measurement if it was sampled.
+
+        :param decision: The RouteDecision of the answering call
+        :param cost: USD of all calls for the prompt, including a cheap answer that was escalated
+        :param latency: Seconds of all calls for the prompt
+        :param baseline_cost: Measured USD on the baseline model, None if the prompt was not sampled
+        :param baseline_latency: Measured seconds on the baseline model, None if the prompt was not sampled
+        :param run: The RunMetrics of the run (default: the run active in this thread)
+        """
+        run = run or current_run()
+        with self.lock:
+            self.connection.execute(
+                "INSERT INTO routed_prompts (run_id, bot, tier, model, reasoning_effort, escalated, reason, cost, "
+                "latency, baseline_cost, baseline_latency, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run.run_id if run else None, run.run_name if run else None, decision.tier, decision.model,
+                 decision.reasoning_effort, int(decision.escalated), decision.reason, cost, round(latency, 4),
+                 baseline_cost, round(baseline_latency, 4) if baseline_latency is not None else None,
+                 datetime.datetime.now().isoformat()),
+            )
+            self.connection.commit()
+
+    def routing_savings(self, group_by='bot', days=None):
+        """
+        Sum the cost and latency of routed prompts, and of the sampled ones against their baseline.
+
+        Only the prompts that were also measured on the baseline model are compared with it;
+        without any, the baseline totals are None.
+
+        :param group_by: "bot", "run_id" or "tier"
+        :param days: Only include prompts of the last this many days
+        :return: A list of dictionaries with the group, prompts, escalations, cost and latency totals,
+                 the number of sampled prompts and their cost and latency next to the baseline's
+        """
+        if group_by not in ('bot', 'run_id', 'tier'):
+            raise ValueError(f"Cannot group routing savings by {group_by}")
+        since = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat() if days else ''
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT {group_by} AS name, COUNT(*) AS prompts, SUM(escalated) AS escalated, SUM(cost) AS cost, "
+                "SUM(latency) AS latency, COUNT(baseline_cost) AS sampled, "
+                "SUM(CASE WHEN baseline_cost IS NOT NULL THEN cost END) AS sampled_cost, "
+                "SUM(baseline_cost) AS baseline_cost, "
+                "SUM(CASE WHEN baseline_cost IS NOT NULL THEN latency END) AS sampled_latency, "
+                "SUM(baseline_latency) AS baseline_latency "
+                f"FROM routed_prompts WHERE created_at >= ? GROUP BY {group_by} ORDER BY MIN(created_at)",
+                (since,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def totals(self, group_by='bot', days=None):
+        """
+        Sum the recorded calls.
+
+        :param group_by: "bot", "run_id", "model" or "api"
+        :param days: Only include calls of the last this many days
+        :return: A list of dictionaries with the group, calls, tokens, latency and cost
+        """
+        if group_by not in ('bot', 'run_id', 'model', 'api'):
+            raise ValueError(f"Cannot group LLM usage by {group_by}")
+        since = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat() if days else ''
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT {group_by} AS name, COUNT(*) AS calls, SUM(prompt_tokens) AS prompt_tokens, "
+                "SUM(completion_tokens) AS completion_tokens, SUM(reasoning_tokens) AS reasoning_tokens, "
+                "AVG(latency) AS avg_latency, SUM(COALESCE(cost, 0)) AS cost, COUNT(error) AS errors "
+                f"FROM llm_calls WHERE created_at >= ? GROUP BY {group_by} ORDER BY MIN(created_at)",
+                (since,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self.lock:
+            self.connection.close()
+
+
+def format_totals(rows, group_by='bot'):
+    """
+    Format usage totals as a plain text table.
+
+    :param rows: The rows returned by UsageLedger.totals()
+    :param group_by: The column the rows are grouped by
+    :return: The table as a string
+    """
+    header = (f"{group_by:<28}{'Calls':>7}{'Prompt':>11}{'Completion':>12}{'Reasoning':>11}"
+              f"{'Avg s':>8}{'Cost $':>10}")
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(
+            f"{str(row['name']):<28}{row['calls']:>7}{row['prompt_tokens']:>11}{row['completion_tokens']:>12}"
+            f"{row['reasoning_tokens']:>11}{row['avg_latency']:>8.2f}{row['cost']:>10.4f}"
+        )
+    return "\n".join(lines)
+
+
+def format_savings(rows, group_by='bot'):
+    """
+    Format routing savings as a plain text table.
+
+    The savings columns compare only the sampled prompts with their measured baseline.
+
+    :param rows: The rows returned by UsageLedger.routing_savings()
+    :param group_by: The column the rows are grouped by
+    :return: The table as a string
+    """
+    header = (f"{group_by:<28}{'Prompts':>8}{'Escal.':>8}{'Cost $':>10}{'Time s':>9}{'Sampled':>9}"
+              f"{'Sample $':>10}{'Baseline $':>12}{'Saved':>8}{'Sample s':>10}{'Baseline s':>12}{'Saved':>8}")
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        line = (f"{str(row['name']):<28}{row['prompts']:>8}{row['escalated']:>8}{row['cost']:>10.4f}"
+                f"{row['latency']:>9.1f}{row['sampled']:>9}")
+        if row['sampled']:
+            cost_saved = 1 - row['sampled_cost'] / row['baseline_cost'] if row['baseline_cost'] else 0.0
+            time_saved = 1 - row['sampled_latency'] / row['baseline_latency'] if row['baseline_latency'] else 0.0
+            line += (f"{row['sampled_cost']:>10.4f}{row['baseline_cost']:>12.4f}{cost_saved:>8.0%}"
+                     f"{row['sampled_latency']:>10.1f}{row['baseline_latency']:>12.1f}{time_saved:>8.0%}")
+        else:
+            line += f"{'no baseline sampled yet':>60}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the recorded LLM token usage and cost")
+    parser.add_argument('--by', default='bot', choices=['bot', 'run_id', 'model', 'api', 'tier'])
+    parser.add_argument('--days', type=int, help="Only the last this many days")
+    parser.add_argument('--savings', action='store_true', help="Show the model routing savings against always gpt-5")
+    parser.add_argument('--db', help="The usage database (default: LLM_USAGE_DB)")
+    args = parser.parse_args()
+
+    ledger = UsageLedger(args.db)
+    try:
+        if args.savings:
+            print(format_savings(ledger.routing_savings(args.by, args.days), args.by))
+        else:
+            print(format_totals(ledger.totals(args.by, args.days), args.by))
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import os
+import random
+
+# Model and reasoning effort of each tier, cheapest first
+ROUTE_TIERS = {
+    'trivial': ('gpt-5-nano', 'minimal'),
+    'standard': ('gpt-5-mini', 'low'),
+    'hard': ('gpt-5', 'medium'),
+}
+# The always-gpt-5 setup (default reasoning effort) routing is measured against
+BASELINE_MODEL = 'gpt-5'
+
+
+def parse_score_range(text):
+    """
+    Parse an inclusive score range such as "6-7".
+
+    :return: A tuple (lowest, highest)
+    """
+    low, _, high = text.partition('-')
+    return float(low), float(high or low)
+
+
+class RouteDecision:
+    def __init__(self, tier, model, reasoning_effort, reason):
+        """
+        The model a prompt is sent to.
+
+        :param tier: "trivial", "standard", "hard" or "baseline" when routing is off
+        :param model: The model name
+        :param reasoning_effort: The reasoning effort, None for the model's default
+        :param reason: Why the prompt was routed there, for the logs
+        """
+        self.tier = tier
+        self.model = model
+        self.reasoning_effort = reasoning_effort
+        self.reason = reason
+        self.escalated = False
+
+    def __repr__(self):
+        effort = f"/{self.reasoning_effort}" if self.reasoning_effort else ""
+        return f"{self.model}{effort} ({self.tier}: {self.reason})"
+
+
+class ModelRouter:
+    def __init__(self, enabled=None, short_tokens=None, low_confidence=None, borderline=None, shadow_rate=None):
+        """
+        Pick the cheapest model that can handle a prompt from features of its input.
+
+        :param enabled: Route at all; off sends everything to the baseline (default: MODEL_ROUTING)
+        :param short_tokens: Inputs with fewer tokens go to the trivial tier (default: MODEL_ROUTER_SHORT_TOKENS)
+        :param low_confidence: Inputs the pre-filter is less confident about go to the trivial tier
+                               (default: MODEL_ROUTER_LOW_CONFIDENCE)
+        :param borderline: (lowest, highest) score of a cheap answer that is re-asked on the hard tier
+                           (default: MODEL_ROUTER_BORDERLINE)
+        :param shadow_rate: Share (0-1) of routed prompts also sent to the baseline model to measure the
+                            savings against (default: MODEL_ROUTER_SHADOW_RATE)
+        """
+        if enabled is None:
+            enabled = os.getenv('MODEL_ROUTING', 'true').lower() in ('1', 'true', 'yes')
+        self.enabled = enabled
+        self.short_tokens = short_tokens if short_tokens is not None else int(os.getenv('MODEL_ROUTER_SHORT_TOKENS', '40'))
+        self.low_confidence = low_confidence if low_confidence is not None else float(
+            os.getenv('MODEL_ROUTER_LOW_CONFIDENCE', '0.25')
+        )
+        self.borderline = borderline or parse_score_range(os.getenv('MODEL_ROUTER_BORDERLINE', '6-7'))
+        self.shadow_rate = shadow_rate if shadow_rate is not None else float(os.getenv('MODEL_ROUTER_SHADOW_RATE', '0.1'))
+
+    def _decision(self, tier, reason):
+        model, reasoning_effort = ROUTE_TIERS[tier]
+        return RouteDecision(tier, model, reasoning_effort, reason)
+
+    def route(self, features):
+        """
+        Choose the first model for a prompt.
+
+        :param features: Features of the input: "tokens" (length of the content), "link_only"
+                         (nothing but a link) and "confidence" (0-1, how likely a local pre-filter
+                         thinks the input is worth a deep analysis)
+        :return: A RouteDecision
+        """
+        if not self.enabled:
+            return RouteDecision('baseline', BASELINE_MODEL, None, "routing disabled")
+        if features.get('link_only'):
+            return self._decision('trivial', "link-only post")
+        tokens = features.get('tokens')
+        if tokens is not None and tokens < self.short_tokens:
+            return self._decision('trivial', f"short input ({tokens} tokens)")
+        confidence = features.get('confidence')
+        if confidence is not None and confidence < self.low_confidence:
+            return self._decision('trivial', f"pre-filter confidence {confidence:.2f}")
+        return self._decision('standard', f"{tokens} tokens, pre-filter confidence {confidence}")
+
+    def should_escalate(self, decision, score):
+        """
+        Check whether a cheap answer is too close to the decision threshold to trust.
+
+        :param decision: The RouteDecision of the answer
+        :param score: The structured score read from the answer, None if there is none
+        :return: True if the prompt should be re-asked on the hard tier
+        """
+        if decision.tier in ('hard', 'baseline') or score is None:
+            return False
+        return self.borderline[0] <= score <= self.borderline[1]
+
+    def should_shadow(self, decision):
+        """
+        Decide at random, before the answer is known, whether a prompt is also measured on the baseline model.
+
+        :param decision: The first RouteDecision of the prompt
+        :return: True if the prompt is part of the baseline sample
+        """
+        return decision.tier != 'baseline' and random.random() < self.shadow_rate
+
+    def escalate(self, decision, score):
+        """The hard tier decision for a prompt whose cheap answer was borderline"""
+        escalated = self._decision('hard', f"borderline score {score} from {decision.model}")
+        escalated.escalated = True
+        return escalated
@@ -2,11 +2,17 @@ import os
 import requests
 from dotenv import load_dotenv
 
+from helpers.tools.instrumentation import span
+
 # Load environment variables from .env file
 load_dotenv()
 
 class OCRAPI:
-    def __init__(self):
+    def __init__(self, session=None):
+        """
+        :param session: A requests.Session to reuse connections from (default: a new one)
+        """
+        self.session = session or requests.Session()
         self.api_key = os.getenv('OCR_SPACE_API_KEY')
         if not self.api_key:
             raise ValueError("OCR_SPACE_API_KEY not found in environment variables")
@@ -29,9 +35,10 @@ class OCRAPI:
             'isOverlayRequired': False
         }
 
-        with open(image_path, 'rb') as image_file:
+        with span('ocr') as current, open(image_path, 'rb') as image_file:
             files = {'image': image_file}
-            response = requests.post(self.base_url, files=files, data=payload)
+            response = self.session.post(self.base_url, files=files, data=payload)
+            current.add(items=1, bytes=os.path.getsize(image_path))
 
         response.raise_for_status()
         result = response.json()
@@ -3,16 +3,38 @@ import requests
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 
+from helpers.tools.instrumentation import span
+
 # Load environment variables from .env file
 load_dotenv(override=True)
 
 class OddsAPI:
-    def __init__(self):
+    def __init__(self, session=None):
+        """
+        :param session: A requests.Session to reuse connections from (default: a new one)
+        """
+        self.session = session or requests.Session()
         self.api_key = os.getenv('ODDS_API_KEY')
         if not self.api_key:
             raise ValueError("ODDS_API_KEY not found in environment variables")
         self.base_url = "https://api.the-odds-api.com/v4/sports"
 
+    def _get(self, url, params, endpoint):
+        """
+        Send a GET request to the Odds API and record it in the active run.
+
+        :param url: The endpoint URL
+        :param params: The query parameters
+        :param endpoint: A short name of the endpoint for the run report
+        :return: The response
+        """
+        with span('odds_api', endpoint=endpoint) as current:
+            response = self.session.get(url, params=params)
+            current.add(bytes=len(response.content))
+            # The quota left is reported with every response
+            current.attributes['requests_remaining'] = response.headers.get('x-requests-remaining')
+            return response
+
     def get_nfl_odds_bovada(self) -> List[Dict[Any, Any]]:
         url = f"{self.base_url}/americanfootball_nfl/odds"
         params = {
@@ -23,7 +45,7 @@ class OddsAPI:
             "bookmakers": "bovada"
         }
         
-        response = requests.get(url, params=params)
+        response = self._get(url, params, 'odds')
         response.raise_for_status()
         
         return response.json()
@@ -38,7 +60,7 @@ class OddsAPI:
         }
         
         try:
-            response = requests.get(url, params=params)
+            response = self._get(url, params, 'player_props')
             response.raise_for_status()
             data = response.json()
             
@@ -56,6 +78,25 @@ class OddsAPI:
             print(f"Error fetching player props: {str(e)}")
             return []
 
+    def get_scores(self, sport: str, days_from: int = 3) -> List[Dict[Any, Any]]:
+        """
+        Fetch live and recently completed games with their scores.
+
+        :param sport: The sport key, e.g. "americanfootball_nfl" or "basketball_nba"
+        :param days_from: How many days in the past to include completed games for (1-3)
+        :return: A list of games with their scores
+        """
+        url = f"{self.base_url}/{sport}/scores"
+        params = {
+            "api_key": self.api_key,
+            "daysFrom": days_from,
+        }
+
+        response = self._get(url, params, 'scores')
+        response.raise_for_status()
+
+        return response.json()
+
 # Usage example:
 # odds_api = OddsAPI()
 # nfl_odds = odds_api.get_nfl_odds_bovada()
@@ -3,9 +3,20 @@ import os
 from openai import OpenAI
 import re
 
+from helpers.tools.instrumentation import span
+from helpers.tools.llm_usage import UsageLedger
+from helpers.tools.model_router import BASELINE_MODEL, ModelRouter
+
 class OpenAIClient:
-    def __init__(self):
-        self.client = OpenAI()
+    def __init__(self, client=None, usage_ledger=None, router=None):
+        """
+        :param client: An OpenAI client, or a stand-in with the same interface (default: a new OpenAI())
+        :param usage_ledger: The UsageLedger every call is recorded and budgeted in (default: a new one)
+        :param router: The ModelRouter used by complete_routed (default: a new one)
+        """
+        self.client = client or OpenAI()
+        self.usage = usage_ledger or UsageLedger()
+        self.router = router or ModelRouter()
         self.api_key = os.getenv('OPENAI_API_KEY')
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
@@ -57,9 +68,11 @@ class OpenAIClient:
 
             # Use the upload and poll helper method to upload the files, add them to the vector store,
             # and poll the status of the file batch for completion.
-            file_batch = self.client.beta.vector_stores.file_batches.upload_and_poll(
-                vector_store_id=vector_store.id, files=file_streams
-            )
+            with span('vector_store_upload') as current:
+                file_batch = self.client.beta.vector_stores.file_batches.upload_and_poll(
+                    vector_store_id=vector_store.id, files=file_streams
+                )
+                current.add(items=len(file_paths), bytes=sum(os.path.getsize(path) for path in file_paths))
             
             # Print the status and the file counts of the batch to see the results
             print(file_batch.file_counts)
@@ -87,13 +100,156 @@ class OpenAIClient:
             role="user",
             content=query,
         )
-        run = self.client.beta.threads.runs.create_and_poll(
-            thread_id=thread.id, assistant_id=assistant_id
-        )
+        # The model is part of the assistant, so the budget can only stop the call
+        self.usage.choose_model(None)
+        with self.usage.track('assistant', 'assistant') as call:
+            run = self.client.beta.threads.runs.create_and_poll(
+                thread_id=thread.id, assistant_id=assistant_id
+            )
+            call.model = getattr(run, 'model', call.model)
+            call.usage = run.usage
         messages = list(self.client.beta.threads.messages.list(thread_id=thread.id, run_id=run.id))
         response = messages[0].content[0].text.value
         return response
+
+    def stream_assistant(self, assistant_id, query):
+        """
+        Query the assistant and yield its response as it is generated.
+
+        The thread, the message and the run are created in a single streaming call,
+        so the first tokens arrive without waiting for the whole run to finish.
+        
+        :param assistant_id: The ID of the assistant
+        :param query: The input query for the assistant
+        :return: A generator yielding fragments of the assistant's response
+        """
+        self.usage.choose_model(None)
+        # The call covers the whole stream, including the time the caller spends on each fragment
+        with self.usage.track('assistant_stream', 'assistant') as call, self.client.beta.threads.create_and_run_stream(
+            assistant_id=assistant_id,
+            thread={"messages": [{"role": "user", "content": query}]},
+        ) as stream:
+            for text in stream.text_deltas:
+                yield text
+            call.model = getattr(stream.current_run, 'model', None) or call.model
+            call.usage = getattr(stream.current_run, 'usage', None)
     
+    def stream_completion(self, instructions, query, model_name="gpt-4o-mini"):
+        """
+        Send a single prompt to a chat model and yield its response as it is generated.
+
+        Unlike stream_assistant this needs no assistant, thread or vector store, which makes
+        it the cheaper choice when the whole context fits into the prompt.
+
+        :param instructions: The system instructions for the model
+        :param query: The user prompt
+        :param model_name: The model to be used (e.g., "gpt-4o")
+        :return: A generator yielding fragments of the model's response
+        """
+        model = self.usage.choose_model(model_name)
+        with self.usage.track('chat_stream', model, model_name) as call:
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": instructions},
+                    {"role": "user", "content": query},
+                ],
+                stream=True,
+                # The last chunk then carries the token usage
+                stream_options={"include_usage": True},
+            )
+            for chunk in stream:
+                if chunk.usage:
+                    call.usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    def complete(self, instructions, query, model_name="gpt-4o-mini", **kwargs):
+        """
+        Send a single prompt to a chat model and return its whole response.
+
+        :param instructions: The system instructions for the model
+        :param query: The user prompt
+        :param model_name: The model to be used (e.g., "gpt-5"); a cheaper one once the run budget is spent
+        :param kwargs: Further completion parameters, e.g. max_completion_tokens
+        :return: The model's response
+        """
+        return self._complete(instructions, query, model_name, **kwargs)[0]
+
+    def _complete(self, instructions, query, model_name, reasoning_effort=None, **kwargs):
+        """complete(), also returning the recorded LLMCall with its cost and latency"""
+        model = self.usage.choose_model(model_name)
+        if reasoning_effort:
+            kwargs['reasoning_effort'] = reasoning_effort
+        with self.usage.track('chat', model, model_name) as call:
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": instructions},
+                    {"role": "user", "content": query},
+                ],
+                **kwargs
+            )
+            call.usage = response.usage
+        return response.choices[0].message.content, call
+
+    def complete_routed(self, instructions, query, features, score=None, **kwargs):
+        """
+        Send a single prompt to the cheapest model the router picks for it.
+
+        When the cheap answer's score is borderline the prompt is asked again on the hard tier.
+        A random sample of prompts (MODEL_ROUTER_SHADOW_RATE) is also sent to the baseline model
+        and its answer discarded, so the savings shown by `python -m helpers.tools.llm_usage --savings`
+        are measured rather than assumed.
+
+        :param instructions: The system instructions for the model
+        :param query: The user prompt
+        :param features: Input features for ModelRouter.route, e.g. {"tokens": 120, "link_only": False, "confidence": 0.6}
+        :param score: A function reading the structured score from a response, e.g. the AI Integration score
+        :param kwargs: Further completion parameters, e.g. max_completion_tokens
+        :return: A tuple (the model's response, the RouteDecision of the model that gave it)
+        """
+        decision = self.router.route(features)
+        # Drawn before the answer is known, so the sample is not skewed towards escalated prompts
+        shadow = self.router.should_shadow(decision)
+        response, call = self._complete(instructions, query, decision.model, decision.reasoning_effort, **kwargs)
+        cost, latency = call.cost or 0.0, call.latency
+        baseline = None
+        if decision.tier == 'baseline':
+            # With routing off every call is a baseline measurement
+            baseline = call
+
+        cheap_score = score(response) if score else None
+        if self.router.should_escalate(decision, cheap_score):
+            decision = self.router.escalate(decision, cheap_score)
+            print(f"Escalating to {decision.model}: {decision.reason}")
+            response, call = self._complete(instructions, query, decision.model, decision.reasoning_effort, **kwargs)
+            cost, latency = cost + (call.cost or 0.0), latency + call.latency
+
+        if shadow and decision.escalated and decision.model == BASELINE_MODEL and decision.reasoning_effort in (None, 'medium'):
+            # The escalated answer already is one on the baseline model at its default effort
+            baseline = call
+        elif shadow:
+            baseline = self._shadow_baseline(instructions, query, **kwargs)
+
+        baseline_cost = baseline.cost if baseline and baseline.model == BASELINE_MODEL else None
+        baseline_latency = baseline.latency if baseline_cost is not None else None
+        self.usage.record_route(decision, cost, latency, baseline_cost, baseline_latency)
+        return response, decision
+
+    def _shadow_baseline(self, instructions, query, **kwargs):
+        """
+        Measure a routed prompt on the baseline model at its default reasoning effort.
+
+        :return: The LLMCall of the baseline answer, or None if it failed
+        """
+        try:
+            _, call = self._complete(instructions, query, BASELINE_MODEL, **kwargs)
+            return call
+        except Exception as e:
+            print(f"Baseline sample on {BASELINE_MODEL} failed: {e}")
+            return None
+
     def delete_all_vector_stores(self):
         """
         Delete all vector stores.
@@ -0,0 +1,121 @@
+"""
+Event-Driven Page Waits
+Explicit wait conditions with short polling, replacing fixed sleeps in browser automation
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, JavascriptException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Evaluates a list of XPath selectors in the page and returns [index, element] of the first match.
+# Visibility mirrors WebElement.is_displayed closely enough for buttons and text: the element has
+# a layout box and is not hidden by CSS. Enabled mirrors WebElement.is_enabled.
+FIND_ANY_SCRIPT = """
+var selectors = arguments[0], requireVisible = arguments[1], requireEnabled = arguments[2];
+function isEnabled(element) {
+    return !element.disabled && element.getAttribute('aria-disabled') !== 'true';
+}
+function isVisible(element) {
+    if (!element.getClientRects || element.getClientRects().length === 0) return false;
+    var style = window.getComputedStyle(element);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+}
+for (var i = 0; i < selectors.length; i++) {
+    var result;
+    try {
+        result = document.evaluate(selectors[i], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    } catch (e) {
+        continue;
+    }
+    for (var j = 0; j < result.snapshotLength; j++) {
+        var element = result.snapshotItem(j);
+        if (element.nodeType === 1 && (!requireVisible || isVisible(element))
+                && (!requireEnabled || isEnabled(element))) return [i, element];
+    }
+}
+return null;
+"""
+
+# Number of finished resource requests and the document state, used to detect network idle
+NETWORK_STATE_SCRIPT = """
+return [document.readyState, performance.getEntriesByType('resource').length];
+"""
+
+
+class PageWaiter:
+    def __init__(self, driver, poll_interval=0.1):
+        self.driver = driver
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+        self.timings = {}
+
+    @contextmanager
+    def step(self, name):
+        """Log how long a step took and keep the latest timing per step"""
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started_at
+            self.timings[name] = elapsed
+            self.logger.info(f"⏱️ {name}: {elapsed:.2f}s")
+
+    def until(self, condition, timeout=10, description="condition"):
+        """Poll a condition every poll_interval seconds, returns its value or None on timeout"""
+        try:
+            return WebDriverWait(
+                self.driver, timeout, poll_frequency=self.poll_interval,
+                ignored_exceptions=(StaleElementReferenceException, JavascriptException),
+            ).until(condition)
+        except TimeoutException:
+            self.logger.warning(f"⚠️ Timed out after {timeout}s waiting for {description}")
+            return None
+
+    def find_any(self, selectors, visible=True, enabled=False):
+        """Find the first of several XPath selectors in one round trip, returns (index, element) or (None, None)"""
+        match = self.driver.execute_script(FIND_ANY_SCRIPT, list(selectors), visible, enabled)
+        if not match:
+            return None, None
+        return match[0], match[1]
+
+    def any_of(self, selectors, timeout=10, visible=True):
+        """Wait until any of several XPath selectors matches, returns (index, element) or (None, None)"""
+        def found(driver):
+            index, element = self.find_any(selectors, visible)
+            return (index, element) if element is not None else False
+
+        return self.until(found, timeout, f"any of {len(selectors)} selectors") or (None, None)
+
+    def element_present(self, locator, timeout=10):
+        """Wait until an element is in the DOM"""
+        return self.until(EC.presence_of_element_located(locator), timeout, f"element {locator[1]}")
+
+    def element_clickable(self, locator, timeout=10):
+        """Wait until an element is visible and enabled"""
+        return self.until(EC.element_to_be_clickable(locator), timeout, f"clickable {locator[1]}")
+
+    def element_gone(self, element, timeout=10):
+        """Wait until an element is removed from the page, e.g. after a navigation"""
+        return self.until(EC.staleness_of(element), timeout, "page to change")
+
+    def url_changes(self, old_url, timeout=10):
+        """Wait until the URL differs from old_url"""
+        return self.until(EC.url_changes(old_url), timeout, "URL change")
+
+    def network_idle(self, timeout=10, idle_time=0.5):
+        """Wait until the document is loaded and no new resources finished for idle_time seconds"""
+        state = {'count': None, 'since': time.monotonic()}
+
+        def is_idle(driver):
+            ready_state, count = driver.execute_script(NETWORK_STATE_SCRIPT)
+            now = time.monotonic()
+            if count != state['count']:
+                state['count'], state['since'] = count, now
+                return False
+            return ready_state == 'complete' and now - state['since'] >= idle_time
+
+        return bool(self.until(is_idle, timeout, "network idle"))
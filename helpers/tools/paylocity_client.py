@@ -9,20 +9,26 @@ import subprocess
 import re
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
 import undetected_chromedriver as uc
 from dotenv import load_dotenv
 import os
 
+from helpers.tools.chrome_cache import ChromeInstallCache
+from helpers.tools.page_waits import PageWaiter
+from helpers.tools.selector_resolver import SelectorResolver
+from helpers.tools.session_store import paylocity_session_store
+
 load_dotenv()
 
 class PaylocityClient:
     def __init__(self, headless=False):
         self.driver = None
+        self.waits = None
+        self.resolver = None
         self.headless = headless
         self.logger = logging.getLogger(__name__)
+        self.chrome_cache = ChromeInstallCache()
         
         # Credentials
         self.company_id = os.getenv('PAYLOCITY_COMPANY_ID')
@@ -42,6 +48,54 @@ class PaylocityClient:
             'remember_username': (By.ID, 'RememberUsername')
         }
 
+        # Elements that only show up on the dashboard once logged in
+        self.dashboard_indicators = [
+            # Look for user name or company info
+            "//*[contains(text(), 'Good evening')]",
+            "//*[contains(text(), 'XL Industries')]",
+            "//*[contains(text(), '301469')]",
+            # Look for main navigation
+            "//*[contains(text(), 'HR & Payroll')]",
+            "//*[contains(text(), 'Employees')]",
+            # Look for dashboard widgets
+            "//*[contains(text(), 'Time off')]",
+            "//*[contains(text(), 'Pay')]",
+            "//*[contains(text(), 'Time')]",
+            # Look for Clock In/Out buttons (case insensitive)
+            "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'clock in')]",
+            "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'clock out')]",
+            "//input[contains(translate(@value, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'clock in')]",
+            "//input[contains(translate(@value, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'clock out')]"
+        ]
+        # Messages shown on the login page when the credentials are refused or the account is locked
+        self.login_error_selectors = [
+            "//*[contains(@class, 'validation-summary-errors') and normalize-space()]",
+            "//*[contains(@class, 'field-validation-error') and normalize-space()]",
+            "//*[@role='alert' and normalize-space()]",
+            "//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'incorrect')]",
+            "//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'locked')]"
+        ]
+        # Verification steps that need a person: one-time codes and security questions
+        self.mfa_selectors = [
+            "//input[@autocomplete='one-time-code']",
+            "//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'verification code')]",
+            "//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'verify your identity')]",
+            "//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'security question')]"
+        ]
+        self.skip_button_selectors = [
+            "//button[contains(text(), 'Skip for Now')]",
+            "//a[contains(text(), 'Skip for Now')]",
+            "//input[@value='Skip for Now']",
+            "//button[contains(@class, 'skip')]",
+            "//a[contains(@class, 'skip')]"
+        ]
+        # Dashboard URL seen after the last successful login, used to refresh a warm session
+        self.dashboard_url = None
+
+        # Encrypted cookies and local storage of the last login, restored before the credential flow
+        self.session_store = paylocity_session_store()
+        self.session_max_age = int(os.getenv('PAYLOCITY_SESSION_MAX_AGE', str(7 * 24 * 3600)))
+
     def _detect_chrome_version(self, chrome_binary):
         """Detect the installed Chrome version dynamically"""
         if not chrome_binary:
@@ -104,6 +158,35 @@ class PaylocityClient:
         
         return None
 
+    def _find_chrome_binary(self):
+        """Find the Chrome binary explicitly (helps with auto-update issues)"""
+        import platform
+        system = platform.system()
+        
+        # Common Chrome binary locations by OS
+        chrome_paths = {
+            'Linux': [
+                '/usr/bin/google-chrome',
+                '/usr/bin/chromium-browser',
+                '/usr/bin/chromium',
+                '/snap/bin/chromium'
+            ],
+            'Darwin': [  # macOS
+                '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+                '/Applications/Chromium.app/Contents/MacOS/Chromium'
+            ],
+            'Windows': [
+                'C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe',
+                'C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe'
+            ]
+        }
+        
+        for path in chrome_paths.get(system, []):
+            if os.path.exists(path):
+                self.logger.info(f"🔍 Found Chrome at: {path}")
+                return path
+        return None
+
     def start(self):
         """Initialize the browser driver"""
         try:
@@ -118,49 +201,42 @@ class PaylocityClient:
             # Anti-detection options
             options.add_argument('--disable-blink-features=AutomationControlled')
             
-            # Try to find Chrome binary explicitly (helps with auto-update issues)
-            import platform
-            system = platform.system()
-            
-            # Common Chrome binary locations by OS
-            chrome_paths = {
-                'Linux': [
-                    '/usr/bin/google-chrome',
-                    '/usr/bin/chromium-browser',
-                    '/usr/bin/chromium',
-                    '/snap/bin/chromium'
-                ],
-                'Darwin': [  # macOS
-                    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
-                    '/Applications/Chromium.app/Contents/MacOS/Chromium'
-                ],
-                'Windows': [
-                    'C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe',
-                    'C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe'
-                ]
-            }
-            
-            # Try to find Chrome binary
-            chrome_binary = None
-            for path in chrome_paths.get(system, []):
-                if os.path.exists(path):
-                    chrome_binary = path
-                    self.logger.info(f"🔍 Found Chrome at: {path}")
-                    break
+            # The binary, version and patched driver are cached on disk; only a cold start probes them
+            cached = self.chrome_cache.load()
+            if cached:
+                chrome_binary, detected_version = cached['binary'], cached['version']
+                self.logger.info(f"⚡ Using cached Chrome {detected_version} at {chrome_binary}")
+            else:
+                chrome_binary = self._find_chrome_binary()
+                # Automatically detect Chrome version to match driver
+                detected_version = self._detect_chrome_version(chrome_binary)
             
             if chrome_binary:
                 options.binary_location = chrome_binary
             
-            # Automatically detect Chrome version to match driver
-            detected_version = self._detect_chrome_version(chrome_binary)
             if detected_version:
                 self.logger.info(f"🔧 Using detected Chrome version: {detected_version}")
-                self.driver = uc.Chrome(options=options, version_main=detected_version)
             else:
                 # Fallback to auto-detection if version detection fails
                 self.logger.info("⚠️ Could not detect Chrome version, falling back to auto-detection")
-                self.driver = uc.Chrome(options=options, version_main=None)
+            try:
+                self.driver = uc.Chrome(
+                    options=options,
+                    version_main=detected_version,
+                    driver_executable_path=cached['driver_path'] if cached else None,
+                )
+            except Exception:
+                if not cached:
+                    raise
+                # A stale cache must not keep the bot from starting: forget it and probe once more
+                self.logger.warning("⚠️ Cached Chrome setup failed, retrying without cache")
+                self.chrome_cache.clear()
+                return self.start()
+            if not cached:
+                self.chrome_cache.save(chrome_binary, detected_version, self.driver.patcher.executable_path)
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            self.waits = PageWaiter(self.driver)
+            self.resolver = SelectorResolver(self.driver, self.waits)
             
             self.logger.info("🚀 Paylocity client started successfully")
             return True
@@ -170,8 +246,8 @@ class PaylocityClient:
             self.logger.error(f"💡 Try updating Chrome or running: pip install --upgrade undetected-chromedriver")
             return False
 
-    def login(self):
-        """Login to Paylocity"""
+    def login(self, use_saved_session=True):
+        """Login to Paylocity, restoring the saved session before falling back to the credential flow"""
         if not self.driver:
             self.logger.error("❌ Driver not initialized")
             return False
@@ -180,44 +256,45 @@ class PaylocityClient:
             self.logger.error("❌ Missing Paylocity credentials in .env file")
             return False
 
+        if use_saved_session and self.restore_session():
+            return True
+
         try:
             self.logger.info("🌐 Navigating to Paylocity login page...")
-            self.driver.get(self.login_url)
-            time.sleep(3)
-
-            # Wait for login form to load
-            wait = WebDriverWait(self.driver, 10)
-            
-            # Fill Company ID
-            self.logger.info("📝 Entering Company ID...")
-            company_field = wait.until(EC.presence_of_element_located(self.login_selectors['company_id']))
-            company_field.clear()
-            company_field.send_keys(self.company_id)
-            time.sleep(1)
-
-            # Fill Username
-            self.logger.info("👤 Entering username...")
-            username_field = self.driver.find_element(*self.login_selectors['username'])
-            username_field.clear()
-            username_field.send_keys(self.username)
-            time.sleep(1)
-
-            # Fill Password
-            self.logger.info("🔒 Entering password...")
-            password_field = self.driver.find_element(*self.login_selectors['password'])
-            password_field.clear()
-            password_field.send_keys(self.password)
-            time.sleep(1)
-
-            # Check "Remember My Username" if not already checked
-            try:
-                remember_checkbox = self.driver.find_element(*self.login_selectors['remember_username'])
-                if not remember_checkbox.is_selected():
-                    remember_checkbox.click()
-                    self.logger.info("✅ Checked 'Remember My Username'")
-                time.sleep(1)
-            except NoSuchElementException:
-                self.logger.info("⚠️ Remember username checkbox not found")
+            with self.waits.step("Login page"):
+                self.driver.get(self.login_url)
+                # Wait for login form to load
+                company_field = self.waits.element_clickable(self.login_selectors['company_id'], timeout=10)
+            if not company_field:
+                self.logger.error("❌ Login form did not load")
+                return False
+
+            with self.waits.step("Login form"):
+                # Fill Company ID
+                self.logger.info("📝 Entering Company ID...")
+                company_field.clear()
+                company_field.send_keys(self.company_id)
+
+                # Fill Username
+                self.logger.info("👤 Entering username...")
+                username_field = self.driver.find_element(*self.login_selectors['username'])
+                username_field.clear()
+                username_field.send_keys(self.username)
+
+                # Fill Password
+                self.logger.info("🔒 Entering password...")
+                password_field = self.driver.find_element(*self.login_selectors['password'])
+                password_field.clear()
+                password_field.send_keys(self.password)
+
+                # Check "Remember My Username" if not already checked
+                try:
+                    remember_checkbox = self.driver.find_element(*self.login_selectors['remember_username'])
+                    if not remember_checkbox.is_selected():
+                        remember_checkbox.click()
+                        self.logger.info("✅ Checked 'Remember My Username'")
+                except NoSuchElementException:
+                    self.logger.info("⚠️ Remember username checkbox not found")
 
             # Click Login button
             self.logger.info("🔐 Clicking login button...")
@@ -226,82 +303,25 @@ class PaylocityClient:
 
             # Wait for login to complete - handle "Skip for Now" and wait for dashboard
             self.logger.info("⏳ Waiting for login to complete...")
-            max_wait = 60  # Increased wait time for full login flow
-            poll_interval = 3
-            elapsed = 0
-            skip_clicked = False
-            
-            while elapsed < max_wait:
-                time.sleep(poll_interval)
-                elapsed += poll_interval
-                
-                # First, check for "Skip for Now" button and click it (only once)
-                if not skip_clicked:
-                    try:
-                        skip_button_selectors = [
-                            "//button[contains(text(), 'Skip for Now')]",
-                            "//a[contains(text(), 'Skip for Now')]",
-                            "//input[@value='Skip for Now']",
-                            "//button[contains(@class, 'skip')]",
-                            "//a[contains(@class, 'skip')]"
-                        ]
-                        
-                        for selector in skip_button_selectors:
-                            try:
-                                skip_button = self.driver.find_element(By.XPATH, selector)
-                                if skip_button.is_displayed():
-                                    self.logger.info(f"🔄 Found 'Skip for Now' button, clicking...")
-                                    skip_button.click()
-                                    time.sleep(5)  # Wait longer for page to load after skip
-                                    skip_clicked = True
-                                    break
-                            except NoSuchElementException:
-                                continue
-                    except Exception as e:
-                        pass  # Continue checking for login success
-                
-                # Look for dashboard elements that indicate successful login
-                try:
-                    # Check for dashboard indicators (more flexible)
-                    dashboard_indicators = [
-                        # Look for user name or company info
-                        "//*[contains(text(), 'Good evening')]",
-                        "//*[contains(text(), 'XL Industries')]",
-                        "//*[contains(text(), '301469')]",
-                        # Look for main navigation
-                        "//*[contains(text(), 'HR & Payroll')]",
-                        "//*[contains(text(), 'Employees')]",
-                        # Look for dashboard widgets
-                        "//*[contains(text(), 'Time off')]",
-                        "//*[contains(text(), 'Pay')]",
-                        "//*[contains(text(), 'Time')]",
-                        # Look for Clock In/Out buttons (case insensitive)
-                        "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'clock in')]",
-                        "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'clock out')]",
-                        "//input[contains(translate(@value, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'clock in')]",
-                        "//input[contains(translate(@value, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'clock out')]"
-                    ]
-                    
-                    for indicator in dashboard_indicators:
-                        try:
-                            element = self.driver.find_element(By.XPATH, indicator)
-                            if element.is_displayed():
-                                self.logger.info(f"✅ Login successful! Found dashboard element: {indicator}")
-                                return True
-                        except NoSuchElementException:
-                            continue
-                    
-                    # Also check if URL changed to dashboard
-                    current_url = self.driver.current_url
-                    if "go.paylocity.com" in current_url and ("home" in current_url or "dashboard" in current_url):
-                        self.logger.info(f"✅ Login successful! URL indicates dashboard: {current_url}")
-                        return True
-                    
-                    self.logger.info(f"⏳ Waiting for dashboard to load... ({elapsed}s)")
-                        
-                except Exception as e:
-                    self.logger.info(f"⏳ Checking for dashboard elements... ({elapsed}s)")
-                    
+            max_wait = 60  # Full login flow including the "Skip for Now" page
+            started_at = time.monotonic()
+            with self.waits.step("Login"):
+                # The login page has to go away first, its text would match some dashboard indicators.
+                # A refused login or a verification step stops the wait right away
+                outcome = self.wait_for_login_outcome(login_button, timeout=max_wait)
+                if outcome == "error":
+                    self.logger.error("❌ Login refused, check the Paylocity credentials")
+                    return False
+                if outcome == "mfa":
+                    self.logger.error("❌ Paylocity asks for a verification step, complete it in a browser once")
+                    return False
+                remaining = max(max_wait - (time.monotonic() - started_at), 1)
+                if self.wait_for_dashboard(timeout=remaining, handle_skip=True):
+                    self.logger.info("✅ Login successful!")
+                    self.dashboard_url = self.driver.current_url
+                    self.save_session()
+                    return True
+
             self.logger.warning(f"⚠️ Waited {max_wait}s but couldn't confirm login")
             return False
 
@@ -309,29 +329,162 @@ class PaylocityClient:
             self.logger.error(f"❌ Login failed: {e}")
             return False
 
+    def save_session(self):
+        """Save the authenticated cookies and local storage to the encrypted profile"""
+        try:
+            # CDP returns the cookies of every Paylocity domain, not just the current page
+            cookies = self.driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+            cookies = [cookie for cookie in cookies if 'paylocity.com' in cookie.get('domain', '')]
+            local_storage = self.driver.execute_script(
+                "var items = {};"
+                "for (var i = 0; i < localStorage.length; i++) {"
+                "  var key = localStorage.key(i); items[key] = localStorage.getItem(key);"
+                "}"
+                "return items;"
+            )
+            return self.session_store.save({
+                'dashboard_url': self.dashboard_url,
+                'cookies': cookies,
+                'local_storage': local_storage or {},
+            })
+        except Exception as e:
+            self.logger.error(f"❌ Failed to save session: {e}")
+            return False
+
+    def restore_session(self):
+        """Restore the saved session, returns True if it still lands on the dashboard"""
+        session = self.session_store.load(max_age=self.session_max_age)
+        if not session or not session.get('dashboard_url'):
+            return False
+
+        try:
+            self.logger.info("🍪 Restoring saved Paylocity session...")
+            started_at = time.monotonic()
+            cookies = [
+                {key: value for key, value in cookie.items() if key not in ('size', 'session', 'priority', 'sameParty', 'sourceScheme', 'sourcePort', 'partitionKey')}
+                for cookie in session['cookies']
+            ]
+            self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+
+            self.dashboard_url = session['dashboard_url']
+            if session.get('local_storage'):
+                # Local storage belongs to the dashboard origin, so it can only be set once it is loaded
+                self.driver.get(self.dashboard_url)
+                self.driver.execute_script(
+                    "var items = arguments[0];"
+                    "for (var key in items) { localStorage.setItem(key, items[key]); }",
+                    session['local_storage'],
+                )
+
+            if self.refresh_dashboard():
+                self.logger.info(f"✅ Saved session is valid, skipped login ({time.monotonic() - started_at:.1f}s)")
+                return True
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not restore saved session: {e}")
+
+        self.logger.info("🔑 Saved session expired, using credential login")
+        self.session_store.clear()
+        self.dashboard_url = None
+        return False
+
+    def is_dashboard_visible(self):
+        """Check whether the logged-in dashboard is currently shown"""
+        # All indicators are checked in a single round trip
+        index, _ = self.waits.find_any(self.dashboard_indicators)
+        if index is not None:
+            self.logger.info(f"✅ Found dashboard element: {self.dashboard_indicators[index]}")
+            return True
+        
+        # Also check if URL changed to dashboard
+        current_url = self.driver.current_url
+        if "go.paylocity.com" in current_url and ("home" in current_url or "dashboard" in current_url):
+            self.logger.info(f"✅ URL indicates dashboard: {current_url}")
+            return True
+        return False
+
+    def wait_for_login_outcome(self, login_button, timeout=60):
+        """Wait until the login page is left, shows an error or asks for verification"""
+        outcome_selectors = self.login_error_selectors + self.mfa_selectors + self.skip_button_selectors
+
+        def login_outcome(driver):
+            # One round trip for all selectors, the earlier lists win
+            index, element = self.waits.find_any(outcome_selectors)
+            if index is not None and index < len(self.login_error_selectors):
+                self.logger.warning(f"⚠️ Login error shown: {element.text.strip()[:200]}")
+                return "error"
+            if index is not None and index < len(self.login_error_selectors) + len(self.mfa_selectors):
+                return "mfa"
+            if index is not None or "go.paylocity.com" in driver.current_url:
+                return "left"
+            try:
+                login_button.is_enabled()
+                return False
+            except StaleElementReferenceException:
+                return "left"
+
+        return self.waits.until(login_outcome, timeout, "login to complete")
+
+    def wait_for_dashboard(self, timeout=60, handle_skip=False):
+        """Wait for the dashboard, clicking "Skip for Now" once if it shows up on the way"""
+        skip_clicked = not handle_skip
+
+        def dashboard_or_skip(driver):
+            nonlocal skip_clicked
+            if not skip_clicked:
+                index, skip_button = self.waits.find_any(self.skip_button_selectors)
+                if skip_button is not None:
+                    self.logger.info(f"🔄 Found 'Skip for Now' button, clicking...")
+                    skip_button.click()
+                    skip_clicked = True
+                    return False
+            return self.is_dashboard_visible()
+
+        return bool(self.waits.until(dashboard_or_skip, timeout, "dashboard"))
+
+    def is_alive(self):
+        """Check whether the browser is still running and responding"""
+        if not self.driver:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except Exception as e:
+            self.logger.warning(f"⚠️ Browser is not responding: {e}")
+            return False
+
+    def refresh_dashboard(self, timeout=15):
+        """Reload the dashboard of a warm session, returns False if the session has expired"""
+        if not self.dashboard_url:
+            return False
+        try:
+            self.logger.info("🔄 Reloading dashboard...")
+            with self.waits.step("Reload dashboard"):
+                self.driver.get(self.dashboard_url)
+
+                def page_state(driver):
+                    if "access.paylocity.com" in driver.current_url and driver.find_elements(*self.login_selectors['company_id']):
+                        return "login"
+                    return self.is_dashboard_visible() and "dashboard"
+
+                state = self.waits.until(page_state, timeout, "dashboard or login page")
+            if state == "login":
+                self.logger.info("🔑 Session expired, login page shown")
+            return state == "dashboard"
+        except Exception as e:
+            self.logger.error(f"❌ Error reloading dashboard: {e}")
+            return False
+
     def handle_skip_for_now(self):
         """Handle the 'Skip for Now' button if it appears"""
         try:
             self.logger.info("🔄 Looking for 'Skip for Now' button...")
             
-            skip_button_selectors = [
-                "//button[contains(text(), 'Skip for Now')]",
-                "//a[contains(text(), 'Skip for Now')]",
-                "//input[@value='Skip for Now']",
-                "//button[contains(@class, 'skip')]",
-                "//a[contains(@class, 'skip')]"
-            ]
-            
-            for selector in skip_button_selectors:
-                try:
-                    skip_button = self.driver.find_element(By.XPATH, selector)
-                    if skip_button.is_displayed():
-                        self.logger.info(f"✅ Found 'Skip for Now' button, clicking...")
-                        skip_button.click()
-                        time.sleep(2)
-                        return True
-                except NoSuchElementException:
-                    continue
+            index, skip_button = self.waits.find_any(self.skip_button_selectors)
+            if skip_button is not None:
+                self.logger.info(f"✅ Found 'Skip for Now' button, clicking...")
+                skip_button.click()
+                self.waits.network_idle(timeout=10)
+                return True
                     
             self.logger.info("ℹ️ No 'Skip for Now' button found")
             return False
@@ -355,16 +508,14 @@ class PaylocityClient:
                 "//nav//a[contains(@href, 'time')]"
             ]
             
-            for selector in time_entry_selectors:
-                try:
-                    element = self.driver.find_element(By.XPATH, selector)
-                    if element.is_displayed():
-                        self.logger.info(f"✅ Found Time Entry link: {selector}")
-                        element.click()
-                        time.sleep(3)
-                        return True
-                except NoSuchElementException:
-                    continue
+            # Ends in catch-alls, so the specific links always go first
+            selector, element = self.resolver.resolve('time_entry', time_entry_selectors, enabled=False, remember=False)
+            if element is not None:
+                self.logger.info(f"✅ Found Time Entry link: {selector}")
+                with self.waits.step("Open Time Entry page"):
+                    element.click()
+                    self.waits.network_idle(timeout=10)
+                return True
                     
             self.logger.warning("⚠️ Could not find Time Entry page link")
             return False
@@ -394,35 +545,27 @@ class PaylocityClient:
                 "//button[contains(@id, 'clock-in')]"
             ]
             
-            for selector in clock_in_selectors:
-                try:
-                    button = self.driver.find_element(By.XPATH, selector)
-                    if button.is_displayed() and button.is_enabled():
-                        self.logger.info(f"✅ Found Clock In button: {selector}")
-                        button.click()
-                        time.sleep(2)
-                        
-                        # Look for success confirmation
-                        success_indicators = [
-                            "//div[contains(text(), 'Clocked In')]",
-                            "//div[contains(text(), 'success')]",
-                            "//span[contains(text(), 'Clocked In')]"
-                        ]
-                        
-                        for success_selector in success_indicators:
-                            try:
-                                success_elem = self.driver.find_element(By.XPATH, success_selector)
-                                if success_elem.is_displayed():
-                                    self.logger.info("✅ Clock in successful!")
-                                    return True
-                            except NoSuchElementException:
-                                continue
-                        
-                        self.logger.info("✅ Clock in button clicked")
-                        return True
-                        
-                except NoSuchElementException:
-                    continue
+            selector, button = self.resolver.resolve('clock_in', clock_in_selectors)
+            if button is not None:
+                self.logger.info(f"✅ Found Clock In button: {selector}")
+                with self.waits.step("Clock in"):
+                    button.click()
+                    self.waits.network_idle(timeout=5)
+
+                # Look for success confirmation
+                success_indicators = [
+                    "//div[contains(text(), 'Clocked In')]",
+                    "//div[contains(text(), 'success')]",
+                    "//span[contains(text(), 'Clocked In')]"
+                ]
+
+                index, _ = self.waits.find_any(success_indicators)
+                if index is not None:
+                    self.logger.info("✅ Clock in successful!")
+                    return True
+
+                self.logger.info("✅ Clock in button clicked")
+                return True
                     
             self.logger.warning("⚠️ Clock In button not found or not available")
             return False
@@ -447,18 +590,13 @@ class PaylocityClient:
                 "//button[contains(@id, 'clock-out')]"
             ]
             
-            for selector in clock_out_selectors:
-                try:
-                    button = self.driver.find_element(By.XPATH, selector)
-                    if button.is_displayed() and button.is_enabled():
-                        self.logger.info(f"✅ Found Clock out button: {selector}")
-                        self.logger.info(f"   Button text: '{button.text}'")
-                        self.logger.info(f"   Button enabled: {button.is_enabled()}")
-                        self.logger.info(f"   Button displayed: {button.is_displayed()}")
-                        return True
-                        
-                except NoSuchElementException:
-                    continue
+            selector, button = self.resolver.resolve('clock_out', clock_out_selectors)
+            if button is not None:
+                self.logger.info(f"✅ Found Clock out button: {selector}")
+                self.logger.info(f"   Button text: '{button.text}'")
+                self.logger.info(f"   Button enabled: {button.is_enabled()}")
+                self.logger.info(f"   Button displayed: {button.is_displayed()}")
+                return True
             
             # If no Clock out button found, check what buttons are actually available
             self.logger.info("🔍 No Clock out button found. Checking available time-related buttons...")
@@ -511,18 +649,14 @@ class PaylocityClient:
                 "//button[contains(@id, 'clock-out')]"
             ]
             
-            for selector in clock_out_selectors:
-                try:
-                    button = self.driver.find_element(By.XPATH, selector)
-                    if button.is_displayed() and button.is_enabled():
-                        self.logger.info(f"✅ Found Clock Out button: {selector}")
-                        button.click()
-                        time.sleep(2)
-                        self.logger.info("✅ Clocked out!")
-                        return True
-                        
-                except NoSuchElementException:
-                    continue
+            selector, button = self.resolver.resolve('clock_out', clock_out_selectors)
+            if button is not None:
+                self.logger.info(f"✅ Found Clock Out button: {selector}")
+                with self.waits.step("Clock out"):
+                    button.click()
+                    self.waits.network_idle(timeout=5)
+                self.logger.info("✅ Clocked out!")
+                return True
                     
             self.logger.warning("⚠️ Clock out button not found or not available")
             return False
@@ -560,18 +694,14 @@ class PaylocityClient:
                 "//button[contains(@id, 'lunch-start')]"
             ]
             
-            for selector in lunch_start_selectors:
-                try:
-                    button = self.driver.find_element(By.XPATH, selector)
-                    if button.is_displayed() and button.is_enabled():
-                        self.logger.info(f"✅ Found Start Lunch button: {selector}")
-                        button.click()
-                        time.sleep(2)
-                        self.logger.info("✅ Lunch started!")
-                        return True
-                        
-                except NoSuchElementException:
-                    continue
+            selector, button = self.resolver.resolve('lunch_start', lunch_start_selectors)
+            if button is not None:
+                self.logger.info(f"✅ Found Start Lunch button: {selector}")
+                with self.waits.step("Start lunch"):
+                    button.click()
+                    self.waits.network_idle(timeout=5)
+                self.logger.info("✅ Lunch started!")
+                return True
                     
             self.logger.warning("⚠️ Start Lunch button not found or not available")
             return False
@@ -607,18 +737,13 @@ class PaylocityClient:
                 "//input[@value='End Lunch']"
             ]
             
-            for selector in lunch_end_selectors:
-                try:
-                    button = self.driver.find_element(By.XPATH, selector)
-                    if button.is_displayed() and button.is_enabled():
-                        self.logger.info(f"✅ Found End Lunch button: {selector}")
-                        self.logger.info(f"   Button text: '{button.text}'")
-                        self.logger.info(f"   Button enabled: {button.is_enabled()}")
-                        self.logger.info(f"   Button displayed: {button.is_displayed()}")
-                        return True
-                        
-                except NoSuchElementException:
-                    continue
+            selector, button = self.resolver.resolve('lunch_end', lunch_end_selectors)
+            if button is not None:
+                self.logger.info(f"✅ Found End Lunch button: {selector}")
+                self.logger.info(f"   Button text: '{button.text}'")
+                self.logger.info(f"   Button enabled: {button.is_enabled()}")
+                self.logger.info(f"   Button displayed: {button.is_displayed()}")
+                return True
             
             # If no End Lunch button found, check what buttons are actually available
             self.logger.info("🔍 No End Lunch button found. Checking available time-related buttons...")
@@ -673,18 +798,14 @@ class PaylocityClient:
                 "//button[contains(@id, 'lunch-end')]"
             ]
             
-            for selector in lunch_end_selectors:
-                try:
-                    button = self.driver.find_element(By.XPATH, selector)
-                    if button.is_displayed() and button.is_enabled():
-                        self.logger.info(f"✅ Found End Lunch button: {selector}")
-                        button.click()
-                        time.sleep(2)
-                        self.logger.info("✅ Lunch ended!")
-                        return True
-                        
-                except NoSuchElementException:
-                    continue
+            selector, button = self.resolver.resolve('lunch_end', lunch_end_selectors)
+            if button is not None:
+                self.logger.info(f"✅ Found End Lunch button: {selector}")
+                with self.waits.step("End lunch"):
+                    button.click()
+                    self.waits.network_idle(timeout=5)
+                self.logger.info("✅ Lunch ended!")
+                return True
                     
             self.logger.warning("⚠️ End Lunch button not found or not available")
             return False
@@ -716,15 +837,12 @@ class PaylocityClient:
                 "//span[contains(text(), 'In') or contains(text(), 'Out')]"
             ]
             
-            for selector in status_selectors:
-                try:
-                    element = self.driver.find_element(By.XPATH, selector)
-                    if element.is_displayed():
-                        status = element.text.strip()
-                        self.logger.info(f"📊 Current status: {status}")
-                        return status
-                except NoSuchElementException:
-                    continue
+            # Ends in catch-alls that also match while the page loads, so the specific texts always go first
+            selector, element = self.resolver.resolve('status', status_selectors, enabled=False, remember=False)
+            if element is not None:
+                status = element.text.strip()
+                self.logger.info(f"📊 Current status: {status}")
+                return status
                     
             self.logger.info("📊 Status not clearly visible")
             return "Unknown"
@@ -741,3 +859,8 @@ class PaylocityClient:
                 self.logger.info("🔒 Browser closed")
             except Exception as e:
                 self.logger.error(f"❌ Error closing browser: {e}")
+            finally:
+                self.driver = None
+                self.waits = None
+                self.resolver = None
+                self.dashboard_url = None
@@ -0,0 +1,162 @@
+"""
+Paylocity HTTP Client
+Performs timekeeping actions with direct HTTP requests over a persistent session,
+reusing the cookies saved by the browser login. The Selenium client stays the fallback.
+
+EXPERIMENTAL: the endpoint paths, the punchType payload and the status fields are
+assumptions that have not been checked against a captured Paylocity request yet.
+"""
+
+import logging
+import os
+from urllib.parse import urlparse
+
+import requests
+from dotenv import load_dotenv
+from urllib3.exceptions import NewConnectionError
+
+from helpers.tools.session_store import paylocity_session_store
+
+load_dotenv()
+
+
+class PaylocityHttpError(Exception):
+    """Raised when an HTTP action fails and the browser should be used instead"""
+
+
+class PaylocityHttpAuthError(PaylocityHttpError):
+    """Raised when the saved session is missing or expired"""
+
+
+class PaylocityHttpNotSentError(PaylocityHttpError):
+    """Raised when a request failed before any of it reached Paylocity, so retrying it is safe"""
+
+
+def never_sent(error):
+    """
+    Check whether a requests error happened before the request was sent: a DNS failure,
+    a refused connection or a connect timeout. A read timeout or a dropped connection
+    may come after Paylocity already got the request.
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.ConnectionError):
+        return False
+    # requests wraps urllib3's MaxRetryError, whose reason is the underlying error
+    reason = error.args[0] if error.args else None
+    return isinstance(getattr(reason, 'reason', reason), NewConnectionError)
+
+
+class PaylocityHttpClient:
+    # Punch types sent to the punch endpoint per action
+    PUNCH_TYPES = {
+        'clock_in': 'ClockIn',
+        'clock_out': 'ClockOut',
+        'start_lunch': 'StartMeal',
+        'end_lunch': 'EndMeal',
+    }
+
+    def __init__(self, base_url=None, session_store=None, timeout=10):
+        self.logger = logging.getLogger(__name__)
+        self.base_url = (base_url or os.getenv('PAYLOCITY_HTTP_BASE_URL', 'https://go.paylocity.com')).rstrip('/')
+        self.status_path = os.getenv('PAYLOCITY_HTTP_STATUS_PATH', '/WebTime/Employee/Punch/Status')
+        self.punch_path = os.getenv('PAYLOCITY_HTTP_PUNCH_PATH', '/WebTime/Employee/Punch')
+        # Anti-forgery cookie whose value has to be echoed in a header on POST requests
+        self.csrf_cookie = os.getenv('PAYLOCITY_HTTP_CSRF_COOKIE', 'XSRF-TOKEN')
+        self.session_store = session_store or paylocity_session_store()
+        self.session_max_age = int(os.getenv('PAYLOCITY_SESSION_MAX_AGE', str(7 * 24 * 3600)))
+        self.timeout = timeout
+        self.session = None
+
+    def _load_session(self):
+        """Build a keep-alive session from the cookies saved by the last browser login"""
+        saved = self.session_store.load(max_age=self.session_max_age)
+        if not saved or not saved.get('cookies'):
+            raise PaylocityHttpAuthError("No saved Paylocity session")
+
+        session = requests.Session()
+        session.headers.update({'Accept': 'application/json', 'X-Requested-With': 'XMLHttpRequest'})
+        # Cookies are scoped to their Paylocity domains; against any other host (the local mock) they are sent as is
+        keep_domains = urlparse(self.base_url).hostname.endswith('paylocity.com')
+        for cookie in saved['cookies']:
+            session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain', '') if keep_domains else '',
+                path=cookie.get('path', '/'),
+            )
+        self.logger.info(f"🍪 Loaded {len(saved['cookies'])} cookies from the saved session")
+        return session
+
+    def _request(self, method, path, **kwargs):
+        """Send a request, raising PaylocityHttpAuthError when Paylocity wants a new login"""
+        if self.session is None:
+            self.session = self._load_session()
+
+        headers = kwargs.pop('headers', {})
+        csrf_token = self.session.cookies.get(self.csrf_cookie)
+        if method != 'GET' and csrf_token:
+            headers['X-XSRF-TOKEN'] = csrf_token
+
+        try:
+            response = self.session.request(
+                method, f"{self.base_url}{path}", headers=headers,
+                timeout=self.timeout, allow_redirects=False, **kwargs
+            )
+        except requests.RequestException as e:
+            if never_sent(e):
+                raise PaylocityHttpNotSentError(f"Could not connect for {path}: {e}")
+            raise PaylocityHttpError(f"Request to {path} failed: {e}")
+
+        location = response.headers.get('Location', '')
+        redirected_to_login = response.is_redirect and ('access.paylocity.com' in location or 'login' in location.lower())
+        if response.status_code in (401, 403) or redirected_to_login:
+            # Forget the session so the next call reloads the cookies of a fresh browser login
+            self.close()
+            raise PaylocityHttpAuthError(f"Session expired ({response.status_code})")
+        if response.status_code >= 400:
+            raise PaylocityHttpError(f"{method} {path} returned {response.status_code}")
+        try:
+            return response.json()
+        except ValueError:
+            raise PaylocityHttpError(f"{method} {path} did not return JSON")
+
+    def get_current_status(self):
+        """Get current clock status"""
+        data = self._request('GET', self.status_path)
+        status = data.get('status') or data.get('punchStatus')
+        if not status:
+            raise PaylocityHttpError("Status response has no status")
+        self.logger.info(f"📊 Current status: {status}")
+        return status
+
+    def _punch(self, action_name):
+        punch_type = self.PUNCH_TYPES[action_name]
+        self.logger.info(f"⚡ Sending {punch_type} punch over HTTP...")
+        data = self._request('POST', self.punch_path, json={'punchType': punch_type})
+        if data.get('success'):
+            self.logger.info(f"✅ {punch_type} punch accepted")
+            return True
+        self.logger.warning(f"⚠️ {punch_type} punch rejected: {data.get('message', 'no reason given')}")
+        return False
+
+    def clock_in(self):
+        """Clock in action"""
+        return self._punch('clock_in')
+
+    def clock_out(self):
+        """Clock out action"""
+        return self._punch('clock_out')
+
+    def start_lunch(self):
+        """Start lunch break"""
+        return self._punch('start_lunch')
+
+    def end_lunch(self):
+        """End lunch break"""
+        return self._punch('end_lunch')
+
+    def close(self):
+        """Close the HTTP session"""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
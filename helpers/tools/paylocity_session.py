@@ -0,0 +1,348 @@
+"""
+Warm Paylocity Browser Pool
+Keeps logged-in headless browsers alive between commands, with a pre-warmed
+standby instance and a guard so only one command drives Paylocity at a time
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from helpers.tools.action_journal import ACTION_STATES, ActionJournal
+from helpers.tools.browser_actions import ActionCancelled
+from helpers.tools.clock_metrics import (
+    ACTION_SECONDS, ACTIONS, BROWSER_FAILURES, BROWSER_START_SECONDS, LOGIN_SECONDS
+)
+from helpers.tools.paylocity_client import PaylocityClient
+from helpers.tools.paylocity_http_client import (
+    PaylocityHttpAuthError, PaylocityHttpClient, PaylocityHttpError, PaylocityHttpNotSentError
+)
+
+
+class PaylocitySessionError(Exception):
+    """Raised when the browser cannot be started or logged in"""
+
+
+class PaylocityBusyError(PaylocitySessionError):
+    """Raised when another command is already driving Paylocity"""
+
+
+class PaylocityDuplicateActionError(PaylocitySessionError):
+    """Raised when the journal shows a clock action was already done"""
+
+
+class PaylocitySessionManager:
+    # Actions the HTTP backend can perform; everything else always needs the browser
+    HTTP_ACTIONS = {'get_current_status', 'clock_in', 'clock_out', 'start_lunch', 'end_lunch'}
+
+    def __init__(self, headless=True, idle_timeout=None, pool_size=None, backend=None, journal=None):
+        self.headless = headless
+        self.logger = logging.getLogger(__name__)
+        # Logged-in browsers that are not driving a command right now
+        self.available = []
+        self.warming = 0
+        self.condition = threading.Condition()
+        # Concurrency guard: one command at a time, whichever browser it gets
+        self.action_lock = threading.Lock()
+        self.last_used = None
+        self._idle_timer = None
+
+        # Close the browsers after this many idle seconds (0 keeps them open forever)
+        if idle_timeout is None:
+            idle_timeout = int(os.getenv('PAYLOCITY_IDLE_TIMEOUT', '1800'))
+        self.idle_timeout = idle_timeout
+        # Maximum number of browsers, the active one plus standbys
+        if pool_size is None:
+            pool_size = int(os.getenv('PAYLOCITY_POOL_SIZE', '2'))
+        self.pool_size = max(pool_size, 1)
+
+        # "http" tries direct requests with the saved login cookies first, "selenium" always uses the browser
+        self.backend = backend or os.getenv('PAYLOCITY_BACKEND', 'selenium')
+        self.http_client = PaylocityHttpClient() if self.backend == 'http' else None
+        if self.http_client:
+            self.logger.warning(
+                "⚠️ PAYLOCITY_BACKEND=http is experimental: its endpoints have not been checked against "
+                "a real Paylocity request, real punches are sent to them"
+            )
+        # Every clock action and observed status is recorded here
+        self.journal = journal or ActionJournal()
+
+    def _launch(self, progress=None):
+        """Start and log in a new browser"""
+        progress = progress or (lambda text: None)
+        progress("🚀 Starting browser...")
+        started_at = time.monotonic()
+        client = PaylocityClient(headless=self.headless)
+        if not client.start():
+            BROWSER_FAILURES.labels('start').inc()
+            raise PaylocitySessionError("Failed to start browser")
+        BROWSER_START_SECONDS.observe(time.monotonic() - started_at)
+        self.logger.info(f"🚀 Browser started in {time.monotonic() - started_at:.1f}s")
+
+        try:
+            progress("🔐 Logging in to Paylocity...")
+        except Exception:
+            client.close()
+            raise
+        started_at = time.monotonic()
+        if not client.login():
+            BROWSER_FAILURES.labels('login').inc()
+            client.close()
+            raise PaylocitySessionError("Failed to login to Paylocity")
+        LOGIN_SECONDS.labels('new_browser').observe(time.monotonic() - started_at)
+        self.logger.info(f"🔐 Logged in in {time.monotonic() - started_at:.1f}s")
+        return client
+
+    def _is_ready(self, client):
+        """Check that a pooled browser is alive and still logged in"""
+        if not client.is_alive():
+            self.logger.warning("⚠️ Browser failed health check, discarding it")
+            return False
+        if client.refresh_dashboard():
+            return True
+        # The warm browser is fine but the session expired: log in again in place
+        started_at = time.monotonic()
+        if client.login():
+            LOGIN_SECONDS.labels('relogin').observe(time.monotonic() - started_at)
+            self.logger.info(f"🔐 Logged in again in {time.monotonic() - started_at:.1f}s")
+            return True
+        BROWSER_FAILURES.labels('relogin').inc()
+        return False
+
+    def _checkout(self, progress=None, warm_up_wait=120):
+        """Take a ready browser from the pool, waiting for a standby being warmed up"""
+        progress = progress or (lambda text: None)
+        if self.available:
+            progress("♻️ Checking warm browser session...")
+        with self.condition:
+            if not self.available and self.warming:
+                self.logger.info("⏳ Waiting for the standby browser to finish warming up...")
+                progress("⏳ Waiting for the standby browser...")
+                self.condition.wait_for(lambda: self.available or not self.warming, timeout=warm_up_wait)
+            candidates, self.available = self.available, []
+
+        client = None
+        while candidates:
+            candidate = candidates.pop()
+            if client is None and self._is_ready(candidate):
+                self.logger.info("♻️ Reusing warm Paylocity session")
+                client = candidate
+            elif client is None:
+                candidate.close()
+            else:
+                with self.condition:
+                    self.available.append(candidate)
+        return client or self._launch(progress)
+
+    def _checkin(self, client):
+        """Return a browser to the pool, closing it if the pool is full"""
+        with self.condition:
+            if client.is_alive() and len(self.available) + self.warming < self.pool_size:
+                self.available.append(client)
+                self.condition.notify_all()
+                return
+        client.close()
+
+    @contextmanager
+    def session(self, wait=True, progress=None):
+        """
+        Use a warm browser for one command.
+
+        :param wait: Wait for a running command to finish instead of raising PaylocityBusyError
+        :param progress: Called with a short text before each slow step (browser start, login)
+        """
+        if not self.action_lock.acquire(blocking=wait):
+            raise PaylocityBusyError("Another Paylocity command is already running")
+        try:
+            self._cancel_idle_timer()
+            client = self._checkout(progress)
+            try:
+                yield client
+            finally:
+                self._checkin(client)
+                self.last_used = time.monotonic()
+                self._schedule_idle_close()
+        finally:
+            self.action_lock.release()
+
+    def _perform(self, action_name, progress):
+        """
+        Run an action over HTTP when possible and in the browser otherwise, returns (result, backend).
+
+        A status check falls back to the browser on any HTTP error. A punch only does when the
+        request certainly never reached Paylocity (expired session, no connection); any other
+        error is raised, so run_action records it as 'unknown' and reconciles before a retry.
+        """
+        if self.http_client and action_name in self.HTTP_ACTIONS:
+            with self.action_lock:
+                progress(f"⚡ {action_name.replace('_', ' ').title()} over HTTP...")
+                started_at = time.monotonic()
+                try:
+                    result = getattr(self.http_client, action_name)()
+                    ACTION_SECONDS.labels(action_name, 'http').observe(time.monotonic() - started_at)
+                    self.logger.info(f"⚡ {action_name} over HTTP in {time.monotonic() - started_at:.2f}s")
+                    return result, 'http'
+                except (PaylocityHttpAuthError, PaylocityHttpNotSentError) as e:
+                    self.logger.warning(f"⚠️ HTTP {action_name} not sent ({e}), falling back to the browser")
+                except PaylocityHttpError as e:
+                    if action_name in ACTION_STATES:
+                        # The punch may have gone through; clicking it again could punch twice
+                        self.logger.error(f"❌ HTTP {action_name} failed after sending ({e}), not retrying in the browser")
+                        raise
+                    self.logger.warning(f"⚠️ HTTP {action_name} failed ({e}), falling back to the browser")
+
+        with self.session(progress=progress) as paylocity_client:
+            progress(f"🖱️ {action_name.replace('_', ' ').title()}...")
+            started_at = time.monotonic()
+            result = getattr(paylocity_client, action_name)()
+            ACTION_SECONDS.labels(action_name, 'browser').observe(time.monotonic() - started_at)
+            return result, 'browser'
+
+    def reconcile(self, progress=None):
+        """Read the live status from Paylocity and record it in the journal"""
+        progress = progress or (lambda text: None)
+        status, backend = self._perform('get_current_status', progress)
+        self.journal.record_status(status, backend)
+        return status
+
+    def _finish(self, action_id, action_name, outcome, detail=None):
+        """Record the outcome of a clock action in the journal and the metrics"""
+        self.journal.finish_action(action_id, outcome, detail)
+        ACTIONS.labels(action_name, outcome).inc()
+
+    def run_action(self, action_name, progress=None, source='telegram', force=False):
+        """
+        Run a timekeeping action, over HTTP when possible and in the browser otherwise.
+
+        Clock actions are journaled before anything is sent and skipped when the journal shows
+        they were already done today. An earlier attempt that never got confirmed (a crash or an
+        error mid-click) is reconciled against the live status first instead of being repeated.
+
+        :param action_name: A PaylocityClient method, e.g. "clock_in" or "get_current_status"
+        :param progress: Called with a short text before each slow step; the last call comes right
+                         before the action itself
+        :param source: Who asked for the action, e.g. "telegram" or "schedule"
+        :param force: Run a clock action even if the journal says it was already done
+        :return: The result of the action
+        """
+        progress = progress or (lambda text: None)
+        if action_name == 'get_current_status':
+            return self.reconcile(progress)
+        if action_name not in ACTION_STATES:
+            return self._perform(action_name, progress)[0]
+
+        if not force:
+            if self.journal.unconfirmed_action(action_name):
+                self.logger.info(f"🔍 Earlier {action_name} was never confirmed, checking the live status first")
+                progress("🔍 Checking whether the last attempt went through...")
+                try:
+                    self.reconcile(progress)
+                except (PaylocityHttpError, PaylocitySessionError) as e:
+                    self.logger.warning(f"⚠️ Reconciliation failed: {e}")
+            reason = self.journal.duplicate_reason(action_name)
+            if reason:
+                action_id = self.journal.start_action(action_name, source)
+                self._finish(action_id, action_name, 'skipped', reason)
+                raise PaylocityDuplicateActionError(reason)
+
+        action_id = self.journal.start_action(action_name, source)
+        try:
+            result, backend = self._perform(action_name, progress)
+        except ActionCancelled:
+            # Cancellation only happens at progress checkpoints, before the click
+            self._finish(action_id, action_name, 'cancelled')
+            raise
+        except PaylocitySessionError as e:
+            # The browser never got as far as the action
+            self._finish(action_id, action_name, 'failed', str(e))
+            raise
+        except Exception as e:
+            # The punch may or may not have reached Paylocity
+            self._finish(action_id, action_name, 'unknown', str(e))
+            raise
+        self._finish(action_id, action_name, 'confirmed' if result else 'failed', backend)
+        return result
+
+    def prewarm(self, count=1):
+        """
+        Make sure `count` logged-in browsers are waiting, launching the missing ones.
+
+        Runs in the calling thread without taking the command guard, so commands
+        keep working on the existing browser meanwhile.
+
+        :return: The number of browsers ready afterwards
+        """
+        with self.condition:
+            missing = min(count, self.pool_size) - len(self.available) - self.warming
+            if missing <= 0:
+                return len(self.available)
+            self.warming += missing
+
+        for _ in range(missing):
+            try:
+                client = self._launch()
+                with self.condition:
+                    self.available.append(client)
+                self.logger.info("🔥 Standby browser is ready")
+            except PaylocitySessionError as e:
+                self.logger.error(f"❌ Standby warm-up failed: {e}")
+            finally:
+                with self.condition:
+                    self.warming -= 1
+                    self.condition.notify_all()
+
+        self.last_used = time.monotonic()
+        self._cancel_idle_timer()
+        self._schedule_idle_close()
+        with self.condition:
+            return len(self.available)
+
+    def prewarm_in_background(self, count=1):
+        """Start prewarm() in a daemon thread"""
+        thread = threading.Thread(target=self.prewarm, args=(count,), name="paylocity-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def warm_up(self):
+        """Start and log in a browser ahead of time"""
+        return self.prewarm() > 0
+
+    def _schedule_idle_close(self):
+        """Close the pooled browsers once they have been idle for idle_timeout seconds"""
+        if not self.idle_timeout or not self.available:
+            return
+        self._idle_timer = threading.Timer(self.idle_timeout, self._close_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _cancel_idle_timer(self):
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _close_if_idle(self):
+        if not self.action_lock.acquire(blocking=False):
+            return
+        try:
+            if self.last_used is not None and time.monotonic() - self.last_used >= self.idle_timeout:
+                self.logger.info(f"💤 Browsers idle for {self.idle_timeout}s, closing")
+                self._close_available()
+        finally:
+            self.action_lock.release()
+
+    def _close_available(self):
+        with self.condition:
+            clients, self.available = self.available, []
+        for client in clients:
+            client.close()
+
+    def close(self):
+        """Close all pooled browsers and the HTTP session and stop the idle timer"""
+        with self.action_lock:
+            self._cancel_idle_timer()
+            self._close_available()
+            if self.http_client:
+                self.http_client.close()
+            self.journal.close()
@@ -0,0 +1,296 @@
+import re
+from collections import defaultdict
+
+# Self-reported stats, e.g. "Record: 20-4 (4 pushes)", "Net Units: +22.83", "ROI: +38%"
+RECORD_PATTERN = re.compile(r'^\W*record\W*:?\s*(\d+)\s*-\s*(\d+)(?:\s*-\s*(\d+))?(.*)$', re.IGNORECASE | re.MULTILINE)
+PUSHES_PATTERN = re.compile(r'(\d+)\s*push', re.IGNORECASE)
+NET_UNITS_PATTERN = re.compile(r'^\W*net\s*units?\W*:?\s*([+-]?\s*\d+(?:\.\d+)?)', re.IGNORECASE | re.MULTILINE)
+ROI_PATTERN = re.compile(r'^\W*roi\W*:?\s*([+-]?\s*\d+(?:\.\d+)?)', re.IGNORECASE | re.MULTILINE)
+SPORT_PATTERN = re.compile(r'^\W*(?:sport|league)\W*:\s*(.+)$', re.IGNORECASE | re.MULTILINE)
+PICK_PATTERN = re.compile(r'^\W*(?:pick|play|bet)(?:\(s\))?\W*:\s*(.+)$', re.IGNORECASE | re.MULTILINE)
+UNITS_PATTERN = re.compile(r'^\W*(?:unit\s*size|units?|wager)\W*:\s*(\d+(?:\.\d+)?)', re.IGNORECASE | re.MULTILINE)
+WRITE_UP_PATTERN = re.compile(r'^\W*(?:write\s*-?\s*up|reasoning|analysis)\W*:?\s*(.*)$', re.IGNORECASE | re.MULTILINE | re.DOTALL)
+
+# Separators between the two sides of an event, e.g. "Lakers vs Celtics", "Hannover – Aue"
+EVENT_SEPARATOR_PATTERN = re.compile(r'\s+(?:vs\.?|v\.?|@|at|[-–—])\s+', re.IGNORECASE)
+# Over/under selections, e.g. "Over 2.5", "Under 220", "u45.5" (the short form needs a
+# decimal so that names like "Hannover U23" are not read as totals)
+TOTAL_PATTERN = re.compile(r'\b(?:(over|under)\s*(\d+(?:\.\d+)?)|([ou])\s?(\d+\.\d+))\b', re.IGNORECASE)
+# Spread or moneyline suffixes, e.g. "Lakers -5.5", "Lakers ML", "Lakers +150"
+LINE_PATTERN = re.compile(r'\s*(?:\b(?:ml|moneyline|pk|pick\'?em)\b|[+-]\d+(?:\.\d+)?)\s*', re.IGNORECASE)
+# Markdown and emoji markup that gets in the way of the field patterns
+MARKUP_PATTERN = re.compile(r'[*_#>`~]+')
+
+
+def _to_float(value):
+    """
+    Convert a matched number such as "+ 22.83" to a float.
+
+    :param value: The matched string, or None
+    :return: The number as a float, or None if there is no value
+    """
+    if value is None:
+        return None
+    try:
+        return float(value.replace(" ", ""))
+    except ValueError:
+        return None
+
+
+def normalize_name(name):
+    """
+    Normalize a team or player name so the same side written by different authors matches.
+
+    :param name: The raw team or player name
+    :return: The lowercase name without punctuation and extra whitespace
+    """
+    name = re.sub(r'[^\w\s]', ' ', name.lower())
+    return re.sub(r'\s+', ' ', name).strip()
+
+
+def parse_selection(selection):
+    """
+    Split a selection such as "Lakers -5.5" or "Over 2.5" into a side and a line.
+
+    :param selection: The selection part of a pick
+    :return: A tuple (side, line) where side is "over", "under" or a normalized team name
+    """
+    total_match = TOTAL_PATTERN.search(selection)
+    if total_match:
+        direction = total_match.group(1) or total_match.group(3)
+        side = "over" if direction.lower().startswith("o") else "under"
+        return side, float(total_match.group(2) or total_match.group(4))
+
+    line_match = re.search(r'([+-]\d+(?:\.\d+)?)', selection)
+    line = float(line_match.group(1)) if line_match else None
+    side = normalize_name(LINE_PATTERN.sub(" ", selection))
+    return side, line
+
+
+def parse_pick(pick_text):
+    """
+    Parse the pick line of a POTD comment into its event and selection.
+
+    :param pick_text: The text after "Pick:", e.g. "Hannover U23 – Erzgebirge Aue / Over 2.5"
+    :return: A dictionary with the teams of the event, the side and the line
+    """
+    if "/" in pick_text:
+        event_text, selection = pick_text.split("/", 1)
+    else:
+        event_text, selection = pick_text, None
+
+    parts = EVENT_SEPARATOR_PATTERN.split(event_text.strip(), maxsplit=1)
+    if selection is None:
+        # "Lakers -5.5 vs Celtics": the selection is the side carrying a line
+        marked = [part for part in parts if LINE_PATTERN.search(part)]
+        selection = pick_text if TOTAL_PATTERN.search(pick_text) or len(parts) < 2 else (marked or parts)[0]
+
+    teams = [normalize_name(LINE_PATTERN.sub(" ", TOTAL_PATTERN.sub(" ", part))) for part in parts]
+    teams = [team for team in teams if team]
+    side, line = parse_selection(selection)
+
+    return {
+        "teams": teams,
+        "side": side,
+        "line": line,
+    }
+
+
+def parse_potd_comment(author, body, created_utc=None):
+    """
+    Extract the structured fields of a single POTD comment.
+
+    :param author: The name of the comment author
+    :param body: The comment body (emojis may already be converted to text)
+    :param created_utc: The creation timestamp of the comment
+    :return: A dictionary with the parsed fields, or None if the comment contains no pick
+    """
+    text = MARKUP_PATTERN.sub("", body)
+
+    pick_match = PICK_PATTERN.search(text)
+    if not pick_match:
+        return None
+    pick_text = pick_match.group(1).strip()
+
+    wins = losses = pushes = None
+    record_match = RECORD_PATTERN.search(text)
+    if record_match:
+        wins = int(record_match.group(1))
+        losses = int(record_match.group(2))
+        if record_match.group(3):
+            pushes = int(record_match.group(3))
+        else:
+            pushes_match = PUSHES_PATTERN.search(record_match.group(4))
+            pushes = int(pushes_match.group(1)) if pushes_match else 0
+
+    net_units_match = NET_UNITS_PATTERN.search(text)
+    roi_match = ROI_PATTERN.search(text)
+    sport_match = SPORT_PATTERN.search(text)
+    units_match = UNITS_PATTERN.search(text)
+    write_up_match = WRITE_UP_PATTERN.search(text)
+
+    pick = parse_pick(pick_text)
+    pick.update({
+        "author": author,
+        "created_utc": created_utc,
+        "pick": pick_text,
+        "sport": sport_match.group(1).strip() if sport_match else "",
+        "units": _to_float(units_match.group(1)) if units_match else None,
+        "wins": wins,
+        "losses": losses,
+        "pushes": pushes,
+        "net_units": _to_float(net_units_match.group(1)) if net_units_match else None,
+        "roi": _to_float(roi_match.group(1)) if roi_match else None,
+        "write_up": " ".join(write_up_match.group(1).split()) if write_up_match else "",
+    })
+    return pick
+
+
+def parse_potd_comments(comments, exclude_authors=()):
+    """
+    Parse all POTD comments of a thread, skipping comments without a pick.
+
+    :param comments: A list of PRAW comment objects
+    :param exclude_authors: Author names (case insensitive) to skip, e.g. the thread bot
+    :return: A list of parsed picks
+    """
+    excluded = {name.lower() for name in exclude_authors}
+    picks = []
+    for comment in comments:
+        author = comment.author.name if comment.author else 'Unknown'
+        if author.lower() in excluded:
+            continue
+        pick = parse_potd_comment(author, comment.body, comment.created_utc)
+        if pick:
+            picks.append(pick)
+    return picks
+
+
+def track_record_weight(pick):
+    """
+    Weight a pick by the author's self-reported track record.
+
+    Win rate is smoothed so that short records do not dominate, and the ROI moves the
+    weight by at most 50% either way.
+
+    :param pick: A parsed pick
+    :return: A weight around 1.0 (higher for better records)
+    """
+    weight = 1.0
+    if pick.get("wins") is not None and pick.get("losses") is not None:
+        win_rate = (pick["wins"] + 1) / (pick["wins"] + pick["losses"] + 2)
+        weight *= 0.5 + win_rate
+    if pick.get("roi") is not None:
+        weight *= 1 + max(-50, min(pick["roi"], 50)) / 100
+    return weight
+
+
+def group_picks_by_event(picks):
+    """
+    Group picks that are on the same sporting event.
+
+    Picks naming both teams define an event. Picks naming a single team (e.g. "Lakers ML")
+    are attached to the event that contains that team, if there is one.
+
+    :param picks: A list of parsed picks
+    :return: A dictionary mapping an event key to the list of picks on that event
+    """
+    team_to_event = {}
+    for pick in picks:
+        if len(pick["teams"]) == 2:
+            event_key = " vs ".join(sorted(pick["teams"]))
+            for team in pick["teams"]:
+                team_to_event.setdefault(team, event_key)
+
+    groups = defaultdict(list)
+    for pick in picks:
+        if len(pick["teams"]) == 2:
+            event_key = " vs ".join(sorted(pick["teams"]))
+        else:
+            name = pick["teams"][0] if pick["teams"] else normalize_name(pick["pick"])
+            event_key = team_to_event.get(name) or team_to_event.get(pick["side"]) or name
+        pick["event"] = event_key
+        groups[event_key].append(pick)
+    return dict(groups)
+
+
+def rank_consensus(groups, weight=track_record_weight):
+    """
+    Compute consensus and conflicts for every side of every event and rank them.
+
+    A side is backed by the authors who picked it, and opposed by the authors who picked
+    another side of the same event. The score is the weighted support minus the weighted
+    opposition.
+
+    :param groups: The output of group_picks_by_event
+    :param weight: A function returning the weight of a pick
+    :return: A list of ranked sides, best first
+    """
+    ranked = []
+    for event_key, event_picks in groups.items():
+        sides = defaultdict(list)
+        for pick in event_picks:
+            sides[pick["side"]].append(pick)
+
+        for side, backers in sides.items():
+            opponents = [pick for pick in event_picks if pick["side"] != side]
+            support = sum(weight(pick) for pick in backers)
+            opposition = sum(weight(pick) for pick in opponents)
+            ranked.append({
+                "event": event_key,
+                "side": side,
+                "sport": next((pick["sport"] for pick in backers if pick["sport"]), ""),
+                "backers": backers,
+                "opponents": opponents,
+                "conflict": bool(opponents),
+                "score": round(support - opposition, 2),
+            })
+
+    ranked.sort(key=lambda row: (row["score"], len(row["backers"])), reverse=True)
+    return ranked
+
+
+def format_record(pick):
+    """
+    Format the self-reported track record of a pick in a compact form.
+
+    :param pick: A parsed pick
+    :return: A string such as "20-4-4, +22.83u, ROI +38%"
+    """
+    parts = []
+    if pick.get("wins") is not None:
+        parts.append(f"{pick['wins']}-{pick['losses']}-{pick['pushes'] or 0}")
+    if pick.get("net_units") is not None:
+        parts.append(f"{pick['net_units']:+g}u")
+    if pick.get("roi") is not None:
+        parts.append(f"ROI {pick['roi']:+g}%")
+    return ", ".join(parts) if parts else "no record"
+
+
+def format_consensus_table(ranked, limit=25, write_up_length=120):
+    """
+    Format ranked sides as a compact pipe-separated table for the model.
+
+    :param ranked: The output of rank_consensus
+    :param limit: The maximum number of rows
+    :param write_up_length: The number of characters of the best backer's write-up to include
+    :return: The table as a string
+    """
+    lines = ["Rank | Event | Sport | Pick | Backers | Against | Score | Best backer (record) | Write-up"]
+    for rank, row in enumerate(ranked[:limit], 1):
+        best = max(row["backers"], key=track_record_weight)
+        write_up = best["write_up"]
+        if len(write_up) > write_up_length:
+            write_up = write_up[:write_up_length].rstrip() + "..."
+        lines.append(" | ".join([
+            str(rank),
+            row["event"] + (" (CONFLICT)" if row["conflict"] else ""),
+            row["sport"] or "?",
+            best["pick"],
+            ", ".join(pick["author"] for pick in row["backers"]),
+            ", ".join(pick["author"] for pick in row["opponents"]) or "-",
+            f"{row['score']:+.2f}",
+            f"{best['author']} ({format_record(best)})",
+            write_up or "-",
+        ]))
+    return "\n".join(lines)
@@ -0,0 +1,155 @@
+import re
+
+# tiktoken is optional: without it token counts are estimated from the text length
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Average number of characters per token for English text, used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+# Bodies of comments that were deleted or removed by moderators
+DELETED_BODIES = {"[deleted]", "[removed]", ""}
+# Sign-off lines that carry no information, e.g. "GL", "BOL!", "Good luck all", "Tail or fade"
+SIGNATURE_PATTERN = re.compile(
+    r'^\W*(?:gl|bol|gla|glta|good luck(?: (?:all|everyone|to all))?|best of luck|tail or fade|lfg|let\'?s (?:go|ride)'
+    r'|cheers|thanks|thank you|sent from my \w+)\W*$',
+    re.IGNORECASE | re.MULTILINE,
+)
+BLANK_LINES_PATTERN = re.compile(r'\n{2,}')
+
+
+class PromptPacker:
+    def __init__(self, token_budget, model_name="gpt-4o-mini", min_words=4):
+        """
+        Pack prompt inputs into a fixed token budget.
+
+        :param token_budget: The maximum number of tokens of packed content per call
+        :param model_name: The model whose tokenizer is used for counting
+        :param min_words: Items with fewer words than this are treated as one-liners
+        """
+        self.token_budget = token_budget
+        self.min_words = min_words
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model_name)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                print(f"Could not load tokenizer, estimating token counts: {e}")
+
+    def count_tokens(self, text):
+        """
+        Count the tokens of a text.
+
+        :param text: The text to count
+        :return: The number of tokens (estimated when no tokenizer is available)
+        """
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    def truncate(self, text, max_tokens=None, marker=" ... [truncated]"):
+        """
+        Cut a text down to a number of tokens.
+
+        :param text: The text to truncate
+        :param max_tokens: The maximum number of tokens (default: the whole budget)
+        :param marker: Text appended when the text was cut
+        :return: The text, truncated if it was longer than max_tokens
+        """
+        max_tokens = self.token_budget if max_tokens is None else max_tokens
+        if self.count_tokens(text) <= max_tokens:
+            return text
+        keep = max(max_tokens - self.count_tokens(marker), 0)
+        if self.encoding is not None:
+            truncated = self.encoding.decode(self.encoding.encode(text, disallowed_special=())[:keep])
+        else:
+            truncated = text[:keep * CHARS_PER_TOKEN]
+        return truncated.rstrip() + marker
+
+    def clean(self, text):
+        """
+        Remove sign-off lines and extra blank lines from a text.
+
+        :param text: The text to clean
+        :return: The cleaned text
+        """
+        text = SIGNATURE_PATTERN.sub("", text)
+        return BLANK_LINES_PATTERN.sub("\n", text).strip()
+
+    def is_low_value(self, text):
+        """
+        Check whether a text is not worth sending to the model at all.
+
+        :param text: The cleaned text of an item
+        :return: True for deleted comments and one-liners
+        """
+        return text.strip() in DELETED_BODIES or len(text.split()) < self.min_words
+
+    def pack(self, items, headers=None, token_budget=None, max_item_tokens=None, separator="\n\n", value=None):
+        """
+        Select, clean and truncate items so that together they fit into the token budget.
+
+        Low-value items are dropped first. The remaining items are taken in order of value
+        (default: longest first), truncated to max_item_tokens, and returned in their original
+        order followed by a one-line summary of what was left out.
+
+        :param items: A list of texts, e.g. comment bodies
+        :param headers: Texts placed in front of each item, e.g. the author (not truncated)
+        :param token_budget: The budget for this call (default: the packer's budget)
+        :param max_item_tokens: The maximum number of tokens of a single item
+        :param separator: The text placed between items
+        :param value: A function returning the value of an item (higher is kept first)
+        :return: A tuple (packed text, stats dictionary)
+        """
+        token_budget = self.token_budget if token_budget is None else token_budget
+        value = value or len
+        separator_tokens = self.count_tokens(separator)
+
+        low_value = 0
+        candidates = []
+        for index, item in enumerate(items):
+            item = self.clean(item)
+            if self.is_low_value(item):
+                low_value += 1
+                continue
+            if max_item_tokens:
+                item = self.truncate(item, max_item_tokens)
+            if headers:
+                item = headers[index] + item
+            candidates.append((index, item))
+
+        # Keep room for the summary line
+        remaining = token_budget - self.count_tokens("[Omitted: 000000 low-value items, 000000 items over the token budget]")
+        selected = []
+        over_budget = 0
+        for index, item in sorted(candidates, key=lambda candidate: value(candidate[1]), reverse=True):
+            tokens = self.count_tokens(item) + separator_tokens
+            if tokens <= remaining:
+                selected.append((index, item))
+                remaining -= tokens
+            else:
+                over_budget += 1
+
+        parts = [item for _, item in sorted(selected)]
+        if low_value or over_budget:
+            parts.append(f"[Omitted: {low_value} low-value items, {over_budget} items over the token budget]")
+        packed = separator.join(parts)
+
+        stats = {
+            "items": len(items),
+            "packed": len(selected),
+            "low_value": low_value,
+            "over_budget": over_budget,
+            "tokens": self.count_tokens(packed),
+            "token_budget": token_budget,
+        }
+        print(f"Packed {stats['packed']}/{stats['items']} items into {stats['tokens']}/{token_budget} tokens "
+              f"({low_value} low-value, {over_budget} over budget)")
+        return packed, stats
+
+# Usage example:
+# packer = PromptPacker(token_budget=8000)
+# text, stats = packer.pack(comment_bodies, headers=comment_headers, max_item_tokens=400)
@@ -3,20 +3,50 @@ from dotenv import load_dotenv
 import os
 import datetime
 import re
+import threading
 import requests
 
+from helpers.tools.instrumentation import span
+
 load_dotenv()
 
-reddit = praw.Reddit(
-    client_id=os.getenv('REDDIT_API_CLIENT_ID'),
-    client_secret=os.getenv('REDDIT_API_CLIENT_SECRET'),
-    user_agent="USERAGENT"
-)
+_local = threading.local()
+
+
+def get_reddit():
+    """
+    The Reddit client of the calling thread.
+
+    PRAW is not thread safe, so each thread gets its own client and keeps reusing it;
+    the long-lived workers of the bot daemon authenticate once each.
+
+    :return: A praw.Reddit instance
+    """
+    if not hasattr(_local, 'reddit'):
+        _local.reddit = praw.Reddit(
+            client_id=os.getenv('REDDIT_API_CLIENT_ID'),
+            client_secret=os.getenv('REDDIT_API_CLIENT_SECRET'),
+            user_agent="USERAGENT"
+        )
+    return _local.reddit
+
+
+def set_reddit(reddit):
+    """
+    Use the given client for the calling thread from now on, e.g. a replay of recorded posts.
+
+    :param reddit: A praw.Reddit instance or a stand-in with the same interface
+    """
+    _local.reddit = reddit
+
 
 EXCLUDE_WORD_LIST = ['DIP','SPY','JPY','WWE','UFC','USD']
 
 def get_posts_from_subreddit_in_one_week(subreddit):
-    return reddit.subreddit(subreddit).search(query='*', sort='new', time_filter='week')
+    with span('reddit_fetch', subreddit=subreddit, window='week') as current:
+        posts = list(get_reddit().subreddit(subreddit).search(query='*', sort='new', time_filter='week'))
+        current.add(items=len(posts))
+    return posts
 
 def get_posts_from_subreddit_in_past_24_hours(subreddit):
     """
@@ -31,12 +61,14 @@ def get_posts_from_subreddit_in_past_24_hours(subreddit):
     
     # Get all posts from the subreddit
     posts = []
-    for post in reddit.subreddit(subreddit).new(limit=100):  # Limit to 100 most recent posts
-        if post.created_utc >= twenty_four_hours_ago_timestamp:
-            posts.append(post)
-        else:
-            # Since posts are sorted by new, we can break early
-            break
+    with span('reddit_fetch', subreddit=subreddit, window='24h') as current:
+        for post in get_reddit().subreddit(subreddit).new(limit=100):  # Limit to 100 most recent posts
+            if post.created_utc >= twenty_four_hours_ago_timestamp:
+                posts.append(post)
+            else:
+                # Since posts are sorted by new, we can break early
+                break
+        current.add(items=len(posts))
     
     return posts
 
@@ -60,14 +92,18 @@ def fetch_all_comments(post, expand_level=0):
         return comments
 
     all_comments = []
-    post.comments.replace_more(limit=None)
-    for top_level_comment in post.comments:
-        all_comments.extend(fetch_all_comments_recursive(top_level_comment, max_level=expand_level))
+    with span('comment_expansion', post=post.id) as current:
+        post.comments.replace_more(limit=None)
+        for top_level_comment in post.comments:
+            all_comments.extend(fetch_all_comments_recursive(top_level_comment, max_level=expand_level))
+        current.add(items=len(all_comments))
     return all_comments
  
 
-def download_image(url, save_path):
-    response = requests.get(url)
+def download_image(url, save_path, session=None):
+    with span('image_download') as current:
+        response = (session or requests).get(url)
+        current.add(bytes=len(response.content))
     if response.status_code == 200:
         with open(save_path, 'wb') as file:
             file.write(response.content)
@@ -133,17 +169,19 @@ class RedditParser:
         :return: A list of posts with the specified flair
         """
         query = f'flair:"{flair_text}"'
-        posts = reddit.subreddit(subreddit).search(query, sort='new')
-        return list(posts)
+        with span('reddit_fetch', subreddit=subreddit, flair=flair_text) as current:
+            posts = list(get_reddit().subreddit(subreddit).search(query, sort='new'))
+            current.add(items=len(posts))
+        return posts
 
     @staticmethod
     def fetch_all_comments(post):
         return fetch_all_comments(post)
 
     @staticmethod
-    def download_image(url, save_path):
-        return download_image(url, save_path)
+    def download_image(url, save_path, session=None):
+        return download_image(url, save_path, session)
 
 # Optionally, you can also export the individual functions
-__all__ = ['RedditParser', 'get_posts_from_subreddit_in_one_week', 'get_posts_from_subreddit_in_past_24_hours', 
+__all__ = ['RedditParser', 'get_reddit', 'set_reddit', 'get_posts_from_subreddit_in_one_week', 'get_posts_from_subreddit_in_past_24_hours', 
            'filter_tickers_from_posts_for_today', 'filter_ticker_from_post_title', 'get_all_caps_words']
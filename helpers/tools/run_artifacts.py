@@ -0,0 +1,314 @@
+import argparse
+import datetime
+import gzip
+import json
+import os
+import time
+
+from helpers.tools.instrumentation import current_run
+
+# Folder the dated run directories are written to
+RUN_ARTIFACT_DIR = os.getenv('RUN_ARTIFACT_DIR', os.path.join('logs', 'artifacts'))
+MANIFEST_NAME = 'manifest.json'
+
+
+class ArtifactWriter:
+    def __init__(self, artifacts, name, path, stats=()):
+        """
+        Write the rows of one artifact part as gzipped JSON lines.
+
+        :param artifacts: The RunArtifacts the part belongs to
+        :param name: The artifact name, e.g. "comments"
+        :param path: The path of the .jsonl.gz file
+        :param stats: Columns to keep the min/max of, so readers can skip the part
+        """
+        self.artifacts = artifacts
+        self.name = name
+        self.path = path
+        self.rows = 0
+        self.columns = []
+        self.stats = {column: None for column in stats}
+        self.file = gzip.open(path, 'wt', encoding='utf-8')
+
+    def write(self, row):
+        """
+        Write one row.
+
+        :param row: A dictionary of JSON serializable values
+        """
+        self.file.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        self.rows += 1
+        for column in row:
+            if column not in self.columns:
+                self.columns.append(column)
+        for column, bounds in list(self.stats.items()):
+            value = row.get(column)
+            if value is None:
+                continue
+            if bounds is None:
+                self.stats[column] = [value, value]
+                continue
+            try:
+                bounds[0] = min(bounds[0], value)
+                bounds[1] = max(bounds[1], value)
+            except TypeError:
+                # Mixed types cannot be compared, so the column cannot be used to skip the part
+                del self.stats[column]
+
+    def close(self):
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        self.artifacts.add_part({
+            'artifact': self.name,
+            'path': os.path.basename(self.path),
+            'rows': self.rows,
+            'bytes': os.path.getsize(self.path),
+            'columns': self.columns,
+            'stats': {column: {'min': bounds[0], 'max': bounds[1]}
+                      for column, bounds in self.stats.items() if bounds is not None},
+        })
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+class RunArtifacts:
+    def __init__(self, bot, root=None, run_id=None):
+        """
+        The artifacts of one bot run, in a dated run directory with a manifest:
+        <root>/<YYYY-MM-DD>/<run_id>/manifest.json next to <artifact>-<part>.jsonl.gz files.
+
+        :param bot: The bot the run belongs to, e.g. "nfl"
+        :param root: The folder of the dated run directories (default: RUN_ARTIFACT_DIR)
+        :param run_id: The run ID (default: the one of the active run, else bot and start time)
+        """
+        run = current_run()
+        started_at = run.started_at if run else time.time()
+        self.bot = bot
+        self.run_id = run_id or (run.run_id if run else
+                                 f"{bot}_{datetime.datetime.fromtimestamp(started_at).strftime('%Y%m%d_%H%M%S')}")
+        self.run_date = datetime.datetime.fromtimestamp(started_at).strftime('%Y-%m-%d')
+        self.directory = os.path.join(root or RUN_ARTIFACT_DIR, self.run_date, self.run_id)
+        # Two runs started within the same second get their own directories
+        suffix = 1
+        while os.path.exists(os.path.join(self.directory, MANIFEST_NAME)):
+            suffix += 1
+            self.directory = os.path.join(root or RUN_ARTIFACT_DIR, self.run_date, f"{self.run_id}_{suffix}")
+        os.makedirs(self.directory, exist_ok=True)
+        self.manifest = {
+            'bot': bot,
+            'run_id': self.run_id,
+            'date': self.run_date,
+            'created_at': datetime.datetime.fromtimestamp(started_at).isoformat(),
+            'parts': [],
+            'files': [],
+            'errors': [],
+        }
+        self.write_manifest()
+
+    def writer(self, name, stats=()):
+        """
+        Open a new part of an artifact; every call adds a part, e.g. one per Reddit post.
+
+        :param name: The artifact name, e.g. "comments", "odds", "ocr" or "llm_results"
+        :param stats: Columns to keep the min/max of, e.g. ("post_id",)
+        :return: An ArtifactWriter, to be used as a context manager
+        """
+        part = sum(1 for entry in self.manifest['parts'] if entry['artifact'] == name) + 1
+        return ArtifactWriter(self, name, os.path.join(self.directory, f"{name}-{part:04d}.jsonl.gz"), stats)
+
+    def write(self, name, rows, stats=()):
+        """
+        Write a whole artifact part at once.
+
+        :return: The number of rows written
+        """
+        with self.writer(name, stats) as writer:
+            for row in rows:
+                writer.write(row)
+        return writer.rows
+
+    def write_text(self, file_name, content):
+        """
+        Write a plain text file into the run directory, e.g. a file to upload to a vector store.
+
+        :return: The path of the file
+        """
+        path = os.path.join(self.directory, file_name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        self.manifest['files'].append({'path': file_name, 'bytes': os.path.getsize(path)})
+        self.write_manifest()
+        return path
+
+    def add_error(self, message):
+        """Record an error of the run, e.g. an API call whose rows are missing"""
+        self.manifest['errors'].append(message)
+        self.write_manifest()
+
+    def add_part(self, entry):
+        self.manifest['parts'].append(entry)
+        self.write_manifest()
+
+    def write_manifest(self):
+        # Written after every part, so a run that crashes still leaves a readable manifest
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        with open(path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump(self.manifest, file, indent=2, ensure_ascii=False, default=str)
+        os.replace(path + '.tmp', path)
+
+
+def iter_manifests(root=None, bot=None, since=None):
+    """
+    Find the manifests of earlier runs, newest first.
+
+    :param root: The folder of the dated run directories (default: RUN_ARTIFACT_DIR)
+    :param bot: Only runs of this bot
+    :param since: Only runs on or after this date (a datetime.date); older date folders are not opened
+    :return: A generator of (run directory, manifest)
+    """
+    root = root or RUN_ARTIFACT_DIR
+    if not os.path.isdir(root):
+        return
+    for run_date in sorted(os.listdir(root), reverse=True):
+        if since and run_date < since.strftime('%Y-%m-%d'):
+            break
+        date_folder = os.path.join(root, run_date)
+        if not os.path.isdir(date_folder):
+            continue
+        for run_id in sorted(os.listdir(date_folder), reverse=True):
+            directory = os.path.join(date_folder, run_id)
+            try:
+                with open(os.path.join(directory, MANIFEST_NAME), encoding='utf-8') as file:
+                    manifest = json.load(file)
+            except (OSError, ValueError):
+                continue
+            if bot and manifest.get('bot') != bot:
+                continue
+            yield directory, manifest
+
+
+def _matches(value, condition):
+    """
+    Check a value against a condition: a set of allowed values, an inclusive (low, high) range
+    where either end may be None, or a single value to equal.
+    """
+    if isinstance(condition, (set, frozenset)):
+        return value in condition
+    if isinstance(condition, tuple):
+        low, high = condition
+        if value is None:
+            return False
+        try:
+            return (low is None or value >= low) and (high is None or value <= high)
+        except TypeError:
+            return False
+    return value == condition
+
+
+def _part_may_match(entry, where):
+    """Use the min/max statistics of a part to rule out that any of its rows match"""
+    for column, condition in where.items():
+        stats = entry.get('stats', {}).get(column)
+        if stats is None:
+            if column not in entry.get('columns', [column]):
+                return False
+            continue
+        low, high = stats['min'], stats['max']
+        try:
+            if isinstance(condition, (set, frozenset)):
+                if not any(low <= value <= high for value in condition if value is not None):
+                    return False
+            elif isinstance(condition, tuple):
+                if (condition[0] is not None and high < condition[0]) or (condition[1] is not None and low > condition[1]):
+                    return False
+            elif not low <= condition <= high:
+                return False
+        except TypeError:
+            continue
+    return True
+
+
+def read_artifact(name, where=None, columns=None, bot=None, since=None, root=None):
+    """
+    Read the rows of an artifact from earlier runs, newest run first.
+
+    Date folders older than `since`, runs of other bots and parts whose statistics rule out
+    the `where` conditions are skipped without being decompressed.
+
+    :param name: The artifact name, e.g. "ocr"
+    :param where: A dictionary of column to a value, a set of values or an inclusive (low, high) range
+    :param columns: Only return these columns
+    :param bot: Only runs of this bot
+    :param since: Only runs on or after this date (a datetime.date)
+    :param root: The folder of the dated run directories (default: RUN_ARTIFACT_DIR)
+    :return: A generator of row dictionaries
+    """
+    where = where or {}
+    for directory, manifest in iter_manifests(root, bot, since):
+        for entry in manifest.get('parts', []):
+            if entry['artifact'] != name or not _part_may_match(entry, where):
+                continue
+            try:
+                with gzip.open(os.path.join(directory, entry['path']), 'rt', encoding='utf-8') as file:
+                    for line in file:
+                        row = json.loads(line)
+                        if all(_matches(row.get(column), condition) for column, condition in where.items()):
+                            yield {column: row.get(column) for column in columns} if columns else row
+            except (OSError, EOFError, ValueError) as e:
+                print(f"Skipping unreadable artifact {entry['path']} in {directory}: {e}")
+
+
+def parse_condition(text):
+    """
+    Parse a command line condition: column=value, column=a|b|c or column=low..high.
+
+    Values that look like numbers are compared as numbers.
+
+    :return: A tuple (column, condition)
+    """
+    def value(raw):
+        if raw == '':
+            return None
+        try:
+            return int(raw)
+        except ValueError:
+            try:
+                return float(raw)
+            except ValueError:
+                return raw
+
+    column, _, raw = text.partition('=')
+    if '..' in raw:
+        low, _, high = raw.partition('..')
+        return column, (value(low), value(high))
+    if '|' in raw:
+        return column, {value(item) for item in raw.split('|')}
+    return column, value(raw)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read the rows of a run artifact, e.g. the OCR text of a thread")
+    parser.add_argument('artifact', help="The artifact name, e.g. comments, odds, ocr or llm_results")
+    parser.add_argument('--where', nargs='*', default=[], metavar='COLUMN=VALUE',
+                        help="Conditions: column=value, column=a|b or column=low..high")
+    parser.add_argument('--columns', help="Comma separated columns to show")
+    parser.add_argument('--bot', help="Only runs of this bot")
+    parser.add_argument('--days', type=int, help="Only the last this many days")
+    parser.add_argument('--root', help="The artifact folder (default: RUN_ARTIFACT_DIR)")
+    args = parser.parse_args()
+
+    since = datetime.date.today() - datetime.timedelta(days=args.days) if args.days else None
+    columns = [column.strip() for column in args.columns.split(',')] if args.columns else None
+    where = dict(parse_condition(condition) for condition in args.where)
+    for row in read_artifact(args.artifact, where, columns, args.bot, since, args.root):
+        print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Selector Resolution Engine
+Resolves a ranked list of XPath selectors in one WebDriver round trip and,
+for targets whose selectors are interchangeable, tries the one that won last time first
+"""
+
+import logging
+
+from helpers.tools.page_waits import PageWaiter
+
+
+class SelectorResolver:
+    def __init__(self, driver, waits=None):
+        self.waits = waits or PageWaiter(driver)
+        self.logger = logging.getLogger(__name__)
+        # Winning selector per target, e.g. {'clock_in': "//button[...]"}
+        self.winners = {}
+
+    def ranked(self, name, selectors):
+        """Return the selectors with last time's winner moved to the front"""
+        winner = self.winners.get(name)
+        if winner in selectors:
+            return [winner] + [selector for selector in selectors if selector != winner]
+        return list(selectors)
+
+    def resolve(self, name, selectors, enabled=True, remember=True):
+        """
+        Find the first visible (and enabled) match of a ranked selector list in one script call.
+
+        :param name: The target the selectors describe, used to remember the winner
+        :param selectors: XPath selectors, best first
+        :param enabled: Only accept enabled elements, e.g. for buttons
+        :param remember: Try last time's winner first; only for selectors that find the same element,
+                         not for lists ending in catch-alls that must stay behind the specific matches
+        :return: A tuple (winning selector, element) or (None, None)
+        """
+        ranked = self.ranked(name, selectors) if remember else list(selectors)
+        index, element = self.waits.find_any(ranked, visible=True, enabled=enabled)
+        if element is None:
+            return None, None
+
+        selector = ranked[index]
+        if remember and self.winners.get(name) != selector:
+            self.logger.info(f"🎯 Remembering selector for {name}: {selector}")
+            self.winners[name] = selector
+        return selector, element
@@ -0,0 +1,92 @@
+"""
+Encrypted Browser Session Store
+Saves authenticated cookies and local storage to an encrypted local profile
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+
+from cryptography.fernet import Fernet, InvalidToken
+
+
+class EncryptedSessionStore:
+    def __init__(self, path, key=None, secret=None, salt=b""):
+        """
+        Store a browser session encrypted with Fernet.
+
+        :param path: The file the encrypted session is written to
+        :param key: A Fernet key (urlsafe base64, 32 bytes)
+        :param secret: A secret the key is derived from when no key is given, e.g. the password
+        :param salt: The salt for deriving the key from the secret
+        """
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        if not key and secret:
+            derived = hashlib.pbkdf2_hmac('sha256', secret.encode(), salt, 200_000)
+            key = base64.urlsafe_b64encode(derived)
+        self.fernet = Fernet(key) if key else None
+
+    def save(self, session):
+        """Encrypt and write a session dictionary, readable by the owner only"""
+        if not self.fernet:
+            self.logger.warning("⚠️ No session key configured, not saving session")
+            return False
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            token = self.fernet.encrypt(json.dumps({**session, 'saved_at': time.time()}).encode())
+            temp_path = f"{self.path}.tmp"
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as file:
+                file.write(token)
+            os.replace(temp_path, self.path)
+            self.logger.info(f"💾 Saved encrypted session to {self.path}")
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Failed to save session: {e}")
+            return False
+
+    def load(self, max_age=None):
+        """Read and decrypt the saved session, None if there is none or it cannot be used"""
+        if not self.fernet or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'rb') as file:
+                session = json.loads(self.fernet.decrypt(file.read()))
+        except (InvalidToken, ValueError) as e:
+            self.logger.warning(f"⚠️ Saved session cannot be decrypted, discarding it: {e}")
+            self.clear()
+            return None
+
+        if max_age and time.time() - session.get('saved_at', 0) > max_age:
+            self.logger.info("⌛ Saved session is too old, discarding it")
+            self.clear()
+            return None
+        return session
+
+    def clear(self):
+        """Delete the saved session"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def paylocity_session_store():
+    """
+    The encrypted profile of the Paylocity login, shared by the browser and HTTP clients.
+    The key comes from PAYLOCITY_SESSION_KEY or is derived from the Paylocity password.
+    """
+    company_id = os.getenv('PAYLOCITY_COMPANY_ID')
+    username = os.getenv('PAYLOCITY_USERNAME')
+    return EncryptedSessionStore(
+        os.getenv('PAYLOCITY_SESSION_FILE', 'sessions/paylocity.session'),
+        key=os.getenv('PAYLOCITY_SESSION_KEY'),
+        secret=os.getenv('PAYLOCITY_PASSWORD'),
+        salt=f"{company_id}:{username}".encode(),
+    )
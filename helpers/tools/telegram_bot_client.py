@@ -1,10 +1,18 @@
 import telepot
 import pickle
 from dotenv import load_dotenv
+import atexit
 import os
+import time
+
+from helpers.tools.instrumentation import span
+from helpers.tools.telegram_send_queue import MAX_MESSAGE_LENGTH, TelegramSendQueue
 
 class TelegramBotClient:
-    def __init__(self):
+    def __init__(self, bot=None):
+        """
+        :param bot: A telepot.Bot, or a stand-in with the same interface (default: one for BAO_TELEGRAM_TOKEN)
+        """
         # Load environment variables from .env file
         load_dotenv()
 
@@ -16,16 +24,101 @@ class TelegramBotClient:
             raise ValueError("BAO_TELEGRAM_ID or BAO_TELEGRAM_TOKEN not found in environment variables")
 
         # Create a bot
-        self.bot = telepot.Bot(self.bot_token)
+        self.bot = bot or telepot.Bot(self.bot_token)
+        # Messages go out from a background worker; whatever is still queued is sent before exit
+        self.send_queue = TelegramSendQueue(self.bot)
+        atexit.register(self.close)
 
     def send_message(self, message):
         """
-        Send a message using the Telegram bot.
+        Queue a message for the Telegram bot and return without waiting for Telegram.
+
+        Messages sent back to back are coalesced, long ones are split, and sends are
+        paced to Telegram's rate limits.
 
         :param message: The message to send
         """
         try:
-            self.bot.sendMessage(self.bao_id, message)
-            print(f"Message sent: {message}")
+            self.send_queue.put(self.bao_id, message)
+            print(f"Message queued: {message}")
+        except Exception as e:
+            print(f"Failed to queue message: {e}")
+
+    def flush(self, timeout=None):
+        """
+        Wait until all queued messages have been sent.
+
+        :param timeout: Maximum number of seconds to wait
+        :return: True if nothing is left in the queue
+        """
+        return self.send_queue.flush(timeout)
+
+    def close(self):
+        """Send the remaining queued messages and stop the send worker"""
+        self.send_queue.close()
+
+    def stream_message(self, chunks, prefix="", edit_interval=1.0):
+        """
+        Send a message that grows as new text arrives, editing it in place.
+
+        The first chunk is sent as a new message and later chunks update that message
+        at most once every edit_interval seconds. When the text outgrows the Telegram
+        length limit the current message is finalized and a new one is started.
+
+        :param chunks: An iterable of text fragments (e.g. OpenAIClient.stream_assistant)
+        :param prefix: Text to put in front of the streamed text
+        :param edit_interval: Minimum number of seconds between two edits
+        :return: The complete streamed text, without the prefix
+        """
+        # Keep the streamed message after anything queued before it
+        self.flush()
+        full_text = ""
+        current = prefix
+        shown = ""
+        message_id = None
+        last_update = 0.0
+
+        for chunk in chunks:
+            full_text += chunk
+            current += chunk
+
+            # Finalize messages that no longer fit and continue in a new one
+            while len(current) > MAX_MESSAGE_LENGTH:
+                split_at = current.rfind("\n", 0, MAX_MESSAGE_LENGTH)
+                if split_at <= 0:
+                    split_at = MAX_MESSAGE_LENGTH
+                message_id = self._update_streamed_message(message_id, current[:split_at], shown)
+                current = current[split_at:].lstrip("\n")
+                message_id = None
+                shown = ""
+
+            if time.monotonic() - last_update >= edit_interval:
+                message_id = self._update_streamed_message(message_id, current, shown)
+                shown = current
+                last_update = time.monotonic()
+
+        self._update_streamed_message(message_id, current, shown)
+        print(f"Message streamed: {prefix}{full_text}")
+        return full_text
+
+    def _update_streamed_message(self, message_id, text, shown):
+        """
+        Send or edit a streamed message.
+
+        :param message_id: The ID of the message to edit, or None to send a new one
+        :param text: The text the message should contain
+        :param shown: The text the message currently contains
+        :return: The ID of the message holding the text
+        """
+        if not text.strip() or text == shown:
+            return message_id
+        try:
+            with span('telegram_send', kind='stream' if message_id is None else 'stream_edit') as current:
+                current.add(items=1, bytes=len(text.encode()))
+                if message_id is None:
+                    sent = self.send_queue.call(self.bao_id, self.bot.sendMessage, self.bao_id, text)
+                    return sent['message_id']
+                self.send_queue.call(self.bao_id, self.bot.editMessageText, (self.bao_id, message_id), text)
         except Exception as e:
-            print(f"Failed to send message: {e}")
\ No newline at end of file
+            print(f"Failed to stream message: {e}")
+        return message_id
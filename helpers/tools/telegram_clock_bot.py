@@ -13,15 +13,22 @@ from dotenv import load_dotenv
 from datetime import datetime
 import asyncio
 
-# Add current directory to path for imports
-current_dir = Path(__file__).parent
-sys.path.append(str(current_dir))
-from paylocity_client import PaylocityClient
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+from helpers.tools.browser_actions import BrowserActionQueue, ActionCancelled
+from helpers.tools.clock_metrics import timed_command
+from helpers.tools.telegram_notifier import TelegramNotifier
+from helpers.tools.telegram_webhook import TelegramWebhookServer
+from helpers.tools.action_journal import STATE_LABELS
+from helpers.tools.paylocity_session import (
+    PaylocitySessionManager, PaylocitySessionError, PaylocityDuplicateActionError
+)
 
 load_dotenv()
 
 class TelegramClockBot:
-    def __init__(self):
+    def __init__(self, session_manager=None, action_queue=None, notifier=None):
         # Use Aymee's bot token for @paylocity_clock_bot
         self.token = os.getenv('AYMEE_TELEGRAM_TOKEN')
         self.allowed_chat_ids = []
@@ -31,14 +38,24 @@ class TelegramClockBot:
         if aymee_chat_id:
             self.allowed_chat_ids.append(aymee_chat_id)
         
-        self.paylocity_client = None
+        # Warm browser session shared by all commands (and with ClockBot when passed in)
+        self.owns_session_manager = session_manager is None
+        self.session_manager = session_manager or PaylocitySessionManager(headless=True)
+        # Browser work runs on a dedicated thread so the bot keeps answering while Selenium is busy
+        self.owns_action_queue = action_queue is None
+        self.action_queue = action_queue or BrowserActionQueue()
         self.logger = logging.getLogger(__name__)
         
         if not self.token or not self.allowed_chat_ids:
             self.logger.error("❌ Missing Telegram credentials in .env file")
             raise ValueError("Missing AYMEE_TELEGRAM_TOKEN or AYMEE_TELEGRAM_ID")
             
-        self.application = Application.builder().token(self.token).build()
+        # One connection-pooled bot for polling, replies and notifications (shared with ClockBot when passed in)
+        self.notifier = notifier or TelegramNotifier(self.token)
+        # Handle updates concurrently: /help or /cancel must not wait for a running browser action
+        self.application = Application.builder().bot(self.notifier.bot).concurrent_updates(True).build()
+        # "polling" keeps a getUpdates request open, "webhook" has Telegram push updates to an embedded server
+        self.mode = os.getenv('TELEGRAM_MODE', 'polling')
         self.setup_handlers()
 
     def is_authorized_user(self, chat_id: str) -> bool:
@@ -60,16 +77,21 @@ class TelegramClockBot:
 
     def setup_handlers(self):
         """Setup Telegram command handlers"""
-        # Command handlers with authorization check
-        self.application.add_handler(CommandHandler("start", self.start_command))
-        self.application.add_handler(CommandHandler("help", self.help_command))
-        self.application.add_handler(CommandHandler("status", self.status_command))
-        self.application.add_handler(CommandHandler("clockin", self.clock_in_command))
-        self.application.add_handler(CommandHandler("clockout", self.clock_out_command))
-        self.application.add_handler(CommandHandler("lunchstart", self.lunch_start_command))
-        self.application.add_handler(CommandHandler("lunchend", self.lunch_end_command))
-        self.application.add_handler(CommandHandler("skip", self.skip_command))
-        self.application.add_handler(CommandHandler("screenshot", self.screenshot_command))
+        # Command handlers with authorization check, timed for the metrics endpoint
+        commands = {
+            "start": self.start_command,
+            "help": self.help_command,
+            "status": self.status_command,
+            "clockin": self.clock_in_command,
+            "clockout": self.clock_out_command,
+            "lunchstart": self.lunch_start_command,
+            "lunchend": self.lunch_end_command,
+            "skip": self.skip_command,
+            "screenshot": self.screenshot_command,
+            "cancel": self.cancel_command,
+        }
+        for command, handler in commands.items():
+            self.application.add_handler(CommandHandler(command, timed_command(command, handler)))
         
         # Message handler for unknown commands
         self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_message))
@@ -94,9 +116,10 @@ Hi {user_name}! 👋 Welcome to the clock in/out bot.
 • `/clockout` - Clock out now  
 • `/lunchstart` - Start lunch break
 • `/lunchend` - End lunch break
-• `/status` - Check current status
+• `/status` - Check current status (`/status live` asks Paylocity)
 • `/skip` - Click "Skip for Now" button
 • `/screenshot` - Take a screenshot
+• `/cancel` - Cancel running or queued actions
 • `/help` - Show this help
 
 **Status:** Bot is ready! 🚀
@@ -116,8 +139,11 @@ Hi {user_name}! 👋 Welcome to the clock in/out bot.
 
 **Utilities:**
 • `/skip` - Click "Skip for Now" button (if it appears)
-• `/status` - Check your current clock status
+• `/status` - Your clock status from the journal, instantly
+• `/status live` - Check the status in Paylocity right now
+• Add `force` to a time action (e.g. `/clockin force`) to repeat it anyway
 • `/screenshot` - Take a screenshot of current page
+• `/cancel` - Cancel running or queued browser actions
 
 **Support:**
 • `/start` - Restart the bot
@@ -127,33 +153,49 @@ Hi {user_name}! 👋 Welcome to the clock in/out bot.
         """
         await update.message.reply_text(help_message, parse_mode='Markdown')
 
+    def journal_status_message(self):
+        """The clock status as recorded in the journal, None if nothing is known yet"""
+        journal = self.session_manager.journal
+        state, since, source = journal.current_state()
+        if not state:
+            return None
+        snapshot = journal.last_snapshot()
+        lines = [f"📊 **Current Status:** {STATE_LABELS[state]} since {since.strftime('%a %H:%M')} (from {source})"]
+        if snapshot:
+            checked = datetime.fromisoformat(snapshot['observed_at'])
+            lines.append(f"🔄 Last checked in Paylocity: {checked.strftime('%a %H:%M')} ({snapshot['status']})")
+        for action in journal.recent_actions(3):
+            started = datetime.fromisoformat(action['started_at'])
+            lines.append(f"• {started.strftime('%a %H:%M')} {action['action']}: {action['outcome']}")
+        lines.append("💡 `/status live` checks Paylocity right now")
+        return "\n".join(lines)
+
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /status command"""
+        live = 'live' in (context.args or [])
+        message = None if live else self.journal_status_message()
+        if message:
+            await update.message.reply_text(message)
+            return
+
         await update.message.reply_text("🔍 Checking current status...")
         
+        def check_status(progress):
+            return self.session_manager.run_action('get_current_status', progress)
+
         try:
-            if not self.paylocity_client:
-                self.paylocity_client = PaylocityClient(headless=True)
-                if not self.paylocity_client.start():
-                    await update.message.reply_text("❌ Failed to start browser")
-                    return
-            
-            if not self.paylocity_client.login():
-                await update.message.reply_text("❌ Failed to login to Paylocity")
-                return
-                
-            status = self.paylocity_client.get_current_status()
+            status = await self.run_browser_action(update, "Status", check_status)
             if status:
                 await update.message.reply_text(f"📊 **Current Status:** {status}")
             else:
                 await update.message.reply_text("📊 **Current Status:** Unable to determine")
                 
+        except ActionCancelled:
+            await update.message.reply_text("🛑 Status check cancelled")
+        except PaylocitySessionError as e:
+            await update.message.reply_text(f"❌ {e}")
         except Exception as e:
             await update.message.reply_text(f"❌ Error checking status: {str(e)}")
-        finally:
-            if self.paylocity_client:
-                self.paylocity_client.close()
-                self.paylocity_client = None
 
     async def clock_in_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /clockin command"""
@@ -168,7 +210,7 @@ Hi {user_name}! 👋 Welcome to the clock in/out bot.
         # Immediate acknowledgment
         await update.message.reply_text(f"✅ Received your command, {user_name}! Processing...")
         await update.message.reply_text(f"🕐 Clocking in...")
-        await self.perform_clock_action(update, 'clock_in')
+        await self.perform_clock_action(update, 'clock_in', force='force' in (context.args or []))
 
     async def clock_out_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /clockout command"""
@@ -182,7 +224,7 @@ Hi {user_name}! 👋 Welcome to the clock in/out bot.
         user_name = self.get_user_name(chat_id)
         await update.message.reply_text(f"✅ Received your command, {user_name}! Processing...")
         await update.message.reply_text("🕕 Starting clock out process...")
-        await self.perform_clock_action(update, "clock_out")
+        await self.perform_clock_action(update, "clock_out", force='force' in (context.args or []))
 
     async def lunch_start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /lunchstart command"""
@@ -196,7 +238,7 @@ Hi {user_name}! 👋 Welcome to the clock in/out bot.
         user_name = self.get_user_name(chat_id)
         await update.message.reply_text(f"✅ Received your command, {user_name}! Processing...")
         await update.message.reply_text("🍽️ Starting lunch break...")
-        await self.perform_clock_action(update, "start_lunch")
+        await self.perform_clock_action(update, "start_lunch", force='force' in (context.args or []))
 
     async def lunch_end_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /lunchend command"""
@@ -210,7 +252,7 @@ Hi {user_name}! 👋 Welcome to the clock in/out bot.
         user_name = self.get_user_name(chat_id)
         await update.message.reply_text(f"✅ Received your command, {user_name}! Processing...")
         await update.message.reply_text("🍽️ Ending lunch break...")
-        await self.perform_clock_action(update, "end_lunch")
+        await self.perform_clock_action(update, "end_lunch", force='force' in (context.args or []))
 
     async def skip_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /skip command"""
@@ -222,20 +264,16 @@ Hi {user_name}! 👋 Welcome to the clock in/out bot.
         await update.message.reply_text("📸 Taking screenshot...")
         
         try:
-            if not self.paylocity_client:
-                self.paylocity_client = PaylocityClient(headless=True)
-                if not self.paylocity_client.start():
-                    await update.message.reply_text("❌ Failed to start browser")
-                    return
-            
-            if not self.paylocity_client.login():
-                await update.message.reply_text("❌ Failed to login to Paylocity")
-                return
-                
             # Take screenshot
             screenshot_path = f"logs/paylocity_screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
             os.makedirs(os.path.dirname(screenshot_path), exist_ok=True)
-            self.paylocity_client.driver.save_screenshot(screenshot_path)
+
+            def take_screenshot(progress):
+                with self.session_manager.session(progress=progress) as paylocity_client:
+                    progress("📸 Capturing page...")
+                    paylocity_client.driver.save_screenshot(screenshot_path)
+
+            await self.run_browser_action(update, "Screenshot", take_screenshot)
             
             # Send screenshot
             with open(screenshot_path, 'rb') as photo:
@@ -244,26 +282,16 @@ Hi {user_name}! 👋 Welcome to the clock in/out bot.
                     caption=f"📸 Screenshot taken at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
                 )
                 
+        except ActionCancelled:
+            await update.message.reply_text("🛑 Screenshot cancelled")
+        except PaylocitySessionError as e:
+            await update.message.reply_text(f"❌ {e}")
         except Exception as e:
             await update.message.reply_text(f"❌ Error taking screenshot: {str(e)}")
-        finally:
-            if self.paylocity_client:
-                self.paylocity_client.close()
-                self.paylocity_client = None
 
     async def locate_clock_in_button(self, update: Update, user_name: str):
         """Locate the Clock In button without clicking it"""
         try:
-            if not self.paylocity_client:
-                self.paylocity_client = PaylocityClient(headless=True)
-                if not self.paylocity_client.start():
-                    await update.message.reply_text("❌ Failed to start browser")
-                    return
-            
-            if not self.paylocity_client.login():
-                await update.message.reply_text("❌ Failed to login to Paylocity")
-                return
-                
             # Look for clock in button (case insensitive)
             clock_in_selectors = [
                 # Exact button class found from inspection
@@ -278,29 +306,28 @@ Hi {user_name}! 👋 Welcome to the clock in/out bot.
                 "//a[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'clock in')]"
             ]
             
-            button_found = False
-            for i, selector in enumerate(clock_in_selectors):
-                try:
-                    from selenium.webdriver.common.by import By
-                    button = self.paylocity_client.driver.find_element(By.XPATH, selector)
-                    if button.is_displayed() and button.is_enabled():
-                        message = (
-                            f"✅ **Clock In Button Found!**\n"
-                            f"👤 User: {user_name}\n"
-                            f"🕐 Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-                            f"📍 Location: x={button.location['x']}, y={button.location['y']}\n"
-                            f"📏 Size: {button.size['width']}x{button.size['height']}\n"
-                            f"🔘 Button text: '{button.text}'\n"
-                            f"✅ Enabled: {button.is_enabled()}\n\n"
-                            f"🚫 **NOT CLICKING** - Button located only"
-                        )
-                        await update.message.reply_text(self.add_kiss_reminder(message, user_name))
-                        button_found = True
-                        break
-                except Exception as e:
-                    continue
+            def locate(progress):
+                with self.session_manager.session(progress=progress) as paylocity_client:
+                    progress("🔍 Looking for the Clock In button...")
+                    selector, button = paylocity_client.resolver.resolve('clock_in', clock_in_selectors)
+                    if button is None:
+                        return None
+                    return (
+                        f"✅ **Clock In Button Found!**\n"
+                        f"👤 User: {user_name}\n"
+                        f"🕐 Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                        f"📍 Location: x={button.location['x']}, y={button.location['y']}\n"
+                        f"📏 Size: {button.size['width']}x{button.size['height']}\n"
+                        f"🔘 Button text: '{button.text}'\n"
+                        f"✅ Enabled: {button.is_enabled()}\n\n"
+                        f"🚫 **NOT CLICKING** - Button located only"
+                    )
+
+            message = await self.run_browser_action(update, "Locate Clock In", locate)
                     
-            if not button_found:
+            if message:
+                await update.message.reply_text(self.add_kiss_reminder(message, user_name))
+            else:
                 await update.message.reply_text(
                     f"❌ **Clock In Button Not Found**\n"
                     f"👤 User: {user_name}\n"
@@ -308,33 +335,28 @@ Hi {user_name}! 👋 Welcome to the clock in/out bot.
                     f"💡 Button might not be available or page not loaded"
                 )
                 
+        except ActionCancelled:
+            await update.message.reply_text("🛑 Locating the Clock In button was cancelled")
+        except PaylocitySessionError as e:
+            await update.message.reply_text(f"❌ {e}")
         except Exception as e:
             await update.message.reply_text(
                 f"❌ **Error locating Clock In button:** {str(e)}\n"
                 f"👤 User: {user_name}\n"
                 f"🕐 Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
             )
-        finally:
-            if self.paylocity_client:
-                self.paylocity_client.close()
-                self.paylocity_client = None
 
-    async def perform_clock_action(self, update: Update, action_name: str):
+    async def perform_clock_action(self, update: Update, action_name: str, force: bool = False):
         """Perform a clock action and send result"""
+        title = action_name.replace('_', ' ').title()
+
+        def perform(progress):
+            # Over HTTP or on the warm browser session; the last progress call comes before the click,
+            # so that is the last chance to cancel
+            return self.session_manager.run_action(action_name, progress, source='telegram', force=force)
+
         try:
-            if not self.paylocity_client:
-                self.paylocity_client = PaylocityClient(headless=True)
-                if not self.paylocity_client.start():
-                    await update.message.reply_text(f"❌ Failed to start browser for {action_name}")
-                    return
-            
-            if not self.paylocity_client.login():
-                await update.message.reply_text(f"❌ Failed to login to Paylocity for {action_name}")
-                return
-                
-            # Perform the action
-            action_method = getattr(self.paylocity_client, action_name)
-            success = action_method()
+            success = await self.run_browser_action(update, title, perform)
             
             if success:
                 message = (
@@ -351,15 +373,44 @@ Hi {user_name}! 👋 Welcome to the clock in/out bot.
                 )
                 await update.message.reply_text(message)
                 
+        except ActionCancelled:
+            await update.message.reply_text(f"🛑 {title} cancelled")
+        except PaylocityDuplicateActionError as e:
+            await update.message.reply_text(f"⏭️ {title} skipped: {e}\n💡 Add `force` to the command to do it anyway.")
+        except PaylocitySessionError as e:
+            await update.message.reply_text(f"❌ {e} for {action_name}")
         except Exception as e:
             await update.message.reply_text(
                 f"❌ **{action_name.replace('_', ' ').title()} Error:** {str(e)}\n"
                 f"🕐 Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
             )
-        finally:
-            if self.paylocity_client:
-                self.paylocity_client.close()
-                self.paylocity_client = None
+
+    async def run_browser_action(self, update: Update, name: str, work):
+        """Run browser work on the action queue, editing one status message with its progress"""
+        status_message = await update.message.reply_text(f"⏳ {name}...")
+
+        async def show_progress(text):
+            await status_message.edit_text(f"⏳ {name}: {text}")
+
+        return await self.action_queue.run(name, work, on_progress=show_progress, owner=update.effective_chat.id)
+
+    async def cancel_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /cancel command"""
+        chat_id = update.effective_chat.id
+        
+        # Check authorization
+        if not self.is_authorized_user(chat_id):
+            await update.message.reply_text("❌ You are not authorized to use this bot.")
+            return
+            
+        cancelled = self.action_queue.cancel(owner=chat_id)
+        if cancelled:
+            await update.message.reply_text(
+                f"🛑 Cancelling {cancelled} action(s)...\n"
+                f"💡 A running action stops before its next step."
+            )
+        else:
+            await update.message.reply_text("ℹ️ Nothing to cancel")
 
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle unknown messages"""
@@ -368,32 +419,31 @@ Hi {user_name}! 👋 Welcome to the clock in/out bot.
         )
 
     async def send_notification(self, message: str):
-        """Send notification to Aymee only"""
-        try:
-            from telegram import Bot
-            bot = Bot(token=self.token)
-            # Only send to Aymee
-            aymee_id = os.getenv('AYMEE_TELEGRAM_ID')
-            if aymee_id:
-                try:
-                    await bot.send_message(chat_id=aymee_id, text=message, parse_mode='Markdown')
-                    self.logger.info(f"📤 Notification sent to Aymee")
-                except Exception as e:
-                    self.logger.error(f"❌ Failed to send notification to Aymee: {e}")
-        except Exception as e:
-            self.logger.error(f"❌ Failed to send notifications: {e}")
+        """Send notification to the notifier's chats over the shared bot connection"""
+        await self.notifier.notify(message)
 
     def run(self):
         """Start the Telegram bot"""
         self.logger.info("🚀 Starting Telegram Clock Bot...")
-        self.application.run_polling()
+        try:
+            self.application.run_polling()
+        finally:
+            if self.owns_action_queue:
+                self.action_queue.shutdown()
+            if self.owns_session_manager:
+                self.session_manager.close()
 
     async def run_async(self):
         """Start the Telegram bot asynchronously"""
         self.logger.info("🚀 Starting Telegram Clock Bot...")
         await self.application.initialize()
         await self.application.start()
-        await self.application.updater.start_polling()
+        webhook = None
+        if self.mode == 'webhook':
+            webhook = TelegramWebhookServer(self.application)
+            await webhook.start()
+        else:
+            await self.application.updater.start_polling()
         
         # Keep running
         try:
@@ -401,6 +451,13 @@ Hi {user_name}! 👋 Welcome to the clock in/out bot.
         except KeyboardInterrupt:
             pass
         finally:
-            await self.application.updater.stop()
+            if webhook:
+                await webhook.stop()
+            else:
+                await self.application.updater.stop()
             await self.application.stop()
             await self.application.shutdown()
+            if self.owns_action_queue:
+                self.action_queue.shutdown()
+            if self.owns_session_manager:
+                self.session_manager.close()
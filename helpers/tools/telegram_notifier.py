@@ -0,0 +1,80 @@
+"""
+Shared Telegram Notifier
+One connection-pooled Telegram bot client for notifications and command replies,
+with fan-out of each notification to several chats
+"""
+
+import asyncio
+import logging
+import os
+
+from telegram.ext import ExtBot
+from telegram.request import HTTPXRequest
+
+
+def notify_chat_ids():
+    """Aymee's chat plus any extra chats from CLOCK_NOTIFY_CHAT_IDS (comma separated)"""
+    chat_ids = [os.getenv('AYMEE_TELEGRAM_ID')]
+    chat_ids += os.getenv('CLOCK_NOTIFY_CHAT_IDS', '').split(',')
+    return list(dict.fromkeys(chat_id.strip() for chat_id in chat_ids if chat_id and chat_id.strip()))
+
+
+class TelegramNotifier:
+    def __init__(self, token=None, chat_ids=None, pool_size=8, base_url=None):
+        """
+        :param token: The bot token (default: AYMEE_TELEGRAM_TOKEN)
+        :param chat_ids: The chats notifications go to (default: notify_chat_ids())
+        :param pool_size: Connections kept open to the Telegram API
+        :param base_url: The Bot API URL the token is appended to (default: TELEGRAM_API_BASE_URL or
+                         Telegram's), e.g. helpers/mocks/telegram_mock_server.py for local testing
+        """
+        self.logger = logging.getLogger(__name__)
+        self.token = token or os.getenv('AYMEE_TELEGRAM_TOKEN')
+        self.chat_ids = chat_ids if chat_ids is not None else notify_chat_ids()
+        # The Telegram application polls with this same bot, so replies and notifications share its pool
+        self.bot = ExtBot(
+            self.token,
+            base_url=base_url or os.getenv('TELEGRAM_API_BASE_URL', 'https://api.telegram.org/bot'),
+            request=HTTPXRequest(connection_pool_size=pool_size),
+        )
+        # Created on first use: before Python 3.10 a Lock is bound to the loop current at its creation
+        self._init_lock = None
+
+    def _lock(self):
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+        return self._init_lock
+
+    async def initialize(self):
+        """Open the connection pool once; later calls return right away"""
+        async with self._lock():
+            await self.bot.initialize()
+
+    async def _send(self, chat_id, message, parse_mode):
+        try:
+            await self.bot.send_message(chat_id=chat_id, text=message, parse_mode=parse_mode)
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Failed to send notification to {chat_id}: {e}")
+            return False
+
+    async def notify(self, message, chat_ids=None, parse_mode='Markdown'):
+        """
+        Send a notification to every chat at once.
+
+        :param message: The notification text
+        :param chat_ids: The chats to send to (default: the notifier's chats)
+        :param parse_mode: The Telegram parse mode of the text
+        :return: The number of chats it reached
+        """
+        await self.initialize()
+        chat_ids = self.chat_ids if chat_ids is None else chat_ids
+        results = await asyncio.gather(*(self._send(chat_id, message, parse_mode) for chat_id in chat_ids))
+        sent = sum(results)
+        self.logger.info(f"📤 Notification sent to {sent}/{len(chat_ids)} chat(s)")
+        return sent
+
+    async def close(self):
+        """Close the connection pool"""
+        async with self._lock():
+            await self.bot.shutdown()
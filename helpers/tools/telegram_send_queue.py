@@ -0,0 +1,205 @@
+import threading
+import time
+from collections import deque
+
+from telepot.exception import TooManyRequestsError
+
+from helpers.tools.instrumentation import current_run, span
+
+# Telegram rejects messages longer than this many characters
+MAX_MESSAGE_LENGTH = 4096
+# Telegram allows about one message per second in a chat and 30 per second overall
+PER_CHAT_INTERVAL = 1.0
+GLOBAL_RATE = 30
+# Retries of a send that Telegram answered with 429 Too Many Requests
+MAX_RETRIES = 5
+# Separator between coalesced messages
+COALESCE_SEPARATOR = "\n\n"
+
+
+def split_message(text, limit=MAX_MESSAGE_LENGTH):
+    """
+    Split a text into parts that fit into one Telegram message each.
+
+    Splits on the last paragraph break before the limit, then on a line break, then
+    on a space, and only cuts a word when there is no better boundary.
+
+    :param text: The text to split
+    :param limit: The maximum length of a part
+    :return: A list of parts
+    """
+    parts = []
+    while len(text) > limit:
+        for boundary in ("\n\n", "\n", " "):
+            split_at = text.rfind(boundary, 0, limit)
+            if split_at > 0:
+                break
+        else:
+            split_at = limit
+        parts.append(text[:split_at].rstrip())
+        text = text[split_at:].lstrip()
+    if text.strip():
+        parts.append(text)
+    return parts
+
+
+class RateLimiter:
+    def __init__(self, per_chat_interval=PER_CHAT_INTERVAL, global_rate=GLOBAL_RATE):
+        """
+        Spaces out sends per chat and caps the sends per second over all chats.
+
+        :param per_chat_interval: Minimum number of seconds between two sends to the same chat
+        :param global_rate: Maximum number of sends per second over all chats
+        """
+        self.per_chat_interval = per_chat_interval
+        self.global_rate = global_rate
+        self.last_send = {}
+        self.recent_sends = deque()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self, chat_id):
+        """Block until a message may be sent to the chat, then count it as sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.recent_sends and now - self.recent_sends[0] >= 1.0:
+                    self.recent_sends.popleft()
+                ready_at = max(
+                    self.blocked_until,
+                    self.last_send.get(chat_id, 0.0) + self.per_chat_interval,
+                    self.recent_sends[0] + 1.0 if len(self.recent_sends) >= self.global_rate else 0.0,
+                )
+                if ready_at <= now:
+                    self.last_send[chat_id] = now
+                    self.recent_sends.append(now)
+                    return
+            time.sleep(ready_at - now)
+
+    def block(self, seconds):
+        """Hold back every send for a while, e.g. for the retry_after of a 429 answer"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class TelegramSendQueue:
+    def __init__(self, bot, rate_limiter=None, coalesce_delay=0.5, max_retries=MAX_RETRIES):
+        """
+        Sends Telegram messages from a background worker so callers never wait for Telegram.
+
+        Messages for the same chat that are queued close together are coalesced into as few
+        messages as fit the length limit, long messages are split on safe boundaries, sends
+        respect the per-chat and global rates, and 429 answers are retried after retry_after.
+
+        :param bot: A telepot.Bot
+        :param rate_limiter: A RateLimiter, shared with any direct sends of the same bot
+        :param coalesce_delay: Seconds to wait for more messages to the same chat before sending
+        :param max_retries: Retries of a message that Telegram rate limited
+        """
+        self.bot = bot
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.coalesce_delay = coalesce_delay
+        self.max_retries = max_retries
+        self.pending = deque()
+        self.in_flight = 0
+        self.flushing = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        self.worker = threading.Thread(target=self._run, name="telegram-send-queue", daemon=True)
+        self.worker.start()
+
+    def put(self, chat_id, text):
+        """
+        Queue a message and return right away.
+
+        :param chat_id: The chat to send the message to
+        :param text: The message text, of any length
+        """
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Telegram send queue is closed")
+            # The send is recorded in the run that queued it, not in the worker thread
+            run = current_run()
+            for part in split_message(text):
+                self.pending.append((chat_id, part, time.monotonic(), run))
+            self.condition.notify_all()
+
+    def _next_batch(self):
+        """Take the next message off the queue, merged with the following ones to the same chat that still fit"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.pending or self.closed)
+            if not self.pending:
+                return None
+            # Give back-to-back callers a moment to queue the rest of their messages
+            send_at = self.pending[0][2] + self.coalesce_delay
+            while not self.closed and not self.flushing and time.monotonic() < send_at:
+                self.condition.wait(send_at - time.monotonic())
+            chat_id, text, _, run = self.pending.popleft()
+            count = 1
+            while self.pending and self.pending[0][0] == chat_id:
+                merged = f"{text}{COALESCE_SEPARATOR}{self.pending[0][1]}"
+                if len(merged) > MAX_MESSAGE_LENGTH:
+                    break
+                text = merged
+                count += 1
+                self.pending.popleft()
+            self.in_flight += 1
+            return chat_id, text, count, run
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            chat_id, text, count, run = batch
+            try:
+                with span('telegram_send', run=run) as current:
+                    current.add(items=count, bytes=len(text.encode()))
+                    self.call(chat_id, self.bot.sendMessage, chat_id, text)
+            except Exception as e:
+                print(f"Failed to send message: {e}")
+            finally:
+                with self.condition:
+                    self.in_flight -= 1
+                    self.condition.notify_all()
+
+    def call(self, chat_id, method, *args, **kwargs):
+        """
+        Call a bot method for a chat within the rate limits, retrying on 429 Too Many Requests.
+
+        :param chat_id: The chat the call sends to
+        :param method: A bound telepot.Bot method, e.g. bot.sendMessage
+        :return: The result of the method
+        """
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait(chat_id)
+            try:
+                return method(*args, **kwargs)
+            except TooManyRequestsError as e:
+                if attempt == self.max_retries:
+                    raise
+                retry_after = (e.json or {}).get('parameters', {}).get('retry_after', 1)
+                print(f"Telegram rate limit hit, retrying in {retry_after}s")
+                self.rate_limiter.block(retry_after)
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued message has been sent.
+
+        :param timeout: Maximum number of seconds to wait
+        :return: True if the queue is empty
+        """
+        with self.condition:
+            self.flushing += 1
+            self.condition.notify_all()
+            try:
+                return self.condition.wait_for(lambda: not self.pending and not self.in_flight, timeout=timeout)
+            finally:
+                self.flushing -= 1
+
+    def close(self, timeout=None):
+        """Send what is still queued and stop the worker"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.worker.join(timeout)
@@ -0,0 +1,77 @@
+"""
+Telegram Webhook Server
+Receives updates pushed by Telegram on an embedded aiohttp server instead of long polling,
+accepting only requests that carry the secret token registered with the webhook
+"""
+
+import hmac
+import logging
+import os
+import secrets
+
+from aiohttp import web
+from telegram import Update
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+class TelegramWebhookServer:
+    def __init__(self, application, webhook_url=None, listen=None, port=None, path=None, secret_token=None):
+        """
+        :param application: The telegram.ext.Application the updates are handed to
+        :param webhook_url: The public HTTPS base URL Telegram posts to (default: TELEGRAM_WEBHOOK_URL)
+        :param listen: The address to listen on (default: TELEGRAM_WEBHOOK_LISTEN or 0.0.0.0)
+        :param port: The port to listen on (default: TELEGRAM_WEBHOOK_PORT or 8443)
+        :param path: The URL path of the webhook (default: TELEGRAM_WEBHOOK_PATH or /telegram)
+        :param secret_token: The token Telegram sends back in every request (default: TELEGRAM_WEBHOOK_SECRET,
+                             or a new random one per start)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.application = application
+        self.webhook_url = (webhook_url or os.getenv('TELEGRAM_WEBHOOK_URL', '')).rstrip('/')
+        self.listen = listen or os.getenv('TELEGRAM_WEBHOOK_LISTEN', '0.0.0.0')
+        self.port = port if port is not None else int(os.getenv('TELEGRAM_WEBHOOK_PORT', '8443'))
+        self.path = path or os.getenv('TELEGRAM_WEBHOOK_PATH', '/telegram')
+        self.secret_token = secret_token or os.getenv('TELEGRAM_WEBHOOK_SECRET') or secrets.token_urlsafe(32)
+        self.runner = None
+
+        if not self.webhook_url:
+            raise ValueError("Webhook mode needs TELEGRAM_WEBHOOK_URL")
+
+    async def handle_update(self, request):
+        """Validate the secret token and queue the update for the application"""
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ''), self.secret_token):
+            self.logger.warning(f"⚠️ Rejected webhook request from {request.remote}: bad secret token")
+            return web.Response(status=403)
+        try:
+            update = Update.de_json(await request.json(), self.application.bot)
+        except ValueError:
+            return web.Response(status=400)
+        # Answer right away; the application processes the update on its own
+        await self.application.update_queue.put(update)
+        return web.Response()
+
+    async def start(self):
+        """Start listening and register the webhook with Telegram"""
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_update)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.listen, self.port).start()
+
+        await self.application.bot.set_webhook(
+            url=f"{self.webhook_url}{self.path}",
+            secret_token=self.secret_token,
+            allowed_updates=Update.ALL_TYPES,
+        )
+        self.logger.info(f"🪝 Webhook listening on {self.listen}:{self.port}{self.path}")
+
+    async def stop(self):
+        """Unregister the webhook and stop listening"""
+        try:
+            await self.application.bot.delete_webhook()
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not delete webhook: {e}")
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
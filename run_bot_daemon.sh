@@ -0,0 +1,34 @@
+#!/bin/bash
+
+# Bot Daemon Runner Script
+# Starts every bot in one resident process (replaces the per-bot cron scripts)
+
+echo "🤖 Starting Bot Daemon..."
+
+# Check if virtual environment exists
+if [ ! -d "betting-bot-env" ]; then
+    echo "❌ Virtual environment not found!"
+    echo "Please run: python -m venv betting-bot-env"
+    exit 1
+fi
+
+# Activate virtual environment
+source betting-bot-env/bin/activate
+
+# Check if .env file exists
+if [ ! -f ".env" ]; then
+    echo "❌ .env file not found!"
+    echo "Please copy env.example to .env and configure your credentials"
+    exit 1
+fi
+
+# Install/update dependencies
+echo "📦 Installing dependencies..."
+pip install -q -r requirements.txt
+
+# Create logs directory
+mkdir -p logs
+
+# Start the bot daemon
+echo "🚀 Starting Bot Daemon..."
+python bots/bot_daemon.py
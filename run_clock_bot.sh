@@ -24,7 +24,7 @@ fi
 
 # Install/update dependencies
 echo "📦 Installing dependencies..."
-pip install -q python-telegram-bot schedule
+pip install -q -r requirements.txt
 
 # Create logs directory
 mkdir -p logs
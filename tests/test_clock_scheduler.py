@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from helpers.tools.clock_scheduler import ClockScheduler, ScheduledJob
+
+
+class FakeClockScheduler(ClockScheduler):
+    """A scheduler whose clock is set by the test"""
+
+    def __init__(self, start, **kwargs):
+        super().__init__(tz_name='America/Los_Angeles', **kwargs)
+        self.current = self.tz.localize(start)
+
+    def now(self):
+        return self.current
+
+
+async def noop():
+    pass
+
+
+class NegativeJitterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        # Monday 2025-06-02 08:00
+        self.scheduler = FakeClockScheduler(datetime(2025, 6, 2, 8, 0),
+                                            state_path=os.path.join(self.directory.name, 'state.json'))
+
+    def runs_over(self, job, days):
+        """Step the fake clock from run to run and collect the run times"""
+        runs = []
+        end = self.scheduler.current + (datetime(2025, 1, 1 + days) - datetime(2025, 1, 1))
+        while job.next_run and job.next_run < end:
+            self.scheduler.current = job.next_run
+            runs.append(job.next_run)
+            self.scheduler.plan_after_run(job)
+        return runs
+
+    def test_early_jitter_runs_once_per_day(self):
+        # Every run is jittered the full 5 minutes early
+        with mock.patch('helpers.tools.clock_scheduler.random.uniform', return_value=-60):
+            job = self.scheduler.add_job(ScheduledJob('clock_in', '09:00', noop, jitter_minutes=5))
+            runs = self.runs_over(job, 5)
+
+        self.assertEqual([run.strftime('%a %H:%M') for run in runs],
+                         ['Mon 08:55', 'Tue 08:55', 'Wed 08:55', 'Thu 08:55', 'Fri 08:55'])
+
+    def test_late_jitter_runs_once_per_day(self):
+        with mock.patch('helpers.tools.clock_scheduler.random.uniform', return_value=60):
+            job = self.scheduler.add_job(ScheduledJob('clock_in', '09:00', noop, jitter_minutes=5))
+            runs = self.runs_over(job, 3)
+
+        self.assertEqual([run.strftime('%a %H:%M') for run in runs], ['Mon 09:05', 'Tue 09:05', 'Wed 09:05'])
+
+    def test_early_jitter_already_passed_runs_right_away(self):
+        self.scheduler.current = self.scheduler.tz.localize(datetime(2025, 6, 2, 8, 58))
+        with mock.patch('helpers.tools.clock_scheduler.random.uniform', return_value=-60):
+            job = self.scheduler.add_job(ScheduledJob('clock_in', '09:00', noop, jitter_minutes=5))
+            runs = self.runs_over(job, 1)
+
+        self.assertEqual([run.strftime('%a %H:%M:%S') for run in runs], ['Mon 08:58:01', 'Tue 08:55:00'])
+
+
+if __name__ == '__main__':
+    unittest.main()